@@ -2,6 +2,7 @@ import logging
 log = logging.getLogger('agents')
 
 from enforce_typing import enforce_types
+import math
 
 from engine.AgentBase import AgentBase
                         
@@ -36,6 +37,11 @@ class GrantGivingAgent(AgentBase):
             self._disburseFunds(state)
             self._tick_last_disburse = state.tick
 
+    def nextWakeTick(self, state) -> int:
+        #next disburse is once >= s_between_grants since the last
+        n_ticks = math.ceil(self._s_between_grants / state.ss.time_step)
+        return self._tick_last_disburse + max(n_ticks, 1)
+
     def _disburseFunds(self, state):
         #same amount each time
         receiving_agent = state.getAgent(self._receiving_agent_name)
@@ -4,10 +4,12 @@ log = logging.getLogger('agents')
 from enforce_typing import enforce_types
 import math
 
-from engine.AgentBase import AgentBase
+from engine.AgentBase import AgentBase, NEVER_WAKE
         
 @enforce_types
 class GrantTakingAgent(AgentBase):    
+    WAKE_ON_RECEIVE = True #it only acts on funds received
+
     def __init__(self, name: str, USD: float, OCEAN: float):
         super().__init__(name, USD, OCEAN)
         self._spent_at_tick = 0.0 #USD and OCEAN (in USD) spent
@@ -19,5 +21,11 @@ class GrantTakingAgent(AgentBase):
         self._transferUSD(None, self.USD())
         self._transferOCEAN(None, self.OCEAN())
 
+    def nextWakeTick(self, state) -> int:
+        #one more step to reset spentAtTick, then sleep till funds arrive
+        if self._spent_at_tick != 0.0:
+            return state.tick + 1
+        return NEVER_WAKE
+
     def spentAtTick(self) -> float:
         return self._spent_at_tick
@@ -4,7 +4,7 @@ log = logging.getLogger('minteragents')
 from enforce_typing import enforce_types
 import math
 
-from engine.AgentBase import AgentBase    
+from engine.AgentBase import AgentBase, NEVER_WAKE
 from util.constants import S_PER_YEAR, BITCOIN_NUM_HALF_LIVES
 
 #====================================================================
@@ -37,6 +37,14 @@ class OCEANLinearMinterAgent(AgentBase):
         if self._doMint(state):
             self._mintAndDisburseFunds(state)
 
+    def nextWakeTick(self, state) -> int:
+        if self._n_mints_left == 0:
+            return NEVER_WAKE
+        elif self._tick_previous_mint is None:
+            return state.tick + 1
+        n_ticks = math.ceil(self._s_between_mints / state.ss.time_step)
+        return self._tick_previous_mint + max(n_ticks, 1)
+
     def _doMint(self, state) -> bool:
         assert self._n_mints_left >= 0.0
         
@@ -232,6 +240,14 @@ class OCEANFuncMinterAgent(AgentBase):
         if self._doMint(state):
             self._mintAndDisburseFunds(state)
 
+    def nextWakeTick(self, state) -> int:
+        if self._OCEAN_left_to_mint == 0.0:
+            return NEVER_WAKE
+        elif self._tick_previous_mint is None:
+            return state.tick + 1
+        n_ticks = math.ceil(self._s_between_mints / state.ss.time_step)
+        return self._tick_previous_mint + max(n_ticks, 1)
+
     def OCEANminted(self):
         return self._total_OCEAN_to_mint - self._OCEAN_left_to_mint
 
@@ -1,4 +1,5 @@
 from enforce_typing import enforce_types
+import math
 import random
 
 from assets.agents.PoolAgent import PoolAgent
@@ -22,9 +23,10 @@ class PublisherAgent(AgentBase):
         self._s_between_sellDT = 15 * S_PER_DAY #magic number
         
     def takeStep(self, state) -> None:
-        self._s_since_create += state.ss.time_step
-        self._s_since_unstake += state.ss.time_step
-        self._s_since_sellDT += state.ss.time_step
+        s_since_step = self._secondsSinceStep(state)
+        self._s_since_create += s_since_step
+        self._s_since_unstake += s_since_step
+        self._s_since_sellDT += s_since_step
         
         if self._doCreatePool():
             self._s_since_create = 0
@@ -38,6 +40,13 @@ class PublisherAgent(AgentBase):
             self._s_since_sellDT = 0
             self._sellDTsomewhere(state)
 
+    def nextWakeTick(self, state) -> int:
+        #every action needs enough time since it was last done
+        s_left = min(self._s_between_create - self._s_since_create,
+                     self._s_between_unstake - self._s_since_unstake,
+                     self._s_between_sellDT - self._s_since_sellDT)
+        return state.tick + max(1, math.ceil(s_left / state.ss.time_step))
+
     def _doCreatePool(self) -> bool:
         if self.OCEAN() < 200.0: #magic number
             return False
@@ -64,8 +73,8 @@ class PublisherAgent(AgentBase):
         OCEAN_bind_amt = self.OCEAN() #magic number: use all the OCEAN
         DT_bind_amt = 20.0 #magic number
                 
-        DT.approve(pool.address, toBase18(DT_bind_amt), from_wallet=wallet)
-        OCEAN.approve(pool.address, toBase18(OCEAN_bind_amt),from_wallet=wallet)
+        self._wallet.ensureAllowance(DT, pool.address, DT_bind_amt)
+        self._wallet.ensureAllowance(OCEAN, pool.address, OCEAN_bind_amt)
         
         pool.bind(DT.address, toBase18(DT_bind_amt),
                   toBase18(state.ss.pool_weight_DT), from_wallet=wallet)
@@ -78,6 +87,7 @@ class PublisherAgent(AgentBase):
         pool_agent = PoolAgent(pool_agent_name, pool)
         state.addAgent(pool_agent)
         self._wallet.resetCachedInfo()
+        self._wallet.resetCachedTokens() #minted & bound DTs, got BPTs
         
         return pool_agent
 
@@ -1,4 +1,5 @@
 from enforce_typing import enforce_types
+import math
 import random
 
 from engine.AgentBase import AgentBase
@@ -17,12 +18,16 @@ class SpeculatorAgent(AgentBase):
         self._s_between_speculates = 1 * constants.S_PER_DAY #magic number
         
     def takeStep(self, state):
-        self._s_since_speculate += state.ss.time_step
+        self._s_since_speculate += self._secondsSinceStep(state)
 
         if self._doSpeculateAction(state):
             self._s_since_speculate = 0
             self._speculateAction(state)
 
+    def nextWakeTick(self, state) -> int:
+        s_left = self._s_between_speculates - self._s_since_speculate
+        return state.tick + max(1, math.ceil(s_left / state.ss.time_step))
+
     def _doSpeculateAction(self, state):
         pool_agents = state.agents.filterToPool().values()
         if not pool_agents:
@@ -3,6 +3,7 @@ from typing import List
 from enforce_typing import enforce_types
 
 from engine.AgentBase import AgentBase
+from engine.TickHistory import TickHistory
 
 from util.constants import S_PER_MONTH
 
@@ -23,8 +24,9 @@ class SellerAgent(AgentBase):
         super().__init__(name, USD, OCEAN)
 
         #track amounts over time
-        self._USD_per_tick: List[float] = [] #the next tick will record what's in self
-        self._OCEAN_per_tick: List[float] = [] # ""
+        #the next tick will record what's in self. Keep the last month
+        self._USD_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
+        self._OCEAN_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
 
         # time-dependent parameters
         self._n_sellers: float = n_sellers
@@ -37,6 +39,9 @@ class SellerAgent(AgentBase):
 
     def takeStep(self, state) -> None:
         #record what we had up until this point
+        if self._USD_per_tick.needsTimeStep(): #first step
+            self._USD_per_tick.setTimeStep(state.ss.time_step)
+            self._OCEAN_per_tick.setTimeStep(state.ss.time_step)
         self._USD_per_tick.append(self.USD())
         self._OCEAN_per_tick.append(self.OCEAN())
         # increase the number of sellers (in the future, the number of sellers will increase 
@@ -53,14 +58,14 @@ class SellerAgent(AgentBase):
         Assumes that it disburses USD as soon as it gets it."""
         tick1 = self._tickOneMonthAgo(state)
         tick2 = state.tick
-        return float(sum(self._USD_per_tick[tick1:tick2+1]))
+        return self._USD_per_tick.sum(tick1, tick2+1)
     
     def monthlyOCEANreceived(self, state) -> float:
         """Amount of OCEAN received in the past month. 
         Assumes that it disburses OCEAN as soon as it gets it."""
         tick1 = self._tickOneMonthAgo(state)
         tick2 = state.tick
-        return float(sum(self._OCEAN_per_tick[tick1:tick2+1]))
+        return self._OCEAN_per_tick.sum(tick1, tick2+1)
 
     def _tickOneMonthAgo(self, state) -> int:
         t2 = state.tick * state.ss.time_step
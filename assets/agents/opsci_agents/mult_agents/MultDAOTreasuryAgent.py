@@ -6,6 +6,8 @@ from typing import List, Dict
 import math
 
 from engine.AgentBase import AgentBase
+from engine.TickHistory import TickHistory
+from util import timing
 from util.constants import S_PER_MONTH
 # Note: TICKS_BETWEEN_PROPOSALS should not be in constants but rather in SimStrategy
 
@@ -25,8 +27,9 @@ class MultDAOTreasuryAgent(AgentBase):
         self._receiving_agents = receiving_agents
 
         #track amounts over time
-        self._USD_per_tick: List[float] = [] #the next tick will record what's in self
-        self._OCEAN_per_tick: List[float] = [] # ""
+        #the next tick will record what's in self. Keep the last month
+        self._USD_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
+        self._OCEAN_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
         self.integration: float = 0.0
         self.novelty: float = 0.0
         self.in_index: float = 0.0
@@ -44,6 +47,7 @@ class MultDAOTreasuryAgent(AgentBase):
         self.no_proposals_received: int = 0
         self.total_research_funds_disbursed: float = 0.0
 
+    @timing.timed('methods')
     def evaluateProposal(self, state) -> dict:
         '''
         Function that evaluates proposals from all researcher agents.
@@ -94,11 +98,15 @@ class MultDAOTreasuryAgent(AgentBase):
             self.proposal_evaluation = {}
 
         #record what we had up until this point
+        if self._USD_per_tick.needsTimeStep(): #first step
+            self._USD_per_tick.setTimeStep(state.ss.time_step)
+            self._OCEAN_per_tick.setTimeStep(state.ss.time_step)
         self._USD_per_tick.append(self.USD())
         self._OCEAN_per_tick.append(self.OCEAN())
                 
         if (((self.tick_proposal_funded - state.tick) % state.ss.TICKS_BETWEEN_PROPOSALS) == 0) and can_fund:
             self.proposal_evaluation = self.evaluateProposal(state)
+            self._logAction('evaluateProposal', self.proposal_evaluation)
             self._disburseFundsOCEAN(state)
             self.tick_proposal_funded = state.tick
             self.proposal_funded = True
@@ -107,6 +115,7 @@ class MultDAOTreasuryAgent(AgentBase):
                 self.total_research_funds_disbursed += self.proposal_evaluation[ev]['amount']
         elif (state.tick == 1 or state.tick == 2) and (self.proposal_funded is False) and can_fund:
             self.proposal_evaluation = self.evaluateProposal(state)
+            self._logAction('evaluateProposal', self.proposal_evaluation)
             self._disburseFundsOCEAN(state)
             self.tick_proposal_funded = state.tick
             self.proposal_funded = True
@@ -8,6 +8,7 @@ import math
 
 from web3engine import bfactory, bpool, datatoken, dtfactory, globaltokens
 from engine.AgentBase import AgentBase
+from engine.TickHistory import TickHistory
 from web3tools.web3util import toBase18
 from util.constants import S_PER_MONTH
 
@@ -35,8 +36,9 @@ class PublicKnowledgeMarketAgent(AgentBase):
         self._receiving_agents = fee_receiving_agents
 
         #track amounts over time
-        self._USD_per_tick: List[float] = [] #the next tick will record what's in self
-        self._OCEAN_per_tick: List[float] = [] # ""
+        #the next tick will record what's in self. Keep the last month
+        self._USD_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
+        self._OCEAN_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
 
         self.OCEAN_last_tick = 0.0
         self.transaction_fees_percentage = transaction_fees_percentage
@@ -119,6 +121,9 @@ class PublicKnowledgeMarketAgent(AgentBase):
             self._disburseFeesOCEAN(state, fee)
 
         #record what we had up until this point
+        if self._USD_per_tick.needsTimeStep(): #first step
+            self._USD_per_tick.setTimeStep(state.ss.time_step)
+            self._OCEAN_per_tick.setTimeStep(state.ss.time_step)
         self._USD_per_tick.append(self.USD())
         self._OCEAN_per_tick.append(self.OCEAN())
 
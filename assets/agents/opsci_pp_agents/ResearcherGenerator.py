@@ -49,46 +49,31 @@ class ResearcherGeneratorAgent(AgentBase):
         return state.tick % self.time_interval == 0
 
     def _createLinVersatileResearcherAgent(self, state) -> None:
-        name = f'new_researcher_{self.generated_agents_idx}'
-        self.generated_agents_idx += 1
-        USD = 0.0 # magic number
-        OCEAN = 200000.0 # same as other researchers
-        new_agent = VersatileResearcherAgent(name=name, USD=USD, OCEAN=OCEAN, 
-                                            evaluator = "dao_treasury",
-                                            research_type='private',
-                                            receiving_agents = {"market": 1.0})
-        state.addAgent(new_agent)
-        state.addResearcherAgent(new_agent)
-        self.agents_generated += 1
+        self._spawnResearchers(state, 1)
     
     def _createExpVersatileResearcherAgent(self, state) -> None:
-        for i in range(self.last_generated + 1):
-            name = f'new_researcher_{self.generated_agents_idx}'
-            self.generated_agents_idx += 1
-            USD = 0.0 # magic number
-            OCEAN = 200000.0 # same as other researchers
-            new_agent = VersatileResearcherAgent(name=name, USD=USD, OCEAN=OCEAN, 
-                                                evaluator = "dao_treasury",
-                                                research_type='private',
-                                                receiving_agents = {"market": 1.0})
-            state.addAgent(new_agent)
-            state.addResearcherAgent(new_agent)
-            self.agents_generated += 1
+        self._spawnResearchers(state, self.last_generated + 1)
         self.last_generated += 1
 
     def _createDecVersatileResearcherAgent(self, state) -> None:
         if self.start_gen <= 1:
             return
-        for i in range(self.start_gen):
-            name = f'new_researcher_{self.generated_agents_idx}'
+        self._spawnResearchers(state, self.start_gen)
+        self.start_gen -= 1
+
+    def _spawnResearchers(self, state, n: int) -> None:
+        """Add n new researchers, funding their wallets in one batch"""
+        specs = []
+        for i in range(n):
+            specs.append(dict(name=f'new_researcher_{self.generated_agents_idx}',
+                              USD=0.0, # magic number
+                              OCEAN=200000.0, # same as other researchers
+                              evaluator="dao_treasury",
+                              research_type='private',
+                              receiving_agents={"market": 1.0}))
             self.generated_agents_idx += 1
-            USD = 0.0 # magic number
-            OCEAN = 200000.0 # same as other researchers
-            new_agent = VersatileResearcherAgent(name=name, USD=USD, OCEAN=OCEAN, 
-                                                evaluator = "dao_treasury",
-                                                research_type='private',
-                                                receiving_agents = {"market": 1.0})
-            state.addAgent(new_agent)
+        new_agents = state.spawnAgents(VersatileResearcherAgent, specs,
+                                       materialize=True)
+        for new_agent in new_agents:
             state.addResearcherAgent(new_agent)
-            self.agents_generated += 1
-        self.start_gen -= 1
\ No newline at end of file
+        self.agents_generated += n
\ No newline at end of file
@@ -0,0 +1,475 @@
+"""Struct-of-arrays population of public researchers.
+
+Works like n VVersatileResearcherAgents with research_type='public' and no
+proposal_setup. But it holds their state in numpy arrays, and steps all of
+them in one vectorized takeStep(). That scales to 10,000s of researchers.
+
+Each member is still an agent: a ResearcherView, to put in state.agents
+under its own name. Views read & write the population's arrays, so the DAO
+treasury and markets use them like VVersatileResearcherAgents. Views are
+never stepped themselves.
+
+Members' OCEAN is pooled at the population's own address, and the arrays
+say how much of it is whose. So count either the population's OCEAN() or
+its members', not both.
+
+Random draws use numpy's global RNG. So runs are reproducible given
+numpy.random.seed(), but differ from runs with VVersatileResearcherAgents.
+"""
+import logging
+log = logging.getLogger('agents')
+
+from enforce_typing import enforce_types
+import numpy
+
+from assets.agents.opsci_pp_agents.ResearchProject import ResearchProject
+from engine.AgentBase import AgentBase, NEVER_WAKE
+from engine.AgentWallet import AgentWallet
+from web3tools.web3util import fromBase18, toBase18
+
+PUBLIC_ASSET_TYPES = ['data', 'algo']
+ASSETS_TO_BUY = ['data', 'compute']
+NO_RESEARCHERS = 10 #per proposal
+
+@enforce_types
+class ResearcherPopulation(AgentBase):
+    def __init__(self, name: str, n: int, USD: float, OCEAN: float,
+                 evaluator: str, receiving_agents: dict,
+                 member_name_format: str = "researcher%x"):
+        """
+        :param: n: number of researchers
+        :param: USD, OCEAN: initial holdings of *each* researcher
+        :param: evaluator: name of the DAO treasury agent
+        :param: member_name_format: member i is named member_name_format % i
+        """
+        super().__init__(name, 0.0, OCEAN * n)
+        self._evaluator = evaluator
+        self._receiving_agents = receiving_agents
+
+        self.names: list = [member_name_format % i for i in range(n)]
+        self._index: dict = {name: i for i, name in enumerate(self.names)}
+        self._asset_type = numpy.random.randint(len(PUBLIC_ASSET_TYPES), size=n)
+
+        #members' holdings. OCEAN sums to self.OCEAN(); USD isn't pooled
+        self._USD = numpy.full(n, USD)
+        self._OCEAN = numpy.full(n, OCEAN)
+
+        #current proposal, where has_proposal
+        self.has_proposal = numpy.zeros(n, dtype=bool)
+        self.grant_requested = numpy.zeros(n)
+        self.salary = numpy.zeros(n)
+        self.assets_generated = numpy.zeros(n, dtype=int)
+        self.proposal_time = numpy.zeros(n, dtype=int) #ticks
+        self.proposal_knowledge_access = numpy.zeros(n)
+        self.integration = numpy.zeros(n)
+        self.novelty = numpy.zeros(n)
+        self.impact = numpy.zeros(n)
+        self.continuing = numpy.zeros(n, dtype=bool)
+        self._proposed_before = numpy.zeros(n, dtype=bool)
+
+        #research lifecycle
+        self.knowledge_access = numpy.ones(n)
+        self.ticks_since_proposal = numpy.zeros(n, dtype=int)
+        self.proposal_accepted = numpy.zeros(n, dtype=bool)
+        self.research_finished = numpy.zeros(n, dtype=bool)
+        self.new_proposal = numpy.zeros(n, dtype=bool)
+
+        #metrics to track
+        self.my_OCEAN = numpy.full(n, OCEAN)
+        self.spent_at_tick = numpy.zeros(n)
+        self.no_proposals_submitted = numpy.zeros(n, dtype=int)
+        self.no_proposals_funded = numpy.zeros(n, dtype=int)
+        self.total_research_funds_received = numpy.zeros(n)
+        self.total_assets_in_mrkt = numpy.zeros(n, dtype=int)
+
+        #spending in this step, for the markets. See last_OCEAN_spent
+        self.last_tick_spent = numpy.zeros(n, dtype=int)
+        self.ratio_funds_to_publish = numpy.zeros(n)
+        self.OCEAN_spent_this_tick = numpy.zeros(n)
+        self._spent = numpy.zeros(n, dtype=bool)
+        self._spent_asset = numpy.zeros(n, dtype=int) #into ASSETS_TO_BUY
+        self._spent_publish = numpy.zeros(n, dtype=bool)
+
+        self._views = [ResearcherView(self, i) for i in range(n)]
+        self._member_names = frozenset(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self._index
+
+    def views(self) -> list:
+        """Members as agents, in order"""
+        return self._views
+
+    def view(self, name: str):
+        return self._views[self._index[name]]
+
+    #=======================================================================
+    #queries, for the DAO treasury & KPIs. O(n) in numpy, not python
+    def allHaveProposals(self) -> bool:
+        return bool(self.has_proposal.all())
+
+    def numAccepted(self) -> int:
+        return int(self.proposal_accepted.sum())
+
+    def totalOCEAN(self) -> float:
+        return float(self._OCEAN.sum())
+
+    def proposalScores(self, skip_names: list) -> dict:
+        """name : score, like VVersatileDAOTreasuryAgent.evaluateProposal().
+        Lower is better. Excludes skip_names"""
+        cont_weight = numpy.where(self.continuing, 0.6, 1.0)
+        scores = cont_weight * (self.grant_requested / NO_RESEARCHERS / \
+                                self.assets_generated / \
+                                self.proposal_time / \
+                                self.proposal_knowledge_access)
+        keep = numpy.ones(len(self), dtype=bool)
+        for name in skip_names:
+            if name in self._index:
+                keep[self._index[name]] = False
+        return {self.names[i]: float(scores[i])
+                for i in numpy.flatnonzero(keep)}
+
+    #=======================================================================
+    #what takeStep() reads & writes, for SimStrategy.parallel_agents.
+    # Members' state is the population's, so their names count too
+    def readSet(self, state):
+        return self._member_names | {self.name, self._evaluator}
+
+    def writeSet(self, state):
+        return self._member_names | {self.name, 'numpy.random', 'projects',
+                                     'public_market'} | \
+            set(self._receiving_agents)
+
+    def takeStep(self, state) -> None:
+        self.OCEAN_spent_this_tick[:] = 0.0
+        self._spent[:] = False
+        self._checkIfFunded(state)
+
+        #proposal functionality
+        idle = numpy.flatnonzero(~self.has_proposal)
+        self._createProposals(idle)
+        self.no_proposals_submitted[idle] += 1
+        self.ticks_since_proposal[idle] = 0
+
+        #everyone has a proposal now. Track research progress of winners
+        self.ticks_since_proposal += 1
+        done = self.proposal_accepted & \
+            (self.ticks_since_proposal == self.proposal_time)
+        self.research_finished[done] = True
+        self.has_proposal[done] = False
+        self.proposal_accepted[done] = False
+
+        self.my_OCEAN[:] = self._OCEAN
+        self.spent_at_tick[:] = self._OCEAN
+
+        for i in numpy.flatnonzero(self._USD > 0):
+            self._disburseUSD(state, int(i))
+
+    def _checkIfFunded(self, state) -> None:
+        treasury = state.getAgent(self._evaluator)
+        prop_eval = treasury.proposal_evaluation
+        full_proposal = len(prop_eval) == state.ss.PROPOSALS_FUNDED_AT_A_TIME
+        if (prop_eval == {}) or not full_proposal:
+            return
+
+        #only researchers whose proposal isn't accepted yet
+        deciding = ~self.proposal_accepted
+        self.new_proposal[deciding] = False
+        is_winner = numpy.zeros(len(self), dtype=bool)
+        for evaluation in prop_eval.values():
+            if evaluation['winner'] in self._index:
+                is_winner[self._index[evaluation['winner']]] = True
+
+        for i in numpy.flatnonzero(deciding & is_winner): #few
+            self._acceptProposal(state, int(i))
+
+        #the rest propose anew, and buy assets to improve their odds
+        losers = numpy.flatnonzero(deciding & ~is_winner)
+        self._createProposals(losers)
+        for _ in range(treasury.update):
+            self._buyAssets(state, losers)
+
+    def _acceptProposal(self, state, i: int) -> None:
+        self.proposal_accepted[i] = True
+        self._createResearchProject(state, i)
+        self.ticks_since_proposal[i] = 0
+        self.no_proposals_funded[i] += 1
+        self.total_assets_in_mrkt[i] += self.assets_generated[i]
+        self.total_research_funds_received[i] += self.grant_requested[i]
+        if self._OCEAN[i] >= self.grant_requested[i]:
+            self._buyAndPublishAssets(state, i)
+
+    def _createResearchProject(self, state, i: int) -> None:
+        project_name = f'{self.names[i]}_{self.no_proposals_funded[i]}'
+        state.projects[project_name] = ResearchProject(
+            name=project_name,
+            creator=self.names[i],
+            value=float(self.grant_requested[i]),
+            impact=float(self.impact[i]),
+            integration=float(self.integration[i]),
+            novelty=float(self.novelty[i]))
+
+    def _createProposals(self, idx) -> None:
+        """New random proposals for members idx"""
+        n = len(idx)
+        if n == 0:
+            return
+        self.new_proposal[idx] = True
+        self.research_finished[idx] = False
+
+        time = numpy.random.randint(5000, 15001, size=n) #research length
+        self.salary[idx] = (time / 24 / 30) * 2000 #2000 OCEAN / month
+        self.grant_requested[idx] = \
+            numpy.random.randint(10000, 50001, size=n) + self.salary[idx]
+        self.assets_generated[idx] = numpy.random.randint(1, 11, size=n)
+        self.proposal_time[idx] = time
+        self.continuing[idx] = numpy.random.random(n) < 0.5
+        self.proposal_knowledge_access[idx] = self.knowledge_access[idx]
+
+        first = ~self._proposed_before[idx]
+        self.integration[idx] = _nextTrait(self.integration[idx], first)
+        self.novelty[idx] = _nextTrait(self.novelty[idx], first)
+        self.impact[idx] = 10 * numpy.maximum(self.integration[idx],
+                                              self.novelty[idx])
+        self._proposed_before[idx] = True
+        self.has_proposal[idx] = True
+
+    def _buyAndPublishAssets(self, state, i: int) -> None:
+        asset = numpy.random.randint(len(ASSETS_TO_BUY))
+        self.last_tick_spent[i] = state.tick
+        self.ratio_funds_to_publish[i] = state.ss.RATIO_FUNDS_TO_PUBLISH
+        if (self._OCEAN[i] != 0) and self.has_proposal[i]:
+            OCEAN_DISBURSE = float(self.grant_requested[i] - self.salary[i])
+            self.OCEAN_spent_this_tick[i] += OCEAN_DISBURSE
+            self._recordSpending([i], asset, publish=True)
+            self._spendOCEAN(state, [i], OCEAN_DISBURSE, 'public_market')
+            self.knowledge_access[i] += 1
+
+    def _buyAssets(self, state, idx) -> None:
+        """Each of members idx buys an asset, if it can afford it"""
+        assets = numpy.random.randint(len(ASSETS_TO_BUY), size=len(idx))
+        self.last_tick_spent[idx] = state.tick
+        self.ratio_funds_to_publish[idx] = 0.0 #not publishing
+
+        price = state.ss.PRICE_OF_ASSETS
+        OCEAN = self._OCEAN[idx]
+        can_buy = (OCEAN != 0) & (OCEAN >= price) & self.has_proposal[idx]
+        buyers = idx[can_buy]
+        self.OCEAN_spent_this_tick[buyers] += price
+        self._recordSpending(buyers, assets[can_buy], publish=False)
+        self.knowledge_access[buyers] += 1
+        self.proposal_knowledge_access[buyers] = self.knowledge_access[buyers]
+        self._spendOCEAN(state, buyers, float(price), 'public_market')
+
+    def _recordSpending(self, idx, asset, publish: bool) -> None:
+        self._spent[idx] = True
+        self._spent_asset[idx] = asset
+        self._spent_publish[idx] = publish
+
+    def _spendOCEAN(self, state, idx, amt: float, receiver_name: str):
+        """Each of members idx sends amt OCEAN. One transfer in total"""
+        if len(idx) == 0:
+            return
+        self._OCEAN[idx] -= amt
+        self._transferOCEAN(state.getAgent(receiver_name), amt * len(idx))
+
+    def _debitOCEAN(self, i: int, amt: float) -> None:
+        """Take amt from member i's share, before it leaves the pool"""
+        OCEAN = self._OCEAN[i]
+        if amt > OCEAN * (1.0 + 1e-12):
+            raise ValueError("transfer amt (%s) exceeds OCEAN holdings (%s)"
+                             % (amt, OCEAN))
+        self._OCEAN[i] = max(OCEAN - amt, 0.0)
+
+    def _disburseUSD(self, state, i: int) -> None:
+        USD = float(self._USD[i])
+        if self.has_proposal[i]:
+            view = self._views[i]
+            for name, computePercent in self._receiving_agents.items():
+                view._transferUSD(state.getAgent(name), computePercent * USD)
+
+def _nextTrait(prev, first):
+    """Integration or novelty of a new proposal: uniform over [0,1) for a
+    first proposal, else over the half that the previous one was in"""
+    u = numpy.random.random(len(prev))
+    return numpy.where(first, u,
+                       numpy.where(prev < 0.5, 0.5 * u, 0.5 + 0.5 * u))
+
+def _member(field: str, cast):
+    """Property for a member's entry in a population array"""
+    def fget(self):
+        return cast(getattr(self._population, field)[self._i])
+    def fset(self, value):
+        getattr(self._population, field)[self._i] = value
+    return property(fget, fset)
+
+@enforce_types
+class ResearcherView(AgentBase):
+    """Member i of a ResearcherPopulation, as an agent"""
+    research_type = 'public'
+
+    knowledge_access = _member('knowledge_access', float)
+    ticks_since_proposal = _member('ticks_since_proposal', int)
+    proposal_accepted = _member('proposal_accepted', bool)
+    research_finished = _member('research_finished', bool)
+    new_proposal = _member('new_proposal', bool)
+    my_OCEAN = _member('my_OCEAN', float)
+    no_proposals_submitted = _member('no_proposals_submitted', int)
+    no_proposals_funded = _member('no_proposals_funded', int)
+    total_research_funds_received = \
+        _member('total_research_funds_received', float)
+    total_assets_in_mrkt = _member('total_assets_in_mrkt', int)
+    last_tick_spent = _member('last_tick_spent', int)
+    ratio_funds_to_publish = _member('ratio_funds_to_publish', float)
+    total_OCEAN_spent_this_tick = _member('OCEAN_spent_this_tick', float)
+
+    def __init__(self, population, i: int):
+        #no AgentBase.__init__(): members share the population's wallet
+        self.name = population.names[i]
+        self._population = population
+        self._i = i
+        self._wallet = _MemberWallet(population, i)
+        self._ticks_since_step: int = 1
+        self._wake_state = None
+
+    def takeStep(self, state):
+        pass #the population steps all its members
+
+    def nextWakeTick(self, state) -> int:
+        return NEVER_WAKE
+
+    def spentAtTick(self) -> float:
+        return float(self._population.spent_at_tick[self._i])
+
+    @property
+    def asset_type(self) -> str:
+        return PUBLIC_ASSET_TYPES[self._population._asset_type[self._i]]
+
+    @property
+    def proposal(self) -> dict:
+        """Current proposal, or {}. A copy: changing it changes nothing"""
+        pop, i = self._population, self._i
+        if not pop.has_proposal[i]:
+            return {}
+        return {'grant_requested': float(pop.grant_requested[i]),
+                'assets_generated': int(pop.assets_generated[i]),
+                'no_researchers': NO_RESEARCHERS,
+                'time': int(pop.proposal_time[i]),
+                'knowledge_access': float(pop.proposal_knowledge_access[i]),
+                'integration': float(pop.integration[i]),
+                'novelty': float(pop.novelty[i]),
+                'impact': float(pop.impact[i]),
+                'continuing': bool(pop.continuing[i])}
+
+    @property
+    def last_OCEAN_spent(self) -> dict:
+        """What this member spent in the population's latest step, or {}"""
+        pop, i = self._population, self._i
+        if not pop._spent[i]:
+            return {}
+        return {'tick': int(pop.last_tick_spent[i]),
+                'spent': float(pop.OCEAN_spent_this_tick[i]),
+                'market': 'public_market',
+                'asset_buy': ASSETS_TO_BUY[pop._spent_asset[i]],
+                'publish': bool(pop._spent_publish[i]),
+                'ratio': float(pop.ratio_funds_to_publish[i])}
+
+class _MemberWallet(AgentWallet):
+    """A member's share of its population's wallet. USD and OCEAN are
+    in the population's arrays; OCEAN tokens are at its address.
+
+    Members have no keys, token balances or allowances of their own: each
+    AgentWallet attribute for those is the population wallet's."""
+    def __init__(self, population, i: int):
+        #no AgentWallet.__init__(): no keys to make, no OCEAN to mint
+        self._population = population
+        self._i = i
+        self._total_USD_in: float = float(population._USD[i])
+        self._total_OCEAN_in: float = float(population._OCEAN[i])
+
+    @property
+    def _private_key(self):
+        return self._population._wallet._private_key
+
+    @property
+    def _keys_wallet(self):
+        return self._population._wallet._keys_wallet
+
+    def _keys(self):
+        return self._population._wallet._keys()
+
+    @property
+    def _web3wallet(self):
+        return self._population._wallet._web3wallet
+
+    @property
+    def _unminted_OCEAN_base(self):
+        return self._population._wallet._unminted_OCEAN_base
+
+    @property
+    def _cached_OCEAN_base(self):
+        return self._population._wallet._cached_OCEAN_base
+
+    @property
+    def _cached_tokens_base(self) -> dict:
+        return self._population._wallet._cached_tokens_base
+
+    @property
+    def _allowances_base(self) -> dict:
+        return self._population._wallet._allowances_base
+
+    @property
+    def _USD(self) -> float:
+        return float(self._population._USD[self._i])
+
+    @_USD.setter
+    def _USD(self, value: float):
+        self._population._USD[self._i] = value
+
+    def OCEAN(self) -> float:
+        return float(self._population._OCEAN[self._i])
+
+    def _OCEAN_base(self) -> int:
+        return toBase18(self.OCEAN())
+
+    def _OCEANisCached(self) -> bool:
+        return True #in the arrays
+
+    def _primeOCEAN_base(self, OCEAN_base: int) -> None:
+        self._population._wallet._primeOCEAN_base(OCEAN_base)
+
+    def _changedOCEAN_base(self, delta_base) -> None:
+        """After a pool trade: it's all this member's. None = unknown, so
+        it's the change in the population's balance"""
+        pop_wallet = self._population._wallet
+        if delta_base is None:
+            pop_wallet.resetCachedInfo()
+            delta = pop_wallet.OCEAN() - self._population.totalOCEAN()
+        else:
+            pop_wallet._changedOCEAN_base(delta_base)
+            delta = fromBase18(delta_base)
+        self._population._OCEAN[self._i] += delta
+
+    def resetCachedInfo(self):
+        self._population._wallet.resetCachedInfo()
+
+    def _isMaterialized(self) -> bool:
+        return self._population._wallet._isMaterialized()
+
+    def _materialize(self) -> None:
+        self._population._wallet._materialize()
+
+    def _receiveVirtualOCEAN_base(self, amt_base: int) -> None:
+        self._population._wallet._receiveVirtualOCEAN_base(amt_base)
+
+    def transferOCEAN(self, dst_wallet, amt: float) -> None:
+        self._population._debitOCEAN(self._i, amt)
+        self._population._wallet.transferOCEAN(dst_wallet, amt)
+
+    def _receivedOCEAN(self, amt: float) -> None:
+        self._population._OCEAN[self._i] += amt
+        self._total_OCEAN_in += amt
+        self.resetCachedInfo()
@@ -6,6 +6,8 @@ from typing import List, Dict
 import math
 
 from engine.AgentBase import AgentBase
+from engine.TickHistory import TickHistory
+from util import timing
 from util.constants import S_PER_MONTH
 # Note: TICKS_BETWEEN_PROPOSALS should not be in constants but rather in SimStrategy
 
@@ -25,8 +27,9 @@ class VVersatileDAOTreasuryAgent(AgentBase):
         self._receiving_agents = receiving_agents
 
         #track amounts over time
-        self._USD_per_tick: List[float] = [] #the next tick will record what's in self
-        self._OCEAN_per_tick: List[float] = [] # ""
+        #the next tick will record what's in self. Keep the last month
+        self._USD_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
+        self._OCEAN_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
         self.integration: float = 0.0
         self.novelty: float = 0.0
         self.in_index: float = 0.0
@@ -42,6 +45,7 @@ class VVersatileDAOTreasuryAgent(AgentBase):
         # metrics to track (and to cross-correlate with ResearcherAgents)
         self.total_research_funds_disbursed: float = 0.0
 
+    @timing.timed('methods')
     def evaluateProposal(self, state) -> None:
         '''
         Function that evaluates proposals from all researcher agents.
@@ -58,21 +62,26 @@ class VVersatileDAOTreasuryAgent(AgentBase):
         '''            
         scores = {}
         self.proposal_evaluation_update = {}
+        population = _population(state)
 
         # Ensure that scores and names consist of research proposals NOT currently funded
-        for name in state.public_researchers.keys():
-            # I don't want to fund proposals that are already in proposal_evaluation
-            if self.proposal_evaluation != {}:
-                skipping_rs = [r['winner'] for r in list(self.proposal_evaluation.values())]
-                if name in skipping_rs:
-                    continue
-            agent = state.getAgent(name)
-            cont_weight = 0.6 if agent.proposal['continuing'] else 1.0
-            scores[name] = cont_weight * (agent.proposal['grant_requested'] / \
-                              agent.proposal['no_researchers'] /  \
-                              agent.proposal['assets_generated'] / \
-                              agent.proposal['time'] / \
-                              agent.proposal['knowledge_access'])
+        if population is not None:
+            skipping_rs = [r['winner'] for r in list(self.proposal_evaluation.values())]
+            scores = population.proposalScores(skipping_rs)
+        else:
+            for name in state.public_researchers.keys():
+                # I don't want to fund proposals that are already in proposal_evaluation
+                if self.proposal_evaluation != {}:
+                    skipping_rs = [r['winner'] for r in list(self.proposal_evaluation.values())]
+                    if name in skipping_rs:
+                        continue
+                agent = state.getAgent(name)
+                cont_weight = 0.6 if agent.proposal['continuing'] else 1.0
+                scores[name] = cont_weight * (agent.proposal['grant_requested'] / \
+                                  agent.proposal['no_researchers'] /  \
+                                  agent.proposal['assets_generated'] / \
+                                  agent.proposal['time'] / \
+                                  agent.proposal['knowledge_access'])
 
         start_idx = (list(self.proposal_evaluation.keys())[-1] + 1) if self.proposal_evaluation else 0
         for i in range(start_idx, start_idx + state.ss.PROPOSALS_FUNDED_AT_A_TIME): # ensures unique indeces for the evaluation
@@ -80,6 +89,7 @@ class VVersatileDAOTreasuryAgent(AgentBase):
             self.proposal_evaluation[i] = {'winner': winner, 'amount': state.getAgent(winner).proposal['grant_requested'],
                                           'integration': state.getAgent(winner).proposal['integration'], 'novelty': state.getAgent(winner).proposal['novelty'],
                                           'impact': state.getAgent(winner).proposal['impact']}
+            self._logAction('evaluateProposal', self.proposal_evaluation[i])
             del scores[winner]
 
             # immediately disburse funds to new winner
@@ -113,6 +123,9 @@ class VVersatileDAOTreasuryAgent(AgentBase):
                 del self.proposal_evaluation[i]
 
     def proposalsReady(self, state):
+        population = _population(state)
+        if population is not None:
+            return population.allHaveProposals()
         if all((state.getAgent(name).proposal != {}) for name in state.public_researchers.keys()):
             self._proposals_to_evaluate = [state.getAgent(name).proposal for name in state.public_researchers.keys()]
             return True
@@ -136,14 +149,21 @@ class VVersatileDAOTreasuryAgent(AgentBase):
             self.evaluateProposal(state)
 
         #record what we had up until this point
+        if self._USD_per_tick.needsTimeStep(): #first step
+            self._USD_per_tick.setTimeStep(state.ss.time_step)
+            self._OCEAN_per_tick.setTimeStep(state.ss.time_step)
         self._USD_per_tick.append(self.USD())
         self._OCEAN_per_tick.append(self.OCEAN())
 
         # debugging
         total_proposal_accepted = 0
-        for researcher in state.public_researchers.keys():
-            if state.getAgent(researcher).proposal_accepted == True:
-                total_proposal_accepted += 1
+        population = _population(state)
+        if population is not None:
+            total_proposal_accepted = population.numAccepted()
+        else:
+            for researcher in state.public_researchers.keys():
+                if state.getAgent(researcher).proposal_accepted == True:
+                    total_proposal_accepted += 1
         if total_proposal_accepted > 0:
             assert(total_proposal_accepted <= state.ss.PROPOSALS_FUNDED_AT_A_TIME)
 
@@ -154,4 +174,8 @@ class VVersatileDAOTreasuryAgent(AgentBase):
         self._transferOCEAN(agent, OCEAN)
 
     def _getINindex(self) -> None:
-        self.in_index = self.integration * self.novelty
\ No newline at end of file
+        self.in_index = self.integration * self.novelty
+
+def _population(state):
+    """The ResearcherPopulation holding all public researchers, if any"""
+    return getattr(state, 'researcher_population', None)
@@ -154,13 +154,17 @@ class VVersatileResearcherAgent(AgentBase):
             self.proposal['knowledge_access'] = self.knowledge_access
             self._transferOCEAN(state.getAgent('public_market'), OCEAN_DISBURSE)
 
-    def _checkIfFunded(self, state) -> None:
+    def _fundingDecided(self, state) -> bool:
+        """Has the DAOTreasury evaluated the proposals, while mine isn't accepted?"""
         prop_eval = state.getAgent(self._evaluator).proposal_evaluation
         full_proposal: bool = len(prop_eval) == state.ss.PROPOSALS_FUNDED_AT_A_TIME
+        return (prop_eval != {}) and (not self.proposal_accepted) and full_proposal
+
+    def _checkIfFunded(self, state) -> None:
         # Checking if proposal accepted (should only be checked if the DAOTreasury evaluated the proposals and I am not a winner:
-        if (prop_eval != {}) and (not self.proposal_accepted) and full_proposal:
+        if self._fundingDecided(state):
             self.new_proposal = False
-            prop_evaluation = prop_eval
+            prop_evaluation = state.getAgent(self._evaluator).proposal_evaluation
             # if I am the winner, send the funds received to KnowledgeMarket
             if any((prop_evaluation[i]['winner'] == self.name) for i in prop_evaluation.keys()):
                 self.proposal_accepted = True
@@ -172,7 +176,7 @@ class VVersatileResearcherAgent(AgentBase):
                 if self.OCEAN() >= self.proposal['grant_requested']:
                     self._BuyAndPublishAssets(state)
             else:
-                assert(all((prop_evaluation[i]['winner'] != self.name)for i in prop_eval.keys()))
+                assert(all((prop_evaluation[i]['winner'] != self.name)for i in prop_evaluation.keys()))
                 self.proposal_accepted = False # this is kind of useless
                 self.proposal = self.createProposal(state) # just create new proposal to make sure we have the random element
                 if state.getAgent(self._evaluator).update > 0:
@@ -294,6 +298,25 @@ class VVersatileResearcherAgent(AgentBase):
 
         return market, asset_to_buy
 
+    #what takeStep() reads & writes, for SimStrategy.parallel_agents.
+    # Public researchers mostly just count ticks: they only draw random
+    # numbers, pay the public market and add projects when funding is
+    # decided or they need a new proposal. Others may do anything (None)
+    def readSet(self, state):
+        if self.research_type != 'public' or self.proposal_setup is not None:
+            return None #proposal_setup may be shared
+        return frozenset([self.name, self._evaluator])
+
+    def writeSet(self, state):
+        if self.research_type != 'public' or self.proposal_setup is not None:
+            return None
+        names = {self.name}
+        if self._fundingDecided(state) or self.proposal == {}:
+            names |= {'random', 'public_market', 'projects'}
+        if self.USD() > 0:
+            names |= set(self._receiving_agents)
+        return frozenset(names)
+
     def takeStep(self, state):
         self.last_OCEAN_spent = {}
 
@@ -6,6 +6,8 @@ from typing import List, Dict
 import math
 
 from engine.AgentBase import AgentBase
+from engine.TickHistory import TickHistory
+from util import timing
 from util.constants import S_PER_MONTH
 # Note: TICKS_BETWEEN_PROPOSALS should not be in constants but rather in SimStrategy
 
@@ -25,8 +27,9 @@ class VersatileDAOTreasuryAgent(AgentBase):
         self._receiving_agents = receiving_agents
 
         #track amounts over time
-        self._USD_per_tick: List[float] = [] #the next tick will record what's in self
-        self._OCEAN_per_tick: List[float] = [] # ""
+        #the next tick will record what's in self. Keep the last month
+        self._USD_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
+        self._OCEAN_per_tick = TickHistory('window', n_seconds=S_PER_MONTH)
         self.integration: float = 0.0
         self.novelty: float = 0.0
         self.in_index: float = 0.0
@@ -42,6 +45,7 @@ class VersatileDAOTreasuryAgent(AgentBase):
         # metrics to track (and to cross-correlate with ResearcherAgents)
         self.total_research_funds_disbursed: float = 0.0
 
+    @timing.timed('methods')
     def evaluateProposal(self, state) -> None:
         '''
         Function that evaluates proposals from all researcher agents.
@@ -79,6 +83,7 @@ class VersatileDAOTreasuryAgent(AgentBase):
             self.proposal_evaluation[i] = {'winner': winner, 'amount': state.getAgent(winner).proposal['grant_requested'],
                                           'integration': state.getAgent(winner).proposal['integration'], 'novelty': state.getAgent(winner).proposal['novelty'],
                                           'impact': state.getAgent(winner).proposal['impact']}
+            self._logAction('evaluateProposal', self.proposal_evaluation[i])
             del scores[winner]
 
             # immediately disburse funds to new winner
@@ -135,6 +140,9 @@ class VersatileDAOTreasuryAgent(AgentBase):
             self.evaluateProposal(state)
 
         #record what we had up until this point
+        if self._USD_per_tick.needsTimeStep(): #first step
+            self._USD_per_tick.setTimeStep(state.ss.time_step)
+            self._OCEAN_per_tick.setTimeStep(state.ss.time_step)
         self._USD_per_tick.append(self.USD())
         self._OCEAN_per_tick.append(self.OCEAN())
 
@@ -7,6 +7,7 @@ from util.constants import S_PER_DAY
 
 class SimStrategy(SimStrategyBase.SimStrategyBase):
     def __init__(self):
+        super().__init__()
         pass
 
 class SimState(SimStateBase.SimStateBase):
@@ -27,6 +27,7 @@ from util.constants import S_PER_DAY
 
 class SimStrategy(SimStrategyBase.SimStrategyBase):
     def __init__(self):
+        super().__init__()
         self.TICKS_BETWEEN_PROPOSALS = 2
         self.PRICE_OF_ASSETS = 1
         self.RATIO_FUNDS_TO_PUBLISH = 1
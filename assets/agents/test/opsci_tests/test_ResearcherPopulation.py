@@ -0,0 +1,197 @@
+from enforce_typing import enforce_types
+import numpy
+import pytest
+
+from assets.agents.opsci_pp_agents.ResearcherPopulation import \
+    ResearcherPopulation, ResearcherView
+from assets.agents.opsci_pp_agents.VVersatileDAOTreasuryAgent import VVersatileDAOTreasuryAgent
+from assets.agents.opsci_pp_agents.PublicMarketAgent import PublicKnowledgeMarketAgent
+from engine import AgentBase, SimStateBase, SimStrategyBase
+from engine.AgentWallet import AgentWallet
+from web3engine import globaltokens
+from web3tools.web3util import toBase18
+
+class SimStrategy(SimStrategyBase.SimStrategyBase):
+    def __init__(self):
+        super().__init__()
+        self.PROPOSALS_FUNDED_AT_A_TIME = 2
+        self.PRICE_OF_ASSETS = 1000
+        self.FUNDING_BOUNDARY = 10000
+        self.RATIO_FUNDS_TO_PUBLISH = 0.4
+
+class SimState(SimStateBase.SimStateBase):
+    def __init__(self, n: int):
+        super().__init__()
+        self.ss = SimStrategy()
+        self.projects: dict = {}
+        self.researcher_population = ResearcherPopulation(
+            "pop", n, USD=0.0, OCEAN=100000.0, evaluator="dao",
+            receiving_agents={"market": 1.0})
+        self.addAgent(VVersatileDAOTreasuryAgent("dao", USD=0.0, OCEAN=1e6))
+        self.addAgent(self.researcher_population)
+        for view in self.researcher_population.views():
+            self.addAgent(view)
+        self.addAgent(PublicKnowledgeMarketAgent(
+            "public_market", USD=0.0, OCEAN=0.0,
+            transaction_fees_percentage=0.1,
+            fee_receiving_agents={"dao": 1.0}))
+        self.researchers = {view.name: view
+                            for view in self.researcher_population.views()}
+        self.public_researchers = dict(self.researchers)
+
+        class SimpleKPIs:
+            def takeStep(self, state):
+                pass
+        self.kpis = SimpleKPIs()
+
+@enforce_types
+def _totalOCEAN(state) -> float:
+    return sum(agent.OCEAN() for agent in state.agents.values()
+               if agent.name != "pop")
+
+@enforce_types
+def test_views():
+    globaltokens.setBackend('ledger')
+    numpy.random.seed(1)
+    state = SimState(n=4)
+    pop = state.researcher_population
+    assert len(pop) == 4 and "researcher3" in pop and "researcher4" not in pop
+
+    r0 = state.getAgent("researcher0")
+    assert isinstance(r0, ResearcherView) and isinstance(r0, AgentBase.AgentBase)
+    assert pop.view("researcher0") is r0
+    assert r0.OCEAN() == 100000.0
+    assert pop.totalOCEAN() == 400000.0
+    assert pop.OCEAN() == pytest.approx(400000.0) #pooled
+    assert r0.proposal == {} and r0.last_OCEAN_spent == {}
+    assert r0.asset_type in ['data', 'algo']
+
+    #views write through to the arrays
+    r0.knowledge_access = 3.0
+    assert pop.knowledge_access[0] == 3.0
+
+    #members send & receive OCEAN like other agents
+    dao, market = state.getAgent("dao"), state.getAgent("public_market")
+    dao._transferOCEAN(r0, 10.0)
+    assert r0.OCEAN() == 100010.0
+    r0._transferOCEAN(market, 20.0)
+    r0._transferOCEAN(state.getAgent("researcher1"), 30.0)
+    assert r0.OCEAN() == 99960.0
+    assert state.getAgent("researcher1").OCEAN() == 100030.0
+    assert market.OCEAN() == 20.0
+    assert pop.totalOCEAN() == 399990.0
+    assert pop.OCEAN() == pytest.approx(399990.0)
+    with pytest.raises(ValueError):
+        r0._transferOCEAN(market, 1e6)
+
+@enforce_types
+def test_takeStep():
+    globaltokens.setBackend('ledger')
+    numpy.random.seed(2)
+    state = SimState(n=6)
+    pop = state.researcher_population
+    dao = state.getAgent("dao")
+    OCEAN0 = _totalOCEAN(state)
+
+    state.takeStep() #everyone proposes
+    state.tick += 1
+    assert pop.allHaveProposals() and pop.numAccepted() == 0
+    assert list(pop.no_proposals_submitted) == [1] * 6
+    scores = pop.proposalScores([])
+    for name, score in scores.items():
+        p = state.getAgent(name).proposal
+        cont_weight = 0.6 if p['continuing'] else 1.0
+        assert score == pytest.approx(cont_weight * p['grant_requested'] / \
+            p['no_researchers'] / p['assets_generated'] / p['time'] / \
+            p['knowledge_access'])
+
+    state.takeStep() #dao funds the 2 best, who then publish
+    state.tick += 1
+    winners = [e['winner'] for e in dao.proposal_evaluation.values()]
+    assert sorted(winners, key=scores.get) == \
+        sorted(scores, key=scores.get)[:2]
+    assert pop.numAccepted() == 2
+    for name in winners:
+        r = state.getAgent(name)
+        assert r.proposal_accepted and r.no_proposals_funded == 1
+        assert r.last_OCEAN_spent['publish']
+        assert r.knowledge_access == 2.0
+    assert len(state.projects) == 2
+    assert state.getAgent("public_market").total_knowledge_assets > 0
+
+    for _ in range(5):
+        state.takeStep()
+        state.tick += 1
+    assert pop.numAccepted() == 2
+    assert pop.OCEAN() == pytest.approx(pop.totalOCEAN())
+    assert _totalOCEAN(state) == pytest.approx(OCEAN0)
+
+class _FakeToken:
+    """DT / BPT stand-in: balances by address, approvals counted"""
+    def __init__(self, address: str):
+        self.address = address
+        self.balances: dict = {}
+        self.n_approves = 0
+
+    def balanceOf_base(self, address: str) -> int:
+        return self.balances.get(address, 0)
+
+    def approve(self, spender_address, amt_base, from_wallet):
+        self.n_approves += 1
+
+class _FakePool(_FakeToken):
+    """Swaps DT 1:1 for OCEAN. Receipts don't say amounts (None)"""
+    def swapExactAmountIn(self, tokenIn_address, tokenAmountIn_base,
+                          tokenOut_address, minAmountOut_base,
+                          maxPrice_base, from_wallet):
+        self.DT.balances[from_wallet.address] -= tokenAmountIn_base
+        globaltokens.mintOCEAN(from_wallet.address, tokenAmountIn_base)
+        return (None, None)
+
+    def swapAmountsFromReceipt(self, tx_receipt):
+        return None
+
+@enforce_types
+def test_memberWallet():
+    globaltokens.setBackend('ledger')
+    numpy.random.seed(3)
+    state = SimState(n=2)
+    pop = state.researcher_population
+    r0, r1 = state.getAgent("researcher0"), state.getAgent("researcher1")
+    wallet = r0._wallet
+
+    #every AgentWallet attribute is there, from the population's wallet
+    for attr in vars(AgentWallet(USD=1.0, OCEAN=1.0)):
+        getattr(wallet, attr)
+    assert wallet._address == pop._wallet._address
+    assert wallet._allowances_base is pop._wallet._allowances_base
+
+    #USD & OCEAN are the member's own
+    wallet.depositUSD(5.0)
+    wallet.withdrawUSD(2.0)
+    assert r0.USD() == 3.0 and r1.USD() == 0.0 and wallet.totalUSDin() == 5.0
+    wallet.depositOCEAN(10.0)
+    wallet.withdrawOCEAN(30.0)
+    assert r0.OCEAN() == 99980.0 and r1.OCEAN() == 100000.0
+    assert pop.OCEAN() == pytest.approx(pop.totalOCEAN())
+    assert "OCEAN=99980" in str(wallet)
+
+    #allowances are shared with the population: one approve
+    token = _FakeToken("0xtoken")
+    wallet.ensureAllowance(token, "0xspender", 1.0)
+    r1._wallet.ensureAllowance(token, "0xspender", 1.0)
+    assert token.n_approves == 1
+
+    #pool trades: proceeds go to the member who traded
+    DT, pool = _FakeToken("0xDT"), _FakePool("0xpool")
+    pool.DT = DT
+    DT.balances[wallet._address] = toBase18(50.0)
+    assert wallet.DT(DT) == 50.0 == r1._wallet.DT(DT)
+    wallet.sellDT(pool, DT, 20.0)
+    assert wallet.DT(DT) == 30.0
+    assert r0.OCEAN() == pytest.approx(100000.0)
+    assert r1.OCEAN() == 100000.0
+    assert pop.OCEAN() == pytest.approx(pop.totalOCEAN())
+    wallet._changedOCEAN_base(toBase18(-1.0)) #e.g. a known buy
+    assert r0.OCEAN() == pytest.approx(99999.0)
+    assert pop.OCEAN() == pytest.approx(pop.totalOCEAN())
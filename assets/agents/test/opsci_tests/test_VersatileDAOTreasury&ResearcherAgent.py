@@ -8,6 +8,7 @@ from util.constants import S_PER_DAY
 
 class SimStrategy(SimStrategyBase.SimStrategyBase):
     def __init__(self):
+        super().__init__()
         self.PROPOSALS_FUNDED_AT_A_TIME = 1
         self.PRICE_OF_ASSETS = 1
         self.FUNDING_BOUNDARY = 0
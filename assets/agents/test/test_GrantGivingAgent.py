@@ -1,7 +1,7 @@
 from enforce_typing import enforce_types
 
 from assets.agents.GrantGivingAgent import GrantGivingAgent
-from engine import AgentBase, SimStateBase, SimStrategyBase
+from engine import AgentBase, KPIsBase, SimStateBase, SimStrategyBase
 from util.constants import S_PER_DAY
 
 class SimStrategy(SimStrategyBase.SimStrategyBase):
@@ -76,3 +76,29 @@ def test1():
 
     assert g1.OCEAN() == (1.0 - 1.0*4/4) 
     assert a1.OCEAN() == (0.0 + 1.0*4/4)
+
+@enforce_types
+def test_nextWakeTick():
+    ss = SimStrategy()
+    ss.setTokenBackend('ledger') #no need for EVM here
+    ss.time_step = S_PER_DAY
+    state = SimState(ss)
+    state.kpis = KPIsBase.KPIsBase(ss.time_step)
+
+    class SimpleAgent(AgentBase.AgentBase):
+        def takeStep(self, state):
+            pass
+    state.agents["a1"] = a1 = SimpleAgent("a1", 0.0, 0.0)
+    state.agents["g1"] = GrantGivingAgent(
+        "g1", USD=0.0, OCEAN=1.0,
+        receiving_agent_name="a1",
+        s_between_grants=S_PER_DAY*3, n_actions=4)
+
+    #same disbursals as test1, but g1 only gets stepped when due
+    OCEANs = []
+    for tick in range(11):
+        state.takeStep(); state.tick += 1
+        OCEANs.append(a1.OCEAN())
+    assert OCEANs == [0.25, 0.25, 0.25, 0.5, 0.5, 0.5, 0.75, 0.75, 0.75,
+                      1.0, 1.0]
+    assert state.getAgent("g1").nextWakeTick(state) == 12
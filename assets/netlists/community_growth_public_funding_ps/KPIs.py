@@ -93,17 +93,23 @@ class KPIs(KPIsBase.KPIsBase):
 
 
     def _getTotalValues(self, state):
+        state.balancesOf() #prime OCEAN caches in one batch read
         treasury_OCEAN = state.getAgent('dao_treasury').OCEAN()
 
         researcher_OCEAN = 0.0
         public_researcher_OCEAN = 0.0
         private_researcher_OCEAN = 0.0
-        for r in state.researchers.keys():
-            researcher_OCEAN += state.getAgent(r).OCEAN()
-        for r in state.public_researchers.keys():
-            public_researcher_OCEAN += state.getAgent(r).OCEAN()
         for r in state.private_researchers.keys():
             private_researcher_OCEAN += state.getAgent(r).OCEAN()
+        if state.researcher_population is not None:
+            # all public researchers; the rest are private
+            public_researcher_OCEAN = state.researcher_population.totalOCEAN()
+            researcher_OCEAN = public_researcher_OCEAN + private_researcher_OCEAN
+        else:
+            for r in state.researchers.keys():
+                researcher_OCEAN += state.getAgent(r).OCEAN()
+            for r in state.public_researchers.keys():
+                public_researcher_OCEAN += state.getAgent(r).OCEAN()
 
         markets_OCEAN = state.getAgent('private_market').OCEAN() + state.getAgent('public_market').OCEAN()
 
@@ -8,6 +8,7 @@ from assets.agents.opsci_pp_agents.VVersatileDAOTreasuryAgent import VVersatileD
 from assets.agents.opsci_pp_agents.PrivateMarketAgent import PrivateKnowledgeMarketAgent
 from assets.agents.opsci_pp_agents.PublicMarketAgent import PublicKnowledgeMarketAgent
 from assets.agents.opsci_pp_agents.ResearcherGenerator import ResearcherGeneratorAgent
+from assets.agents.opsci_pp_agents.ResearcherPopulation import ResearcherPopulation
 from assets.agents.opsci_pp_agents.CommunityAgent import CommunityAgent
 from engine import AgentBase, SimStateBase
 from .KPIs import KPIs
@@ -48,25 +49,36 @@ class SimState(SimStateBase.SimStateBase):
         self.public_researchers: dict = {}
         self.private_researchers: dict = {}
         self.projects: dict = {}
+        self.researcher_population = None # if set, holds all public researchers
 
         #################### Wiring of agents that send OCEAN ####################
         new_agents.append(VVersatileDAOTreasuryAgent(
             name = "dao_treasury", USD=0.0, OCEAN=1000000.0))
 
         # Public researcher agents
-        for i in range(ss.NO_PUBLIC_RESEARCHERS):
-            new_agents.append(VVersatileResearcherAgent(
-                name = "researcher%x" % i, evaluator = "dao_treasury",
-                USD=0.0, OCEAN=10000.0, research_type='public',
-                receiving_agents = {"market": 1.0}))
-            researcher_agents.append(VVersatileResearcherAgent(
-                name = "researcher%x" % i, evaluator = "dao_treasury",
-                USD=0.0, OCEAN=10000.0, research_type='public',
-                receiving_agents = {"market": 1.0}))
-            public_researcher_agents.append(VVersatileResearcherAgent(
-                name = "researcher%x" % i, evaluator = "dao_treasury",
-                USD=0.0, OCEAN=10000.0, research_type='public',
-                receiving_agents = {"market": 1.0}))
+        if ss.RESEARCHER_POPULATION:
+            self.researcher_population = ResearcherPopulation(
+                name = "researcher_population", n = ss.NO_PUBLIC_RESEARCHERS,
+                evaluator = "dao_treasury", USD=0.0, OCEAN=10000.0,
+                receiving_agents = {"market": 1.0})
+            new_agents.append(self.researcher_population)
+            new_agents += self.researcher_population.views()
+            researcher_agents += self.researcher_population.views()
+            public_researcher_agents += self.researcher_population.views()
+        else:
+            for i in range(ss.NO_PUBLIC_RESEARCHERS):
+                new_agents.append(VVersatileResearcherAgent(
+                    name = "researcher%x" % i, evaluator = "dao_treasury",
+                    USD=0.0, OCEAN=10000.0, research_type='public',
+                    receiving_agents = {"market": 1.0}))
+                researcher_agents.append(VVersatileResearcherAgent(
+                    name = "researcher%x" % i, evaluator = "dao_treasury",
+                    USD=0.0, OCEAN=10000.0, research_type='public',
+                    receiving_agents = {"market": 1.0}))
+                public_researcher_agents.append(VVersatileResearcherAgent(
+                    name = "researcher%x" % i, evaluator = "dao_treasury",
+                    USD=0.0, OCEAN=10000.0, research_type='public',
+                    receiving_agents = {"market": 1.0}))
 
         # don't use private researchers for now to reduce noise
 
@@ -99,8 +111,7 @@ class SimState(SimStateBase.SimStateBase):
 
         new_agents.append(CommunityAgent(name="member", USD=0.0, OCEAN=10000.0))
 
-        for agent in new_agents:
-            self.agents[agent.name] = agent        
+        self.addAgents(new_agents)
 
         for agent in researcher_agents:
             self.researchers[agent.name] = agent
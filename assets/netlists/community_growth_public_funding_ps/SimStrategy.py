@@ -13,6 +13,7 @@ class SimStrategy(SimStrategyBase.SimStrategyBase):
         #===set base-class values we want for this netlist====
         self.setTimeStep(S_PER_HOUR)
         self.setMaxTime(30, 'years') #typical runs: 10 years, 20 years, 150 years
+        self.setTokenBackend('ledger') #only OCEAN moves; no pools or DTs
 
         #===new attributes specific to this netlist===
         # self.TICKS_BETWEEN_PROPOSALS = 6480
@@ -21,6 +22,7 @@ class SimStrategy(SimStrategyBase.SimStrategyBase):
         self.TRANSACTION_FEES = 0.1
         self.FEES_TO_STAKERS = 0.1
         self.NO_PUBLIC_RESEARCHERS = 5
+        self.RESEARCHER_POPULATION = False # if True, public researchers are one vectorized ResearcherPopulation. For 1000s of researchers
         self.NO_PRIVATE_RESEARCHERS = 10
         self.PROPOSALS_FUNDED_AT_A_TIME = 3 # this would be used if FUNDING_TIME_DEPENDENCE = False, <=> funding as projects finish
         self.FUNDING_BOUNDARY = 10000
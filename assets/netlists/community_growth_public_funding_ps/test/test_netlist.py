@@ -0,0 +1,42 @@
+from enforce_typing import enforce_types
+import numpy
+import os
+import random
+
+from .. import netlist
+from engine.SimEngine import SimEngine
+from web3engine import globaltokens
+
+@enforce_types
+def test_readWriteSets():
+    globaltokens.setBackend('ledger')
+    random.seed(1)
+    state = netlist.SimState()
+    r0 = state.getAgent("researcher0")
+    assert r0.readSet(state) == {"researcher0", "dao_treasury"}
+    assert "random" in r0.writeSet(state) #no proposal yet
+
+    state.takeStep()
+    state.tick += 1
+    assert r0.proposal != {}
+    assert r0.writeSet(state) == {"researcher0"} #just counts ticks
+
+@enforce_types
+def test_parallelAgents(tmp_path):
+    globaltokens.setBackend('ledger')
+    for researcher_population in [False, True]:
+        csvs = []
+        for n_threads in [0, 4]:
+            random.seed(2)
+            numpy.random.seed(2)
+            ss = netlist.SimStrategy()
+            ss.setMaxTime(20, 'days')
+            ss.RESEARCHER_POPULATION = researcher_population
+            ss.setParallelAgents(n_threads)
+            state = netlist.SimState(ss)
+            output_dir = os.path.join(str(tmp_path), f"{researcher_population}{n_threads}")
+            SimEngine(state, output_dir, netlist.netlist_createLogData).run()
+            with open(os.path.join(output_dir, 'data.csv'), 'r') as f:
+                csvs.append(f.read())
+
+        assert csvs[0] == csvs[1] #as if stepped one at a time
@@ -44,6 +44,7 @@ class KPIs(KPIsBase.KPIsBase):
         self._relative_value_in_treasury.append(t / system)
 
     def _getTotalValues(self, state):
+        state.balancesOf() #prime OCEAN caches in one batch read
         treasury_OCEAN = state.getAgent('dao_treasury').OCEAN()
 
         researcher_OCEAN = 0.0
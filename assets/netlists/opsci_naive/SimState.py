@@ -80,8 +80,7 @@ class SimState(SimStateBase.SimStateBase):
             receiving_agents = {"sellers" : 1.0}))
 
 
-        for agent in new_agents:
-            self.agents[agent.name] = agent
+        self.addAgents(new_agents)
 
         for agent in researcher_agents:
             self.researchers[agent.name] = agent
@@ -13,6 +13,7 @@ class SimStrategy(SimStrategyBase.SimStrategyBase):
         #===set base-class values we want for this netlist====
         self.setTimeStep(S_PER_HOUR)
         self.setMaxTime(30, 'years') #typical runs: 10 years, 20 years, 150 years
+        self.setTokenBackend('ledger') #only OCEAN moves; no pools or DTs
 
         #===new attributes specific to this netlist===
 
@@ -13,6 +13,7 @@ class SimStrategy(SimStrategyBase.SimStrategyBase):
         #==baseline
         self.setTimeStep(S_PER_HOUR)
         self.setMaxTime(10, 'days')
+        self.setFastForward(True) #agents are idle between grants
 
         #==attributes specific to this netlist
         self.granter_init_OCEAN: float = 1.0
@@ -22,11 +23,11 @@ class SimStrategy(SimStrategyBase.SimStrategyBase):
 @enforce_types
 class SimState(SimStateBase.SimStateBase):
     def __init__(self, ss=None):
-        assert ss is None
         super().__init__(ss)
 
         #ss is defined in this netlist module
-        self.ss = SimStrategy()
+        if self.ss is None:
+            self.ss = SimStrategy()
 
         #wire up the circuit
         granter = GrantGivingAgent.GrantGivingAgent(
@@ -1,7 +1,10 @@
 from enforce_typing import enforce_types
 import inspect
+import os
 
 from .. import netlist
+from engine.SimEngine import SimEngine
+from web3engine import globaltokens
 
 @enforce_types
 def test_scope():
@@ -45,3 +48,18 @@ def test_KPIs():
     assert kpis.tick() == 2
     assert kpis.elapsedTime() == 12*2
     
+
+
+def test_fastForward(tmp_path):
+    globaltokens.setBackend('ledger') #no need for EVM here
+    csvs = []
+    for fast_forward in [False, True]:
+        state = netlist.SimState()
+        state.ss.setFastForward(fast_forward)
+        output_dir = os.path.join(str(tmp_path), str(fast_forward))
+        SimEngine(state, output_dir, netlist.netlist_createLogData).run()
+        with open(os.path.join(output_dir, 'data.csv'), 'r') as f:
+            csvs.append(f.read())
+
+    assert csvs[0] == csvs[1]
+    assert len(csvs[0].splitlines()) == 1 + 11 #header, days 0..10
@@ -15,6 +15,7 @@ class SimStrategy(SimStrategyBase.SimStrategyBase):
         #==baseline
         self.setTimeStep(S_PER_HOUR)
         self.setMaxTime(20, 'days')
+        self.setTxPipeline(True) #settle EVM txs once per tick
 
         #==attributes specific to this netlist
         
@@ -34,11 +35,11 @@ class SimStrategy(SimStrategyBase.SimStrategyBase):
 @enforce_types
 class SimState(SimStateBase.SimStateBase):
     def __init__(self, ss=None):
-        assert ss is None
         super().__init__(ss)
 
         #ss is defined in this netlist module
-        self.ss = SimStrategy()
+        if self.ss is None:
+            self.ss = SimStrategy()
 
         #wire up the circuit
         pub_agent = PublisherAgent.PublisherAgent(
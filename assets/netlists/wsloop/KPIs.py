@@ -3,6 +3,7 @@ import math
 from typing import List
 
 from engine import KPIsBase
+from engine.TickHistory import TickHistory
 from util import valuation
 from util.constants import S_PER_YEAR, S_PER_MONTH, INF
 from util.strutil import prettyBigNum
@@ -13,15 +14,20 @@ class KPIs(KPIsBase.KPIsBase):
     def __init__(self, time_step: int):
         super().__init__(time_step)
                 
-        #for these, append a new value with each tick
-        self._granttakers_revenue_per_tick__per_tick: List[float] = []
-        self._revenue_per_marketplace_per_s__per_tick: List[float] = []
-        self._n_marketplaces__per_tick: List[int] = []
-        self._marketplace_percent_toll_to_ocean__per_tick: List[float] = []
-        self._total_OCEAN_minted__per_tick: List[float] = []
-        self._total_OCEAN_burned__per_tick: List[float] = []
-        self._total_OCEAN_minted_USD__per_tick: List[float] = []
-        self._total_OCEAN_burned_USD__per_tick: List[float] = []
+        #for these, append a new value with each tick. Queries go back at
+        # most a month, or two years for revenue (one year, one year ago)
+        month = lambda: TickHistory('window', n_seconds=S_PER_MONTH,
+                                    time_step=time_step)
+        two_years = lambda: TickHistory('window', n_seconds=2*S_PER_YEAR,
+                                        time_step=time_step)
+        self._granttakers_revenue_per_tick__per_tick = month()
+        self._onemkt_revenue_per_s__per_tick = two_years()
+        self._allmkts_revenue_per_s__per_tick = two_years()
+        self._ocean_revenue_per_s__per_tick = two_years()
+        self._total_OCEAN_minted__per_tick = month()
+        self._total_OCEAN_burned__per_tick = month()
+        self._total_OCEAN_minted_USD__per_tick = month()
+        self._total_OCEAN_burned_USD__per_tick = month()
 
     def takeStep(self, state):
         super().takeStep(state) #parent e.g. increments self._tick
@@ -30,11 +36,12 @@ class KPIs(KPIsBase.KPIsBase):
             state.grantTakersSpentAtTick())
         
         am = state.getAgent("marketplaces1")
-        self._revenue_per_marketplace_per_s__per_tick.append(
-            am.revenuePerMarketplacePerSecond())
-        self._n_marketplaces__per_tick.append(am.numMarketplaces())
-        self._marketplace_percent_toll_to_ocean__per_tick.append(
-            state.marketplacePercentTollToOcean())
+        onemkt_rev = am.revenuePerMarketplacePerSecond()
+        allmkts_rev = onemkt_rev * am.numMarketplaces()
+        ocean_rev = allmkts_rev * state.marketplacePercentTollToOcean()
+        self._onemkt_revenue_per_s__per_tick.append(onemkt_rev)
+        self._allmkts_revenue_per_s__per_tick.append(allmkts_rev)
+        self._ocean_revenue_per_s__per_tick.append(ocean_rev)
 
         O_minted = state.totalOCEANminted()
         O_burned = state.totalOCEANburned()
@@ -49,7 +56,7 @@ class KPIs(KPIsBase.KPIsBase):
 
     def tick(self) -> int:
         """# ticks since start of run"""
-        assert len(self._revenue_per_marketplace_per_s__per_tick) == self._tick
+        assert len(self._onemkt_revenue_per_s__per_tick) == self._tick
         return self._tick
         
     #=======================================================================
@@ -72,7 +79,8 @@ class KPIs(KPIsBase.KPIsBase):
     def grantTakersMonthlyRevenueNow(self) -> float:
         ticks_1mo = self._ticksOneMonth()
         rev_per_tick = self._granttakers_revenue_per_tick__per_tick
-        return float(sum(rev_per_tick[-ticks_1mo:]))
+        n = len(rev_per_tick)
+        return rev_per_tick.sum(n - ticks_1mo, n)
         
     #=======================================================================
     #revenue numbers: 1 marketplace
@@ -92,11 +100,12 @@ class KPIs(KPIsBase.KPIsBase):
         return self._onemktRevenueOverInterval(t1, t2)
             
     def _onemktRevenueOverInterval(self, t1: int, t2:int) -> float:
-        return self._revenueOverInterval(t1, t2, self.onemktRevenuePerSecond)
+        return self._revenueOverInterval(
+            t1, t2, self._onemkt_revenue_per_s__per_tick)
 
     def onemktRevenuePerSecond(self, tick) -> float:
         """Returns onemkt's revenue per second at a given tick"""
-        return self._revenue_per_marketplace_per_s__per_tick[tick]
+        return self._onemkt_revenue_per_s__per_tick[tick]
 
     #=======================================================================
     #revenue numbers: n marketplaces
@@ -117,11 +126,11 @@ class KPIs(KPIsBase.KPIsBase):
 
     def allmktsRevenuePerSecond(self, tick) -> float:
         """Returns allmkt's revenue per second at a given tick"""
-        return self._revenue_per_marketplace_per_s__per_tick[tick] \
-            * self._n_marketplaces__per_tick[tick]
+        return self._allmkts_revenue_per_s__per_tick[tick]
             
     def _allmktsRevenueOverInterval(self, t1: int, t2:int) -> float:
-        return self._revenueOverInterval(t1, t2, self.allmktsRevenuePerSecond)
+        return self._revenueOverInterval(
+            t1, t2, self._allmkts_revenue_per_s__per_tick)
     
     #=======================================================================
     #revenue numbers: ocean community
@@ -146,36 +155,38 @@ class KPIs(KPIsBase.KPIsBase):
         return self._oceanRevenueOverInterval(t1, t2)
             
     def _oceanRevenueOverInterval(self, t1: int, t2:int) -> float:
-        return self._revenueOverInterval(t1, t2, self.oceanRevenuePerSecond)
+        return self._revenueOverInterval(
+            t1, t2, self._ocean_revenue_per_s__per_tick)
     
     def oceanRevenuePerSecond(self, tick) -> float:
         """Returns ocean's revenue per second at a given tick"""
-        return self._revenue_per_marketplace_per_s__per_tick[tick] \
-            * self._n_marketplaces__per_tick[tick] \
-            * self._marketplace_percent_toll_to_ocean__per_tick[tick]
+        return self._ocean_revenue_per_s__per_tick[tick]
     
     #=======================================================================
-    def _revenueOverInterval(self, t1: int, t2:int, revenuePerSecondFunc) \
-        -> float:
+    def _revenueOverInterval(self, t1: int, t2:int,
+                             revenue_per_s: TickHistory) -> float:
         """
         Helper function for _{onemkt, allmkts, ocean}revenueOverInterval().
 
         In time from t1 to t2 (both in # seconds since start), 
-        how much $ was earned, using the revenuePerSecondFunc.
+        how much $ was earned, given revenue per second at each tick.
+        O(1): whole ticks via running sums, then trim the partial ticks
+        at either end.
         """
         assert t2 > t1
-        tick1: int = max(0, math.floor(t1 / self._time_step))
-        tick2: int = min(self.tick(), math.floor(t2 / self._time_step) + 1) 
-        rev = 0.0
-        for tick_i in range(tick1, tick2):
-            rev_this_s = revenuePerSecondFunc(tick_i)
-            
-            start_s = max(t1, tick_i * self._time_step)
-            end_s = min(t2, (tick_i + 1) * self._time_step - 1)
-            n_s = end_s - start_s + 1
-            rev_this_tick = rev_this_s * n_s
-            
-            rev += rev_this_tick
+        ts = self._time_step
+        tick1: int = max(0, math.floor(t1 / ts))
+        tick2: int = min(self.tick(), math.floor(t2 / ts) + 1) 
+        if tick1 >= tick2:
+            return 0.0
+        rev = revenue_per_s.sum(tick1, tick2) * ts
+
+        n_s_before_t1 = max(t1, tick1 * ts) - tick1 * ts
+        if n_s_before_t1 > 0:
+            rev -= revenue_per_s[tick1] * n_s_before_t1
+        n_s_after_t2 = (tick2 * ts - 1) - min(t2, tick2 * ts - 1)
+        if n_s_after_t2 > 0:
+            rev -= revenue_per_s[tick2 - 1] * n_s_after_t2
         return rev
         
     #=======================================================================
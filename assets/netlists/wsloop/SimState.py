@@ -113,8 +113,7 @@ class SimState(SimStateBase.SimStateBase):
         new_agents.add(GrantTakingAgent(
             name = "bdb_workers", USD=0.0, OCEAN=0.0))
 
-        for agent in new_agents:
-            self.agents[agent.name] = agent
+        self.addAgents(new_agents)
 
         #track certain metrics over time, so that we don't have to load
         self.kpis = KPIs(self.ss.time_step)
@@ -238,7 +238,9 @@ def testKPIs__mintAndBurn():
     assert kpis.OCEANburnedPrevMonth() == 9.0 #note: NOT 12.0
 
     state.takeStep(); kpis.takeStep(state) #now, tick = 5 months = 1.66
-    assert kpis._total_OCEAN_minted__per_tick == [2.0,4.0,6.0,8.0,10.0]
+    #only the last month (+1 tick) is kept
+    assert len(kpis._total_OCEAN_minted__per_tick) == 5
+    assert kpis._total_OCEAN_minted__per_tick == [4.0,6.0,8.0,10.0]
     assert kpis.OCEANmintedPrevMonth() == 6.0 #note: NOT 8.0
     assert kpis.OCEANburnedPrevMonth() == 9.0 #note: NOT 12.0
 
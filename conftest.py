@@ -0,0 +1,12 @@
+#conftest.py for the whole repo
+import pytest
+
+from util import constants
+from web3engine import globaltokens
+
+@pytest.fixture(autouse=True)
+def _resetTokenBackend():
+    #tests, and SimStates of netlists that use 'ledger', switch the
+    # (global) token backend. Don't let that leak into the next test.
+    yield
+    globaltokens.setBackend(constants.TOKEN_BACKEND)
@@ -5,20 +5,40 @@ from abc import ABC, abstractmethod
 from enforce_typing import enforce_types
 import typing
 
-from engine import AgentWallet
+from engine import AgentWallet, EventLog
 from web3engine import bpool, datatoken, globaltokens
 from util.constants import SAFETY
 from util.strutil import StrMixin
 from web3tools.web3util import toBase18
 
+NEVER_WAKE = 2**62 #for nextWakeTick(): "don't step me again"
+
 @enforce_types
 class AgentBase(ABC, StrMixin):
     """This can be a data buyer, publisher, etc. Sub-classes implement each."""
+
+    #if True, receiving USD or OCEAN makes the agent due (see nextWakeTick)
+    WAKE_ON_RECEIVE = False
+
+    #what takeStep() reads & writes, for SimStrategy.parallel_agents. As
+    # names: an agent's name for its attributes & wallet ('self' for this
+    # agent's), or any other shared state, e.g. 'random' for the global RNG.
+    # Agents whose sets don't conflict may be stepped concurrently.
+    # None means "anything": then the agent is stepped on its own.
+    READS: typing.Union[tuple, None] = None
+    WRITES: typing.Union[tuple, None] = None
        
     def __init__(self, name: str, USD: float, OCEAN: float):
         self.name = name
         self._wallet = AgentWallet.AgentWallet(USD, OCEAN)
 
+        # ticks since previous takeStep(). Stays 1 unless nextWakeTick()
+        # is used, in which case SimStateBase sets it before each step
+        self._ticks_since_step: int = 1
+
+        # SimStateBase to wake on receipt of funds. Set by SimStateBase
+        self._wake_state = None
+
         #postconditions
         assert self.USD() == USD
         assert round(self.OCEAN(), 1) == OCEAN
@@ -28,12 +48,51 @@ class AgentBase(ABC, StrMixin):
     def takeStep(self, state): #this is where the Agent does *work*
         pass
 
+    def nextWakeTick(self, state) -> typing.Union[int, None]:
+        """Optional event-driven scheduling. SimStateBase calls this after
+        each takeStep(). Return the next tick at which takeStep() must be
+        called (NEVER_WAKE for never), promising that takeStep() would be
+        a no-op at the ticks before that. Or return None (default) to be
+        stepped every tick.
+
+        Agents whose next step depends on what they receive should set
+        WAKE_ON_RECEIVE, rather than poll every tick."""
+        return None
+
+    def readSet(self, state) -> typing.Union[frozenset, None]:
+        """Names that takeStep() reads, or None for anything. Override
+        if they depend on state"""
+        return self._nameSet(self.READS)
+
+    def writeSet(self, state) -> typing.Union[frozenset, None]:
+        """Names that takeStep() writes, or None for anything"""
+        return self._nameSet(self.WRITES)
+
+    def _nameSet(self, names) -> typing.Union[frozenset, None]:
+        if names is None:
+            return None
+        return frozenset(self.name if name == 'self' else name
+                         for name in names)
+
+    def _secondsSinceStep(self, state) -> int:
+        """Seconds since previous takeStep(). For agents that track time
+        with counters, and use nextWakeTick()"""
+        return self._ticks_since_step * state.ss.time_step
+
+    def _wakeOnReceive(self) -> None:
+        if self._wake_state is not None:
+            self._wake_state.wakeAgent(self.name)
+
     #=======================================================================
     #core
     @property
     def address(self) -> str:
         return self._wallet._address
         
+    def _logAction(self, action: str, payload: dict) -> None:
+        """Record an action in the event log, if any. See engine/EventLog.py"""
+        EventLog.action(self.name, action, payload)
+
     #=======================================================================
     #USD-related
     def USD(self) -> float:
@@ -41,6 +100,7 @@ class AgentBase(ABC, StrMixin):
     
     def receiveUSD(self, amount: float) -> None:
         self._wallet.depositUSD(amount) 
+        self._wakeOnReceive()
 
     def _transferUSD(self, receiving_agent, amount: float) -> None:
         """set receiver to None to model spending, without modeling receiver"""
@@ -48,6 +108,7 @@ class AgentBase(ABC, StrMixin):
             assert isinstance(receiving_agent, AgentBase) or (receiving_agent is None)
         if receiving_agent is not None:
             self._wallet.transferUSD(receiving_agent._wallet, amount)
+            receiving_agent._wakeOnReceive()
         else:
             self._wallet.withdrawUSD(amount)
         
@@ -58,6 +119,7 @@ class AgentBase(ABC, StrMixin):
 
     def receiveOCEAN(self, amount: float) -> None:
         self._wallet.depositOCEAN(amount)
+        self._wakeOnReceive()
 
     def _transferOCEAN(self, receiving_agent, amount: float) -> None:
         """set receiver to None to model spending, without modeling receiver"""
@@ -65,6 +127,7 @@ class AgentBase(ABC, StrMixin):
             assert isinstance(receiving_agent, AgentBase) or (receiving_agent is None)
         if receiving_agent is not None:
             self._wallet.transferOCEAN(receiving_agent._wallet, amount)
+            receiving_agent._wakeOnReceive()
         else:
             self._wallet.withdrawOCEAN(amount)
             
@@ -4,6 +4,8 @@ from assets.agents.PublisherAgent import PublisherAgent
 from assets.agents.PoolAgent import PoolAgent
 from assets.agents.StakerspeculatorAgent import StakerspeculatorAgent
 from assets.agents.DataconsumerAgent import DataconsumerAgent
+from web3engine import globaltokens
+from web3tools.web3util import fromBase18
 
 @enforce_types
 class AgentDict(dict):
@@ -43,3 +45,28 @@ class AgentDict(dict):
                 return agent
         return None
 
+    def balancesOf(self, token=None, names=None) -> dict:
+        """Balances of a token (default: OCEAN) for the named agents
+        (default: all), as {name : float}. Reads all uncached balances in
+        one batch, rather than one eth_call per agent, and primes each
+        wallet's cache with them."""
+        agents = list(self.values()) if names is None \
+            else [self[name] for name in names]
+        if token is None or token.address == globaltokens.OCEAN_address():
+            cold = [agent for agent in agents
+                    if not agent._wallet._OCEANisCached()]
+            if cold:
+                balances_base = globaltokens.OCEANtoken().balancesOf_base(
+                    [agent.address for agent in cold])
+                for agent, balance_base in zip(cold, balances_base):
+                    agent._wallet._primeOCEAN_base(balance_base)
+            return {agent.name : agent.OCEAN() for agent in agents}
+        cold = [agent for agent in agents
+                if not agent._wallet._tokenIsCached(token.address)]
+        if cold:
+            balances_base = token.balancesOf_base(
+                [agent.address for agent in cold])
+            for agent, balance_base in zip(cold, balances_base):
+                agent._wallet._primeToken_base(token.address, balance_base)
+        return {agent.name : fromBase18(agent._wallet._token_base(token))
+                for agent in agents}
@@ -4,12 +4,23 @@ log = logging.getLogger('wallet')
 from enforce_typing import enforce_types
 import typing
 
+from engine import EventLog
 from web3engine import bpool, btoken, datatoken, globaltokens
 from util import constants 
 from util.strutil import asCurrency
-from web3tools import web3util, web3wallet
+from web3tools import txpipeline, web3util, web3wallet
 from web3tools.web3util import fromBase18, toBase18
 
+def materializeAll(wallets: list) -> int:
+    """Put many wallets on-chain at once. On evm, their ETH funding and
+    OCEAN mints are sent pipelined (local nonces, no waiting in between),
+    then all receipts are awaited together. Returns # wallets materialized"""
+    todo = [w for w in wallets if not w._isMaterialized()]
+    with txpipeline.batch():
+        for wallet in todo:
+            wallet._materialize()
+    return len(todo)
+
 @enforce_types
 class AgentWallet:
     """An AgentWallet holds balances of USD, OCEAN, and DTs for a given Agent.
@@ -17,36 +28,93 @@ class AgentWallet:
     -the top-level system which operates in floats
     -the EVM system which operates in base18-value ints
 
-    USD is stored as a variable internally. OCEAN & DTs are on EVM.
+    USD is stored as a variable internally. OCEAN & DTs are on EVM,
+    unless the token backend is 'ledger', then OCEAN is in-memory.
+
+    A new wallet is virtual: its key is made when its address is first
+    needed, and its opening OCEAN is only minted (and ETH for gas sent)
+    at its first on-chain action. Until then, OCEAN moves between virtual
+    wallets off-chain. See _materialize().
     """
 
     def __init__(self, USD:float=0.0, OCEAN:float=0.0, private_key=None):
-        if private_key is None:
-            self._web3wallet = web3wallet.randomWeb3Wallet()
-        else:
-            self._web3wallet = web3wallet.Web3Wallet(private_key)
+        self._private_key = private_key
+        self._keys_wallet = None #web3wallet.Web3Wallet. See _keys()
 
-        #Give the new wallet ETH to pay gas fees (but don't track otherwise)
-        self._web3wallet.fundFromAbove(toBase18(0.01)) #magic number
-        
         #USD
         self._USD = USD #lump in ETH too
 
         #OCEAN
-        globaltokens.mintOCEAN(address=self._web3wallet.address,
-                               value_base=toBase18(OCEAN))
+        # opening OCEAN not yet minted, or None once on-chain
+        self._unminted_OCEAN_base: typing.Union[int,None] = toBase18(OCEAN)
         self._cached_OCEAN_base: typing.Union[int,None] = None #for speed
+        if private_key is not None: #its address may hold funds already
+            self._materialize()
+
+        #DT & BPT balances: token address : base balance. Write-through:
+        # updated from the known deltas of this wallet's own actions
+        self._cached_tokens_base: dict = {}
+
+        #allowances we've given, less what spenders may have used since.
+        # (token address, spender address) : base amount. See ensureAllowance
+        self._allowances_base: dict = {}
 
         #amount 
         self._total_USD_in:float = USD
         self._total_OCEAN_in:float = OCEAN
 
+        if EventLog.isActive(): #e.g. an agent made mid-run
+            self._logInitialBalances()
+
+    def _logInitialBalances(self):
+        EventLog.transfer('USD', EventLog.MINT, self._address, self.USD())
+        EventLog.transfer('OCEAN', EventLog.MINT, self._address, self.OCEAN())
+
     def resetCachedInfo(self):
         self._cached_OCEAN_base = None
+
+    def _keys(self) -> web3wallet.Web3Wallet:
+        if self._keys_wallet is None:
+            if self._private_key is None:
+                self._keys_wallet = web3wallet.newWeb3Wallet()
+            else:
+                self._keys_wallet = web3wallet.Web3Wallet(self._private_key)
+        return self._keys_wallet
+
+    @property
+    def _web3wallet(self) -> web3wallet.Web3Wallet:
+        """For signing txs. So the wallet goes on-chain first"""
+        self._materialize()
+        return self._keys()
+
+    def _isMaterialized(self) -> bool:
+        return self._unminted_OCEAN_base is None
+
+    def _materialize(self) -> None:
+        """Put this wallet on-chain: give it ETH to pay gas fees (but
+        don't track otherwise), and mint its unminted OCEAN"""
+        if self._unminted_OCEAN_base is None:
+            return
+        unminted_base, self._unminted_OCEAN_base = self._unminted_OCEAN_base, None
+        keys = self._keys()
+        if globaltokens.backend() == 'evm': #ledger has no gas
+            keys.fundFromAbove(toBase18(0.01)) #magic number
+        if unminted_base > 0:
+            globaltokens.mintOCEAN(keys.address, unminted_base)
+        self.resetCachedInfo()
+
+    def _receiveVirtualOCEAN_base(self, amt_base: int) -> None:
+        """Take OCEAN off-chain. Only while not materialized"""
+        self._unminted_OCEAN_base += amt_base
+
+    def resetCachedTokens(self):
+        """Forget DT & BPT balances. Call after changing them other than
+        through this wallet, e.g. minting DTs or binding them to a pool"""
+        self._cached_tokens_base = {}
         
     @property
     def _address(self):
-         return self._web3wallet.address
+         return self._keys().address
      
     #=================================================================== 
     #USD-related   
@@ -54,11 +122,21 @@ class AgentWallet:
         return self._USD
         
     def depositUSD(self, amt: float) -> None:
+        if EventLog.isActive(): #else don't make keys just for the address
+            EventLog.transfer('USD', EventLog.MINT, self._address, amt)
+        self._depositUSD(amt)
+
+    def _depositUSD(self, amt: float) -> None:
         assert amt >= 0.0
         self._USD += amt
         self._total_USD_in += amt
         
     def withdrawUSD(self, amt: float) -> None:
+        if EventLog.isActive():
+            EventLog.transfer('USD', self._address, constants.BURN_ADDRESS, amt)
+        self._withdrawUSD(amt)
+
+    def _withdrawUSD(self, amt: float) -> None:
         assert amt >= 0.0
         if amt > 0.0 and self._USD > 0.0:
             tol = 1e-12
@@ -73,8 +151,10 @@ class AgentWallet:
 
     def transferUSD(self, dst_wallet, amt: float) -> None:
         assert isinstance(dst_wallet, AgentWallet)
-        self.withdrawUSD(amt)
-        dst_wallet.depositUSD(amt)
+        if EventLog.isActive():
+            EventLog.transfer('USD', self._address, dst_wallet._address, amt)
+        self._withdrawUSD(amt)
+        dst_wallet._depositUSD(amt)
 
     def totalUSDin(self) -> float:
         return self._total_USD_in
@@ -85,15 +165,29 @@ class AgentWallet:
         return fromBase18(self._OCEAN_base())
 
     def _OCEAN_base(self) -> int:
+        if self._unminted_OCEAN_base is not None:
+            return self._unminted_OCEAN_base
         if self._cached_OCEAN_base is None:
             self._cached_OCEAN_base = globaltokens.OCEANtoken().balanceOf_base(self._address)
         return self._cached_OCEAN_base            
+
+    def _OCEANisCached(self) -> bool:
+        return self._unminted_OCEAN_base is not None or \
+            self._cached_OCEAN_base is not None
+
+    def _primeOCEAN_base(self, OCEAN_base: int) -> None:
+        """Set the cached OCEAN balance, read elsewhere. See AgentDict.balancesOf"""
+        self._cached_OCEAN_base = OCEAN_base
         
     def depositOCEAN(self, amt: float) -> None:
         assert amt >= 0.0
-        globaltokens.mintOCEAN(self._address, toBase18(amt))
-        self._total_OCEAN_in += amt
-        self.resetCachedInfo()
+        if self._isMaterialized():
+            globaltokens.mintOCEAN(self._address, toBase18(amt))
+        else:
+            self._receiveVirtualOCEAN_base(toBase18(amt))
+        if EventLog.isActive():
+            EventLog.transfer('OCEAN', EventLog.MINT, self._address, amt)
+        self._receivedOCEAN(amt)
         
     def withdrawOCEAN(self, amt: float) -> None:
         self.transferOCEAN(_BURN_WALLET, amt)
@@ -101,8 +195,6 @@ class AgentWallet:
     def transferOCEAN(self, dst_wallet, amt: float) -> None:
         assert isinstance(dst_wallet, AgentWallet) or \
             isinstance(dst_wallet, BurnWallet)
-        dst_address = dst_wallet._address
-        
         amt_base = toBase18(amt)
         assert amt_base >= 0
         if amt_base == 0:
@@ -120,12 +212,26 @@ class AgentWallet:
             raise ValueError("transfer amt (%s) exceeds OCEAN holdings (%s)"
                              % (fromBase18(amt_base), fromBase18(OCEAN_base)))
 
-        globaltokens.OCEANtoken().transfer(
-            dst_address, amt_base, self._web3wallet)
+        if self._isMaterialized():
+            dst_wallet._materialize()
+            globaltokens.OCEANtoken().transfer(
+                dst_wallet._address, amt_base, self._web3wallet)
+        else: #still have opening OCEAN to mint: send from that
+            self._unminted_OCEAN_base -= amt_base
+            if dst_wallet._isMaterialized():
+                globaltokens.mintOCEAN(dst_wallet._address, amt_base)
+            else:
+                dst_wallet._receiveVirtualOCEAN_base(amt_base)
+        if EventLog.isActive():
+            EventLog.transfer('OCEAN', self._address, dst_wallet._address, amt)
         
-        dst_wallet._total_OCEAN_in += amt
         self.resetCachedInfo()
-        dst_wallet.resetCachedInfo()        
+        dst_wallet._receivedOCEAN(amt)
+
+    def _receivedOCEAN(self, amt: float) -> None:
+        """Bookkeeping after amt OCEAN arrived at this wallet's address"""
+        self._total_OCEAN_in += amt
+        self.resetCachedInfo()
 
     def totalOCEANin(self) -> float:
         return self._total_OCEAN_in
@@ -144,21 +250,51 @@ class AgentWallet:
         return fromBase18(self._DT_base(dt))
 
     def _DT_base(self, dt:datatoken.Datatoken) -> int: 
-        return dt.balanceOf_base(self._address)
+        return self._token_base(dt)
     
     def BPT(self, pool:bpool.BPool) -> float:
         return fromBase18(self._BPT_base(pool))
     
     def _BPT_base(self, pool:bpool.BPool) -> int:
-        return pool.balanceOf_base(self._address)
+        return self._token_base(pool)
+
+    def _token_base(self, token) -> int:
+        balance_base = self._cached_tokens_base.get(token.address)
+        if balance_base is None:
+            balance_base = token.balanceOf_base(self._address)
+            self._cached_tokens_base[token.address] = balance_base
+        return balance_base
+
+    def _tokenIsCached(self, token_address: str) -> bool:
+        return token_address in self._cached_tokens_base
+
+    def _primeToken_base(self, token_address: str, balance_base: int) -> None:
+        """Set a cached DT or BPT balance, read elsewhere"""
+        self._cached_tokens_base[token_address] = balance_base
+
+    def _changedToken_base(self, token_address: str,
+                           delta_base: typing.Union[int, None]) -> None:
+        """Write a known change through the cache. None = unknown, so
+        forget the balance and re-read it when next needed"""
+        if delta_base is None:
+            self._cached_tokens_base.pop(token_address, None)
+        elif token_address in self._cached_tokens_base:
+            self._cached_tokens_base[token_address] += delta_base
+
+    def _changedOCEAN_base(self, delta_base: typing.Union[int, None]) -> None:
+        """Like _changedToken_base(), for OCEAN"""
+        if delta_base is None or self._cached_OCEAN_base is None:
+            self._cached_OCEAN_base = None
+        else:
+            self._cached_OCEAN_base += delta_base
 
     def sellDT(self, pool:bpool.BPool, DT:datatoken.Datatoken,
                DT_sell_amt:float, min_OCEAN_amt:float=0.0):
         """Swap DT for OCEAN. min_OCEAN_amt>0 protects from slippage."""
-        DT.approve(pool.address, toBase18(DT_sell_amt),
-                   from_wallet=self._web3wallet)
+        before = self._poolBalancesForLog(pool, DT)
+        self.ensureAllowance(DT, pool.address, DT_sell_amt)
 
-        pool.swapExactAmountIn(
+        (_, tx_receipt) = pool.swapExactAmountIn(
             tokenIn_address=DT.address,  # entering pool
             tokenAmountIn_base=toBase18(DT_sell_amt),  # ""
             tokenOut_address=globaltokens.OCEAN_address(),  # leaving pool
@@ -166,16 +302,19 @@ class AgentWallet:
             maxPrice_base=2 ** 255, #limit by min_OCEAN_amt, not price
             from_wallet=self._web3wallet,
         )
-        self.resetCachedInfo()
+        amts_base = pool.swapAmountsFromReceipt(tx_receipt)
+        self._changedOCEAN_base(None if amts_base is None else amts_base[1])
+        self._changedToken_base(DT.address, -toBase18(DT_sell_amt))
+        self._logPoolTrade('sellDT', pool, DT, before)
     
     def buyDT(self, pool:bpool.BPool, DT:datatoken.Datatoken,
               DT_buy_amt:float, max_OCEAN_allow:float):
         """Swap OCEAN for DT """
-        OCEAN = globaltokens.OCEANtoken()
-        OCEAN.approve(pool.address, toBase18(max_OCEAN_allow),
-                      from_wallet=self._web3wallet)
+        before = self._poolBalancesForLog(pool, DT)
+        self.ensureAllowance(globaltokens.OCEANtoken(), pool.address,
+                             max_OCEAN_allow)
 
-        pool.swapExactAmountOut(
+        (_, tx_receipt) = pool.swapExactAmountOut(
             tokenIn_address=globaltokens.OCEAN_address(),
             maxAmountIn_base=toBase18(max_OCEAN_allow),
             tokenOut_address=DT.address,
@@ -183,27 +322,75 @@ class AgentWallet:
             maxPrice_base=2 ** 255,
             from_wallet=self._web3wallet,
         )
-        self.resetCachedInfo()
+        amts_base = pool.swapAmountsFromReceipt(tx_receipt)
+        self._changedOCEAN_base(None if amts_base is None else -amts_base[0])
+        self._changedToken_base(DT.address, toBase18(DT_buy_amt))
+        self._logPoolTrade('buyDT', pool, DT, before)
                         
     def stakeOCEAN(self, OCEAN_stake:float, pool:bpool.BPool):
         """Convert some OCEAN to DT, then add both as liquidity."""
-        OCEAN = globaltokens.OCEANtoken()
-        OCEAN.approve(pool.address, toBase18(OCEAN_stake),
-                      from_wallet=self._web3wallet)
-        pool.joinswapExternAmountIn(
+        before = self._poolBalancesForLog(pool)
+        self.ensureAllowance(globaltokens.OCEANtoken(), pool.address,
+                             OCEAN_stake)
+        (_, tx_receipt) = pool.joinswapExternAmountIn(
             tokenIn_address=globaltokens.OCEAN_address(),
             tokenAmountIn_base=toBase18(OCEAN_stake),
             minPoolAmountOut_base=toBase18(0.0),
             from_wallet=self._web3wallet)
-        self.resetCachedInfo()
+        self._changedOCEAN_base(-toBase18(OCEAN_stake))
+        self._changedToken_base(pool.address, pool.poolAmountOutFromReceipt(
+            tx_receipt, self._address))
+        self._logPoolTrade('stakeOCEAN', pool, None, before)
         
     def unstakeOCEAN(self, BPT_unstake:float, pool:bpool.BPool):
-        pool.exitswapPoolAmountIn(
+        before = self._poolBalancesForLog(pool)
+        (_, tx_receipt) = pool.exitswapPoolAmountIn(
             tokenOut_address=globaltokens.OCEAN_address(),
             poolAmountIn_base=toBase18(BPT_unstake),
             minAmountOut_base=toBase18(0.0),
             from_wallet=self._web3wallet)
-        self.resetCachedInfo()
+        self._changedOCEAN_base(pool.exitAmountFromReceipt(tx_receipt))
+        self._changedToken_base(pool.address, -toBase18(BPT_unstake))
+        self._logPoolTrade('unstakeOCEAN', pool, None, before)
+
+    def ensureAllowance(self, token, spender_address: str, amt: float) -> None:
+        """Let spender take amt of token from this wallet. Approves a huge
+        amount the first time, then only when what's left is too little.
+        What's left is tracked locally, assuming spender takes all of amt"""
+        amt_base = toBase18(amt)
+        key = (token.address, spender_address)
+        allowance_base = self._allowances_base.get(key, 0)
+        if allowance_base < amt_base:
+            token.approve(spender_address, constants.HUGEINT,
+                          from_wallet=self._web3wallet)
+            allowance_base = constants.HUGEINT
+        self._allowances_base[key] = allowance_base - amt_base
+
+    def _poolBalancesForLog(self, pool, DT=None):
+        """Balances before a pool trade, if logging events. Pools don't
+        say how much went in or out, so the log gets the differences"""
+        if not EventLog.isActive():
+            return None
+        return self._poolBalances(pool, DT)
+
+    def _poolBalances(self, pool, DT) -> dict:
+        balances = {'OCEAN': self._OCEAN_base(),
+                    'BPT:' + pool.address: self._BPT_base(pool)}
+        if DT is not None:
+            balances['DT:' + DT.address] = self._DT_base(DT)
+        return balances
+
+    def _logPoolTrade(self, action: str, pool, DT, before) -> None:
+        if before is None:
+            return
+        after = self._poolBalances(pool, DT)
+        for asset, before_base in before.items():
+            delta = fromBase18(after[asset] - before_base)
+            if delta > 0.0:
+                EventLog.transfer(asset, pool.address, self._address, delta)
+            elif delta < 0.0:
+                EventLog.transfer(asset, self._address, pool.address, -delta)
+        EventLog.action(self._address, action, {'pool': pool.address})
 
     def transferDT(self, dst_wallet, DT: datatoken.Datatoken, amt: float) -> None:
         assert isinstance(dst_wallet, AgentWallet) or \
@@ -228,6 +415,9 @@ class AgentWallet:
                              % (fromBase18(amt_base), fromBase18(DT_base)))
 
         DT.transfer(dst_address, amt_base, self._web3wallet)     
+        self._changedToken_base(DT.address, -amt_base)
+        dst_wallet._changedToken_base(DT.address, amt_base)
+        EventLog.transfer('DT:' + DT.address, self._address, dst_address, amt)
 
     #===================================================================
     def __str__(self) -> str:
@@ -254,4 +444,19 @@ class BurnWallet:
     def resetCachedInfo(self):
         pass
 
+    def _isMaterialized(self) -> bool:
+        return False #so burns from virtual wallets stay off-chain
+
+    def _materialize(self) -> None:
+        pass
+
+    def _receiveVirtualOCEAN_base(self, amt_base: int) -> None:
+        pass
+
+    def _changedToken_base(self, token_address: str, delta_base) -> None:
+        pass
+
+    def _receivedOCEAN(self, amt: float) -> None:
+        self._total_OCEAN_in += amt
+
 _BURN_WALLET = BurnWallet()
@@ -0,0 +1,126 @@
+"""Checkpoint a running SimEngine to disk, and resume from it.
+
+A checkpoint is one file, OUTPUT_DIR/checkpoint.pkl, holding:
+  -the SimEngine: SimState (agents, kpis, ss, schedule) and result sinks
+   (which remember how far their files had got)
+  -the state of python's and numpy's global RNGs
+  -globaltokens state: token backend, and tokens minted so far
+  -the account pool, if any, and how many of its accounts are used
+  -on the 'evm' backend: id of a ganache evm_snapshot taken at the same time
+
+The file is replaced atomically, so the engine state and the chain snapshot
+always pair up. Resuming on 'evm' reverts ganache to the snapshot, so that
+ganache process must still be running.
+
+Ganache can't drop a snapshot without reverting the chain to it. So a
+checkpoint reuses the previous one's snapshot if no block was mined since.
+Else the previous snapshot stays in ganache until it restarts. Hence
+checkpoints are opt-in (SimStrategy.checkpoint_seconds), and not frequent.
+"""
+import logging
+log = logging.getLogger('checkpoint')
+
+from enforce_typing import enforce_types
+import os
+import pickle
+import random
+
+import numpy
+
+from web3engine import globaltokens
+from web3tools import accountpool, web3util
+from web3tools.web3wallet import Web3Wallet
+
+CHECKPOINT_FILENAME = 'checkpoint.pkl'
+CHECKPOINT_VERSION = 1
+
+#output_dir : (id, block number) of the snapshot of its latest checkpoint
+_SNAPSHOTS: dict = {}
+
+@enforce_types
+def checkpointFilename(output_dir: str) -> str:
+    return os.path.join(output_dir, CHECKPOINT_FILENAME)
+
+@enforce_types
+def hasCheckpoint(output_dir: str) -> bool:
+    return os.path.exists(checkpointFilename(output_dir))
+
+def saveCheckpoint(engine) -> None:
+    """Save engine, RNGs, tokens, and (on evm) chain state"""
+    payload = pickle.dumps({
+        'engine': engine,
+        'random_state': random.getstate(),
+        'numpy_random_state': numpy.random.get_state(),
+        'tokens': globaltokens.getState(),
+        'accounts': accountpool.getState(),
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+
+    evm_snapshot = None
+    if globaltokens.backend() == 'evm':
+        evm_snapshot = _snapshot(engine.output_dir)
+    _writeCheckpoint(engine.output_dir, payload, evm_snapshot)
+    log.info("Checkpoint at tick=%d" % engine.state.tick)
+
+@enforce_types
+def loadCheckpoint(output_dir: str):
+    """Restore everything saveCheckpoint() saved. Returns the SimEngine,
+    ready for run() to continue from the checkpointed tick."""
+    with open(checkpointFilename(output_dir), 'rb') as f:
+        checkpoint = pickle.load(f)
+    if checkpoint['version'] != CHECKPOINT_VERSION:
+        raise ValueError("unsupported checkpoint version %s"
+                         % checkpoint['version'])
+
+    evm_snapshot = checkpoint['evm_snapshot']
+    if evm_snapshot is not None:
+        if not _evmRequest('evm_revert', [evm_snapshot]):
+            raise ValueError(f"ganache has no snapshot {evm_snapshot}. "
+                             "Was ganache restarted?")
+        Web3Wallet.reset_tx_count() #nonces went back with the chain
+
+        #reverting uses up the snapshot, so take a fresh one
+        _SNAPSHOTS.pop(output_dir, None)
+        evm_snapshot = _snapshot(output_dir)
+        _writeCheckpoint(output_dir, checkpoint['payload'], evm_snapshot)
+
+    payload = pickle.loads(checkpoint['payload']) #truncates result files
+    random.setstate(payload['random_state'])
+    numpy.random.set_state(payload['numpy_random_state'])
+    globaltokens.setState(payload['tokens'])
+    accountpool.setState(payload.get('accounts'))
+
+    engine = payload['engine']
+    log.info("Resume from tick=%d" % engine.state.tick)
+    return engine
+
+@enforce_types
+def removeCheckpoint(output_dir: str) -> None:
+    if hasCheckpoint(output_dir):
+        os.remove(checkpointFilename(output_dir))
+    _SNAPSHOTS.pop(output_dir, None)
+
+def _snapshot(output_dir: str):
+    """Id of a ganache snapshot of the chain now. The previous checkpoint's,
+    if no block was mined since. See the module docstring"""
+    block_number = _evmRequest('eth_blockNumber', [])
+    prev = _SNAPSHOTS.get(output_dir)
+    if prev is not None and prev[1] == block_number:
+        return prev[0]
+    snapshot_id = _evmRequest('evm_snapshot', [])
+    _SNAPSHOTS[output_dir] = (snapshot_id, block_number)
+    return snapshot_id
+
+@enforce_types
+def _writeCheckpoint(output_dir: str, payload: bytes, evm_snapshot) -> None:
+    filename = checkpointFilename(output_dir)
+    with open(filename + '.tmp', 'wb') as f:
+        pickle.dump({'version': CHECKPOINT_VERSION, 'payload': payload,
+                     'evm_snapshot': evm_snapshot}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(filename + '.tmp', filename) #atomic
+
+def _evmRequest(method: str, params: list):
+    response = web3util.get_web3().provider.make_request(method, params)
+    if 'error' in response:
+        raise ValueError(f"{method} failed: {response['error']}")
+    return response['result']
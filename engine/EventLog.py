@@ -0,0 +1,229 @@
+"""Append-only binary log of what happened in a run: every USD / OCEAN /
+DT / BPT transfer, mint and burn, plus agent actions like swaps and
+proposal evaluations. With it, KPIs can be (re)computed after the run
+by replay(), without re-running agents or touching the EVM.
+
+Turn on with ss.setEventLog(True). SimEngine writes OUTPUT_DIR/events.bin.
+Then e.g. 'tsp replay OUTPUT_DIR my_kpis.py'.
+
+Records, little-endian, each starting with a kind byte:
+  NAME     id:u32 len:u16 utf8     -- intern a string (agent, address, asset)
+  TICK     tick:i64                -- the events that follow are in this tick
+  TRANSFER asset:u32 src:u32 dst:u32 amount:f64
+  ACTION   who:u32 action:u32 len:u32 json
+Mints are transfers from MINT. Burns are transfers to BURN_ADDRESS.
+Wallets log by address; 'addAgent' actions map addresses to agent names.
+(So members of a ResearcherPopulation, who share its address, are logged
+as the population.)
+"""
+import logging
+log = logging.getLogger('eventlog')
+
+from enforce_typing import enforce_types
+import json
+import os
+import struct
+import threading
+import typing
+
+from util.constants import BURN_ADDRESS
+
+MAGIC = b'TSPEVENTS1\n'
+MINT = '<mint>'
+BURN = '<burn>'
+
+_NAME, _TICK, _TRANSFER, _ACTION = 1, 2, 3, 4
+_KIND = struct.Struct('<B')
+_NAME_HEAD = struct.Struct('<IH')
+_TICK_BODY = struct.Struct('<q')
+_TRANSFER_BODY = struct.Struct('<IIId')
+_ACTION_HEAD = struct.Struct('<III')
+
+_ACTIVE = None #the EventLog that transfer() and action() write to
+
+@enforce_types
+class EventLog:
+    def __init__(self, filename: str):
+        self.filename = filename
+        is_new = not os.path.exists(filename)
+        self._f = open(filename, 'ab')
+        if is_new:
+            self._f.write(MAGIC)
+        self._ids: dict = {} #name : id
+        self._lock = threading.Lock() #agents may step in threads
+
+    def _id(self, name: str) -> int:
+        """Intern name, writing a NAME record if it's new. Hold _lock"""
+        i = self._ids.get(name)
+        if i is None:
+            i = self._ids[name] = len(self._ids)
+            b = name.encode('utf-8')
+            self._f.write(_KIND.pack(_NAME) + _NAME_HEAD.pack(i, len(b)) + b)
+        return i
+
+    def tick(self, tick: int) -> None:
+        with self._lock:
+            self._f.write(_KIND.pack(_TICK) + _TICK_BODY.pack(tick))
+
+    def transfer(self, asset: str, src: str, dst: str, amount: float) -> None:
+        with self._lock:
+            body = _TRANSFER_BODY.pack(
+                self._id(asset), self._id(src), self._id(dst), amount)
+            self._f.write(_KIND.pack(_TRANSFER) + body)
+
+    def action(self, who: str, action: str, payload: dict) -> None:
+        b = json.dumps(payload, default=str).encode('utf-8')
+        with self._lock:
+            head = _ACTION_HEAD.pack(self._id(who), self._id(action), len(b))
+            self._f.write(_KIND.pack(_ACTION) + head + b)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __getstate__(self) -> dict:
+        if not self._f.closed:
+            self.flush()
+        state = dict(self.__dict__)
+        state['_offset'] = os.path.getsize(self.filename)
+        del state['_f'], state['_lock']
+        return state
+
+    def __setstate__(self, state: dict):
+        """Drop anything written after the checkpoint, then reopen"""
+        offset = state.pop('_offset')
+        self.__dict__.update(state)
+        with open(self.filename, 'r+b') as f:
+            f.truncate(offset)
+        self._f = open(self.filename, 'ab')
+        self._lock = threading.Lock()
+
+#=======================================================================
+#hooks for wallets & agents. Cheap no-ops unless a log is active
+def setActive(event_log: typing.Union[EventLog, None]) -> None:
+    global _ACTIVE
+    _ACTIVE = event_log
+
+def isActive() -> bool:
+    return _ACTIVE is not None
+
+def transfer(asset: str, src: str, dst: str, amount: float) -> None:
+    if _ACTIVE is not None:
+        _ACTIVE.transfer(asset, src, dst, amount)
+
+def action(who: str, action_name: str, payload: dict) -> None:
+    if _ACTIVE is not None:
+        _ACTIVE.action(who, action_name, payload)
+
+#=======================================================================
+#reading & replay
+@enforce_types
+def readEvents(filename: str):
+    """Yield ('tick', tick), ('transfer', asset, src, dst, amount),
+    and ('action', who, action, payload), in order"""
+    with open(filename, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"'{filename}' is not an event log")
+    names: list = []
+    pos, n = len(MAGIC), len(data)
+    while pos < n:
+        kind = data[pos]
+        pos += 1
+        if kind == _NAME:
+            i, length = _NAME_HEAD.unpack_from(data, pos)
+            pos += _NAME_HEAD.size
+            assert i == len(names)
+            names.append(data[pos:pos+length].decode('utf-8'))
+            pos += length
+        elif kind == _TICK:
+            yield ('tick', _TICK_BODY.unpack_from(data, pos)[0])
+            pos += _TICK_BODY.size
+        elif kind == _TRANSFER:
+            asset, src, dst, amount = _TRANSFER_BODY.unpack_from(data, pos)
+            pos += _TRANSFER_BODY.size
+            yield ('transfer', names[asset], names[src], names[dst], amount)
+        elif kind == _ACTION:
+            who, action_i, length = _ACTION_HEAD.unpack_from(data, pos)
+            pos += _ACTION_HEAD.size
+            payload = json.loads(data[pos:pos+length].decode('utf-8'))
+            pos += length
+            yield ('action', names[who], names[action_i], payload)
+        else:
+            raise ValueError(f"bad event kind {kind} at byte {pos-1}")
+
+class Ledger:
+    """Balances rebuilt from an event log, as of the end of a tick.
+    KPI functions for replay() take a Ledger and return a float."""
+    def __init__(self):
+        self.tick = 0
+        self._balances: dict = {} # name : {asset : amount}
+        self._totals_in: dict = {} # name : {asset : amount}
+        self._names: dict = {BURN_ADDRESS: BURN} #address : agent name
+        self.actions: list = [] #[(who, action, payload)] of this tick
+
+    def balance(self, name: str, asset: str = 'OCEAN') -> float:
+        return self._balances.get(name, {}).get(asset, 0.0)
+
+    def totalIn(self, name: str, asset: str = 'OCEAN') -> float:
+        return self._totals_in.get(name, {}).get(asset, 0.0)
+
+    def names(self) -> list:
+        """Agents (and other addresses) that ever held anything"""
+        return sorted(self._balances)
+
+    def _name(self, address: str) -> str:
+        return self._names.get(address, address)
+
+    def _rename(self, address: str, name: str) -> None:
+        """Move what was logged under address, before it got its name,
+        to name. E.g. the opening balances of an agent made mid-run,
+        which its wallet logs before addAgent()"""
+        for amounts in [self._balances, self._totals_in]:
+            moved = amounts.pop(address, {})
+            name_amounts = amounts.setdefault(name, {}) if moved else {}
+            for asset, amount in moved.items():
+                name_amounts[asset] = name_amounts.get(asset, 0.0) + amount
+
+    def _apply(self, event: tuple) -> None:
+        if event[0] == 'transfer':
+            _, asset, src, dst, amount = event
+            src, dst = self._name(src), self._name(dst)
+            if src != MINT:
+                src_balances = self._balances.setdefault(src, {})
+                src_balances[asset] = src_balances.get(asset, 0.0) - amount
+            dst_balances = self._balances.setdefault(dst, {})
+            dst_balances[asset] = dst_balances.get(asset, 0.0) + amount
+            dst_totals = self._totals_in.setdefault(dst, {})
+            dst_totals[asset] = dst_totals.get(asset, 0.0) + amount
+        elif event[0] == 'action':
+            _, who, action_name, payload = event
+            if action_name == 'addAgent' and payload['address'] not in self._names:
+                self._names[payload['address']] = who
+                self._rename(payload['address'], who)
+            self.actions.append((self._name(who), action_name, payload))
+
+@enforce_types
+def replay(filename: str, kpis: dict, every_ticks: int = 1):
+    """Recompute KPIs over an event log.
+    :param: kpis: dict of column_name : function(Ledger) -> float
+    :param: every_ticks: compute a row every this many ticks
+    :return: header (list), rows (list of [tick, kpi1, kpi2, ..])
+    """
+    header = ['Tick'] + list(kpis.keys())
+    rows = []
+    ledger = Ledger()
+    started = False
+    def addRow():
+        if started and ledger.tick % every_ticks == 0:
+            rows.append([ledger.tick] + [f(ledger) for f in kpis.values()])
+    for event in readEvents(filename):
+        if event[0] == 'tick':
+            addRow()
+            ledger.tick, ledger.actions, started = event[1], [], True
+        else:
+            ledger._apply(event)
+    addRow()
+    return header, rows
@@ -12,6 +12,20 @@ class KPIsBase:
     def takeStep(self, state):
         self._tick += 1
 
+    def takeSteps(self, state, n_ticks: int):
+        """Same as n_ticks calls of takeStep(), at ticks where no agent
+        acts. SimStateBase.fastForward() uses it. Children that track
+        per-tick series should override with a bulk update, e.g. by
+        repeating the last value n_ticks times."""
+        if type(self).takeStep is KPIsBase.takeStep:
+            self._tick += n_ticks
+            return
+        tick0 = state.tick
+        for tick in range(tick0, tick0 + n_ticks):
+            state.tick = tick
+            self.takeStep(state)
+        state.tick = tick0
+
     def tick(self) -> int:
         """# ticks since start of run"""
         return self._tick
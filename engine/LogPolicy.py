@@ -0,0 +1,120 @@
+"""How often SimEngine logs a row, and how each column is aggregated
+over the ticks in between.
+
+Default is the same as it's always been: a row every day, each value an
+instantaneous sample ('last'). With other aggregations, the netlist log
+functions are called every tick, and a WindowAggregator keeps O(1) state
+per column until the row is written.
+"""
+from enforce_typing import enforce_types
+import typing
+
+from util.constants import S_PER_HOUR, S_PER_DAY, S_PER_WEEK, \
+    S_PER_MONTH, S_PER_YEAR
+from util.strutil import StrMixin
+
+PERIODS = {'hourly': S_PER_HOUR, 'daily': S_PER_DAY, 'weekly': S_PER_WEEK,
+           'monthly': S_PER_MONTH, 'yearly': S_PER_YEAR}
+AGGREGATIONS = ['last', 'mean', 'min', 'max', 'sum']
+
+#logged by SimEngine for every row. Always 'last' unless set explicitly
+TIME_COLUMNS = ['Tick', 'Second', 'Min', 'Hour', 'Day', 'Month', 'Year']
+
+@enforce_types
+class LogPolicy(StrMixin):
+    def __init__(self, period: typing.Union[int, str] = 'daily',
+                 aggregations: typing.Union[dict, None] = None,
+                 default_aggregation: str = 'last'):
+        """
+        :param: period: seconds between rows, or one of PERIODS' keys
+        :param: aggregations: dict of column_name : one of AGGREGATIONS
+        :param: default_aggregation: for columns not in aggregations
+        """
+        if isinstance(period, str):
+            if period not in PERIODS:
+                raise ValueError(f"unknown log period '{period}'")
+            period = PERIODS[period]
+        if period <= 0:
+            raise ValueError(period)
+        aggregations = aggregations or {}
+        for agg in list(aggregations.values()) + [default_aggregation]:
+            if agg not in AGGREGATIONS:
+                raise ValueError(f"unknown aggregation '{agg}'")
+
+        self.period: int = period #seconds
+        self.aggregations: dict = aggregations
+        self.default_aggregation: str = default_aggregation
+
+    def aggregation(self, column_name: str) -> str:
+        if column_name in self.aggregations:
+            return self.aggregations[column_name]
+        if column_name in TIME_COLUMNS:
+            return 'last'
+        return self.default_aggregation
+
+    def isAggregating(self) -> bool:
+        """If False, rows are samples, so only log ticks need log data"""
+        return self.default_aggregation != 'last' or \
+            any(agg != 'last' for agg in self.aggregations.values())
+
+    def isLogTick(self, elapsed_s: int) -> bool:
+        return (elapsed_s % self.period) == 0
+
+@enforce_types
+class WindowAggregator:
+    """Aggregates rows of log data over a window of ticks.
+    Columns are by position; rows may get wider over time."""
+    def __init__(self, policy: LogPolicy):
+        self._policy = policy
+        self._dataheader: list = []
+
+        #per column
+        self._aggs: list = [] #str
+        self._count: list = [] #ticks in window
+        self._sum: list = []
+        self._min: list = []
+        self._max: list = []
+        self._last: list = []
+
+    def addRow(self, dataheader: list, datarow: list, n_ticks: int = 1):
+        """Add a row that holds for n_ticks ticks"""
+        self._dataheader = dataheader
+        for col_i in range(len(self._aggs), len(datarow)):
+            self._aggs.append(self._policy.aggregation(dataheader[col_i]))
+            self._count.append(0)
+            self._sum.append(0.0)
+            self._min.append(float('inf'))
+            self._max.append(float('-inf'))
+            self._last.append(0.0)
+
+        for col_i, val in enumerate(datarow):
+            self._count[col_i] += n_ticks
+            self._sum[col_i] += val * n_ticks
+            if val < self._min[col_i]:
+                self._min[col_i] = val
+            if val > self._max[col_i]:
+                self._max[col_i] = val
+            self._last[col_i] = val
+
+    def popRow(self):
+        """Return (dataheader, datarow) aggregated over the window so far,
+        and start a new window"""
+        datarow = []
+        for col_i, agg in enumerate(self._aggs):
+            if agg == 'last' or self._count[col_i] == 0:
+                val = self._last[col_i]
+            elif agg == 'mean':
+                val = self._sum[col_i] / self._count[col_i]
+            elif agg == 'sum':
+                val = self._sum[col_i]
+            elif agg == 'min':
+                val = self._min[col_i]
+            else:
+                val = self._max[col_i]
+            datarow.append(val)
+
+            self._count[col_i] = 0
+            self._sum[col_i] = 0.0
+            self._min[col_i] = float('inf')
+            self._max[col_i] = float('-inf')
+        return self._dataheader, datarow
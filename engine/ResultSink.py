@@ -0,0 +1,377 @@
+"""Result sinks: where SimEngine writes its logged rows.
+
+Each sink opens its file once, and writes through an in-memory buffer
+that's flushed every 'flush_rows' rows or 'flush_seconds' seconds,
+whichever comes first.
+
+Csv sinks give data.csv / datax.csv / rpdata.csv. ColumnarSink gives a
+binary, chunked numpy format instead, for wide tables.
+"""
+import logging
+log = logging.getLogger('resultsink')
+
+from enforce_typing import enforce_types
+import json
+import numpy
+import os
+import time
+
+@enforce_types
+def rowToCsvLine(datarow: list) -> str:
+    return ", ".join(['%g' % dataval for dataval in datarow]) + "\n"
+
+@enforce_types
+def headerToCsvLine(dataheader: list) -> str:
+    return ", ".join(dataheader) + "\n"
+
+@enforce_types
+class _BufferedFile:
+    """Append-only text file, written through a buffer"""
+    def __init__(self, filename: str, flush_rows: int, flush_seconds: float):
+        assert flush_rows > 0
+        self.filename = filename
+        self._flush_rows = flush_rows
+        self._flush_seconds = flush_seconds
+
+        self._f = open(filename, 'a')
+        self._buf: list = [] #list of str, one per line
+        self._n_buf_rows = 0 #header lines don't count
+        self._last_flush_time = time.time()
+
+    def writeLine(self, line: str, is_row: bool = True) -> None:
+        self._buf.append(line)
+        if not is_row:
+            return
+        self._n_buf_rows += 1
+        if self._n_buf_rows >= self._flush_rows or \
+           (time.time() - self._last_flush_time) >= self._flush_seconds:
+            self.flush()
+
+    def numBufferedRows(self) -> int:
+        return self._n_buf_rows
+
+    def flush(self) -> None:
+        if self._buf:
+            self._f.write("".join(self._buf))
+            self._buf = []
+            self._n_buf_rows = 0
+        self._f.flush()
+        self._last_flush_time = time.time()
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self.flush()
+        self._f.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._f.closed
+
+    #for checkpoints: pickle the file's position, not the file
+    def __getstate__(self) -> dict:
+        if not self._f.closed:
+            self.flush()
+        state = dict(self.__dict__)
+        state['_offset'] = os.path.getsize(self.filename)
+        state['_is_closed'] = self._f.closed
+        del state['_f']
+        return state
+
+    def __setstate__(self, state: dict):
+        """Drop anything written after the checkpoint, then reopen"""
+        offset, is_closed = state.pop('_offset'), state.pop('_is_closed')
+        self.__dict__.update(state)
+        if is_closed:
+            self._f = open(os.devnull, 'a')
+            self._f.close()
+            return
+        size = os.path.getsize(self.filename) \
+            if os.path.exists(self.filename) else 0
+        if size < offset:
+            raise ValueError(f"'{self.filename}' is shorter than at checkpoint")
+        with open(self.filename, 'a') as f:
+            f.truncate(offset)
+        self._f = open(self.filename, 'a')
+        self._last_flush_time = time.time()
+
+@enforce_types
+class CsvSink:
+    """Csv with a fixed header: the header of the first row written.
+    Later rows may be wider or narrower; they're written as-is."""
+    def __init__(self, filename: str, flush_rows: int, flush_seconds: float):
+        self.filename = filename
+        self._is_new = not os.path.exists(filename)
+        self._file = _BufferedFile(filename, flush_rows, flush_seconds)
+
+    def write(self, dataheader: list, datarow: list) -> None:
+        if self._is_new:
+            self._file.writeLine(headerToCsvLine(dataheader), is_row=False)
+            self._is_new = False
+        self._file.writeLine(rowToCsvLine(datarow))
+
+    def numBufferedRows(self) -> int:
+        return self._file.numBufferedRows()
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+@enforce_types
+class PaddedCsvSink:
+    """Csv whose columns may grow during the run (e.g. new researchers).
+
+    The final file has the last-seen header, and every row is padded
+    with zeros at the end to the width of the last row. Rows are spooled
+    to a body file while running, then streamed into the final file
+    on close(). So memory use doesn't grow with the length of the run.
+    """
+    def __init__(self, filename: str, flush_rows: int, flush_seconds: float):
+        self.filename = filename
+        self._body_filename = filename + '.body'
+        if os.path.exists(self._body_filename):
+            os.remove(self._body_filename)
+        self._body = _BufferedFile(self._body_filename, flush_rows, flush_seconds)
+
+        self._dataheader: list = []
+        self._width = 0 #width of the most recent row
+        self._wrote_so_far = False #see writeSoFar()
+
+    def setHeader(self, dataheader: list) -> None:
+        self._dataheader = dataheader
+
+    def write(self, dataheader: list, datarow: list) -> None:
+        self.setHeader(dataheader)
+        self._width = len(datarow)
+        self._body.writeLine(rowToCsvLine(datarow))
+
+    def numBufferedRows(self) -> int:
+        return self._body.numBufferedRows()
+
+    def flush(self) -> None:
+        self._body.flush()
+
+    def close(self) -> None:
+        """Write the final csv: header, then zero-padded rows"""
+        if self._body.closed:
+            return
+        self._body.close()
+
+        if self._wrote_so_far:
+            os.remove(self.filename)
+        is_new = not os.path.exists(self.filename)
+        with open(self.filename, 'a') as f_out:
+            if is_new:
+                f_out.write(headerToCsvLine(self._dataheader))
+            self._writeBody(f_out)
+        os.remove(self._body_filename)
+
+    def writeSoFar(self) -> None:
+        """Write the csv of the rows so far, but keep spooling. For a run
+        that stopped early but may resume: resuming removes it, and
+        close() remakes it (see __setstate__)"""
+        if self._body.closed:
+            return
+        self._body.flush()
+        with open(self.filename + '.tmp', 'w') as f_out:
+            f_out.write(headerToCsvLine(self._dataheader))
+            self._writeBody(f_out)
+        os.replace(self.filename + '.tmp', self.filename)
+        self._wrote_so_far = True
+
+    def _writeBody(self, f_out) -> None:
+        with open(self._body_filename, 'r') as f_body:
+            for line in f_body:
+                n_pad = self._width - (line.count(',') + 1)
+                if n_pad > 0:
+                    line = line[:-1] + ", 0" * n_pad + "\n"
+                f_out.write(line)
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        if not self._body.closed and os.path.exists(self.filename):
+            os.remove(self.filename) #from a crashed run. Remade on close()
+
+#=======================================================================
+#columnar output
+COLUMNAR_FORMAT = 'tokenspice-columnar'
+COLUMNAR_VERSION = 1
+MANIFEST_FILENAME = 'manifest.json'
+VALUES_FILENAME = 'values.npy'
+
+@enforce_types
+class ColumnarSink:
+    """Binary, columnar alternative to PaddedCsvSink. Output is a directory:
+      manifest.json -- column names, the row each column starts at, chunks
+      chunk_NNNNN.npy (or .npz if compressed) -- float64 [row_i, col_i]
+      values.npy -- on close, if not compressed: all chunks in one array
+
+    Values before a column's start_row are NaN, not zero. Column i is
+    named by the last-seen header at position i. Load with loadColumnar().
+    """
+    def __init__(self, dirname: str, flush_rows: int, flush_seconds: float,
+                 compress: bool = False):
+        assert flush_rows > 0
+        self.dirname = dirname
+        self._flush_rows = flush_rows
+        self._flush_seconds = flush_seconds
+        self._compress = compress
+        if not os.path.exists(dirname):
+            os.mkdir(dirname)
+
+        self._dataheader: list = []
+        self._columns: list = [] #list of dict with 'name', 'start_row'
+        self._chunks: list = [] #list of dict with 'file','row_start',..
+        self._n_rows = 0 #num rows flushed to chunks
+
+        self._buf: list = [] #list of rows (list of float)
+        self._last_flush_time = time.time()
+        self._closed = False
+
+    def setHeader(self, dataheader: list) -> None:
+        self._dataheader = dataheader
+
+    def write(self, dataheader: list, datarow: list) -> None:
+        self.setHeader(dataheader)
+        row_i = self._n_rows + len(self._buf)
+        for col_i in range(len(self._columns), len(datarow)):
+            self._columns.append({'name': '', 'start_row': row_i})
+        self._buf.append(datarow)
+        if len(self._buf) >= self._flush_rows or \
+           (time.time() - self._last_flush_time) >= self._flush_seconds:
+            self.flush()
+
+    def numBufferedRows(self) -> int:
+        return len(self._buf)
+
+    def flush(self) -> None:
+        if self._buf:
+            n_cols = max(len(row) for row in self._buf)
+            chunk = numpy.full((len(self._buf), n_cols), numpy.nan)
+            for row_i, row in enumerate(self._buf):
+                chunk[row_i, :len(row)] = row
+
+            base = 'chunk_%05d' % len(self._chunks)
+            if self._compress:
+                filename = base + '.npz'
+                numpy.savez_compressed(
+                    os.path.join(self.dirname, filename), values=chunk)
+            else:
+                filename = base + '.npy'
+                numpy.save(os.path.join(self.dirname, filename), chunk)
+            self._chunks.append({'file': filename, 'row_start': self._n_rows,
+                                 'n_rows': len(self._buf), 'n_cols': n_cols})
+            self._n_rows += len(self._buf)
+            self._buf = []
+        self._writeManifest(values_file=None)
+        self._last_flush_time = time.time()
+
+    def close(self) -> None:
+        """Flush, and if not compressed, consolidate chunks into
+        one values.npy that loads zero-copy via mmap"""
+        if self._closed:
+            return
+        self.flush()
+        values_file = None
+        if not self._compress:
+            values_file = VALUES_FILENAME
+            filename = os.path.join(self.dirname, values_file)
+            values = numpy.lib.format.open_memmap(
+                filename, mode='w+', dtype=numpy.float64,
+                shape=(self._n_rows, len(self._columns)))
+            values[:] = numpy.nan
+            for chunk_info in self._chunks:
+                chunk = _loadChunk(self.dirname, chunk_info)
+                r0 = chunk_info['row_start']
+                values[r0:r0 + chunk.shape[0], :chunk.shape[1]] = chunk
+            values.flush()
+            del values
+            for chunk_info in self._chunks:
+                os.remove(os.path.join(self.dirname, chunk_info['file']))
+            self._chunks = []
+        self._writeManifest(values_file)
+        self._closed = True
+
+    #for checkpoints
+    def __getstate__(self) -> dict:
+        if not self._closed:
+            self.flush()
+        return dict(self.__dict__)
+
+    def __setstate__(self, state: dict):
+        """Drop chunks written after the checkpoint"""
+        self.__dict__.update(state)
+        if self._closed:
+            return
+        chunk_files = set(chunk_info['file'] for chunk_info in self._chunks)
+        for filename in os.listdir(self.dirname):
+            if filename.startswith('chunk_') and filename not in chunk_files:
+                os.remove(os.path.join(self.dirname, filename))
+        self._writeManifest(values_file=None)
+        self._last_flush_time = time.time()
+
+    def _writeManifest(self, values_file) -> None:
+        for col_i, col in enumerate(self._columns):
+            if col_i < len(self._dataheader):
+                col['name'] = self._dataheader[col_i]
+        manifest = {
+            'format': COLUMNAR_FORMAT,
+            'version': COLUMNAR_VERSION,
+            'dtype': 'float64',
+            'compressed': self._compress,
+            'n_rows': self._n_rows,
+            'header': self._dataheader,
+            'columns': self._columns,
+            'chunks': self._chunks,
+            'values_file': values_file,
+        }
+        filename = os.path.join(self.dirname, MANIFEST_FILENAME)
+        with open(filename + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(filename + '.tmp', filename) #atomic
+
+@enforce_types
+def isColumnar(dirname: str) -> bool:
+    return os.path.exists(os.path.join(dirname, MANIFEST_FILENAME))
+
+@enforce_types
+def loadColumnar(dirname: str, mmap: bool = True):
+    """
+    Load output of ColumnarSink.
+
+    :param: dirname: directory written by ColumnarSink
+    :param: mmap: if True and there's a consolidated values.npy,
+      memory-map it (zero-copy) rather than read it into RAM
+    :return: header -- List[str] holding 'Tick', 'Second', ...
+    :return: values -- 2d float64 array [row_i, col_i]. NaN before a
+      column's start_row
+    :return: start_rows -- List[int], the row where each column starts
+    """
+    with open(os.path.join(dirname, MANIFEST_FILENAME), 'r') as f:
+        manifest = json.load(f)
+    assert manifest['format'] == COLUMNAR_FORMAT
+    columns = manifest['columns']
+    header = [col['name'] for col in columns]
+    start_rows = [col['start_row'] for col in columns]
+
+    if manifest['values_file'] is not None:
+        mmap_mode = 'r' if mmap else None
+        values = numpy.load(os.path.join(dirname, manifest['values_file']),
+                            mmap_mode=mmap_mode)
+    else:
+        values = numpy.full((manifest['n_rows'], len(columns)), numpy.nan)
+        for chunk_info in manifest['chunks']:
+            chunk = _loadChunk(dirname, chunk_info)
+            r0 = chunk_info['row_start']
+            values[r0:r0 + chunk.shape[0], :chunk.shape[1]] = chunk
+    return header, values, start_rows
+
+@enforce_types
+def _loadChunk(dirname: str, chunk_info: dict):
+    filename = os.path.join(dirname, chunk_info['file'])
+    if filename.endswith('.npz'):
+        with numpy.load(filename) as npz:
+            return npz['values']
+    return numpy.load(filename)
@@ -2,11 +2,17 @@ import logging
 log = logging.getLogger('master')
 
 from enforce_typing import enforce_types
-from tqdm import tqdm
+import json
+import math
 import os
 import time
 
-from util import valuation
+from engine import Checkpoint, EventLog
+from engine.LogPolicy import WindowAggregator
+from engine.Telemetry import Telemetry
+from engine.ResultSink import CsvSink, PaddedCsvSink, ColumnarSink
+from util import timing, valuation
+from web3tools import txpipeline
 from util.constants import S_PER_MIN, S_PER_HOUR, S_PER_DAY, S_PER_MONTH, S_PER_YEAR
 
 @enforce_types
@@ -24,13 +30,38 @@ class SimEngine(object):
         self.state = state
         self.output_dir = output_dir
         self.output_csv = "data.csv" #magic number
+        self.output_cols = "data_cols" #magic number. For columnar format
+        self.output_timing = "timing.json" #magic number
+        self.output_metrics = "metrics.jsonl" #magic number
+        self.output_stop = "stop.json" #magic number
+        self.output_events = "events.bin" #magic number
         self.netlist_log_func = netlist_log_func
         self.netlist_rp_log_func = netlist_rp_log_func
 
-        self.all_rows: list = []
-        self.all_rp_rows: list = []
         self.dataheader: list = []
         self.rp_dataheader: list = []
+
+        #result sinks. Opened on first log, closed at end of run()
+        self._sinks_open = False
+        self._data_sink = None #data.csv, or data_cols/ if columnar
+        self._datax_sink = None #datax.csv: data.csv zero-padded. Csv only
+        self._rpdata_sink = None #rpdata.csv, or rpdata_cols/ if columnar
+
+        #aggregate log data between rows. If ss.log_policy.isAggregating()
+        self._data_agg = None
+        self._rp_data_agg = None
+
+        #wall-clock time of last checkpoint. See ss.checkpoint_seconds
+        self._last_checkpoint_time = time.time()
+
+        #live metrics. Every ss.metrics_seconds
+        self._telemetry = Telemetry(os.path.join(output_dir, self.output_metrics))
+
+        #why the run stopped. Set by doStop()
+        self.stop_reason = None
+
+        #events.bin. If ss.event_log. Opened at start of run()
+        self._event_log = None
         
     def run(self):
         """
@@ -43,35 +74,165 @@ class SimEngine(object):
         log.info("Begin.")
         log.info(str(self.state.ss) + "\n")
 
-        while True:
-            self.takeStep()
-            if self.doStop():
-                self.createNewCsv()
-                self.createResearchCsv()
-                break
-            self.state.tick += 1 #could be e.g. 10 or 100 or ..
+        self._last_checkpoint_time = time.time()
+        timing.reset()
+        timing.setEnabled(self.state.ss.collect_timing)
+        txpipeline.setEnabled(self.state.ss.tx_pipeline)
+        for stop_condition in self.state.ss.stop_conditions:
+            stop_condition.start(self.state)
+        self.startEventLog()
+        tick0, t0 = self.state.tick, time.time()
+        self._telemetry.start(self.state.tick)
+        done = False
+        try:
+            while True:
+                self.takeStep()
+                if self.doStop():
+                    break
+                self.state.tick += 1 #could be e.g. 10 or 100 or ..
+                if self.state.ss.fast_forward:
+                    self.fastForward()
+                self.maybeCheckpoint()
+                self.maybeEmitMetrics()
+            done = True
+        finally:
+            if self._event_log is not None:
+                EventLog.setActive(None)
+                self._event_log.flush()
+            txpipeline.reset()
+            txpipeline.setEnabled(False)
+            if self.state.ss.metrics_seconds is not None and self._openSinks():
+                self._telemetry.emit(self, 'done' if done else 'failed')
+            self.writeTiming(self.state.tick - tick0, time.time() - t0)
+            if done:
+                self.writeStop()
+            if done or not Checkpoint.hasCheckpoint(self.output_dir):
+                self.closeSinks()
+            else: #keep results resumable
+                self.flushSinks()
+                log.info("Stopped early. Resume with checkpoint in %s"
+                         % self.output_dir)
+        Checkpoint.removeCheckpoint(self.output_dir)
         log.info("Done")
 
+    def startEventLog(self) -> None:
+        """If ss.event_log, start logging events. A new log begins with
+        every agent's address & balances; a resumed one carries on"""
+        if not self.state.ss.event_log or not self._openSinks():
+            return
+        if self._event_log is None:
+            self._event_log = EventLog.EventLog(
+                os.path.join(self.output_dir, self.output_events))
+            EventLog.setActive(self._event_log)
+            addresses = set()
+            for agent in self.state.agents.values():
+                self.state.logAgent(agent)
+                if agent.address not in addresses:
+                    addresses.add(agent.address)
+                    agent._wallet._logInitialBalances()
+                elif agent.USD() != 0.0: #population member. OCEAN is pooled
+                    EventLog.transfer('USD', EventLog.MINT, agent.address,
+                                      agent.USD())
+        EventLog.setActive(self._event_log)
+
+    def maybeCheckpoint(self) -> None:
+        """Checkpoint if ss.checkpoint_seconds have passed since the last.
+        Called between ticks. See engine/Checkpoint.py"""
+        checkpoint_seconds = self.state.ss.checkpoint_seconds
+        if checkpoint_seconds is None:
+            return
+        if (time.time() - self._last_checkpoint_time) < checkpoint_seconds:
+            return
+        self._openSinks() #make sure output_dir exists
+        with timing.timer('engine', 'checkpoint'):
+            Checkpoint.saveCheckpoint(self)
+        self._last_checkpoint_time = time.time()
+
+    def maybeEmitMetrics(self) -> None:
+        """Append to metrics.jsonl if ss.metrics_seconds have passed since
+        the last time. See engine/Telemetry.py"""
+        metrics_seconds = self.state.ss.metrics_seconds
+        if metrics_seconds is None:
+            return
+        if self._telemetry.secondsSinceEmit() < metrics_seconds:
+            return
+        if self._openSinks(): #make sure output_dir exists
+            self._telemetry.emit(self)
+
+    def numBufferedRows(self) -> int:
+        """Result rows held in memory, not yet written to disk"""
+        sinks = [self._data_sink, self._datax_sink, self._rpdata_sink]
+        return sum(sink.numBufferedRows() for sink in sinks if sink is not None)
+
     def takeStep(self) -> None:
         """Run one tick, updates self.state"""
         log.debug("=============================================")
         log.debug("Tick=%d: begin" % (self.state.tick))
         
-        if (self.elapsedSeconds() % S_PER_DAY) == 0:
-            s, dataheader, datarow  = self.createLogData()
-            self.dataheader = dataheader
-            log.info("".join(s))
-            self.logToCsv(dataheader, datarow)
-
-            rp_dataheader = self.createResearchLogData()
-            self.rp_dataheader = rp_dataheader
+        policy = self.state.ss.log_policy
+        is_log_tick = policy.isLogTick(self.elapsedSeconds())
+        if is_log_tick or policy.isAggregating():
+            self.logData(is_log_tick)
 
         #main work
+        if self._event_log is not None:
+            self._event_log.tick(self.state.tick)
+        t0 = timing.now()
         self.state.takeStep()
+        timing.add('engine', 'state.takeStep', timing.now() - t0)
+
+        #tick barrier: wait for this tick's pipelined EVM txs
+        if txpipeline.ENABLED:
+            txpipeline.settle()
         
         log.debug("=============================================")
         log.debug("Tick=%d: done" % self.state.tick)
 
+    def logData(self, is_log_tick: bool, n_ticks: int = 1) -> None:
+        """Log a row if it's a log tick. If aggregating, first add this
+        tick's data (which holds for n_ticks) to the window"""
+        s, dataheader, datarow = self.createLogData()
+        rp_dataheader, rp_datarow = self.createResearchLogData()
+        if self.state.ss.log_policy.isAggregating():
+            if self._data_agg is None:
+                self._data_agg = WindowAggregator(self.state.ss.log_policy)
+                self._rp_data_agg = WindowAggregator(self.state.ss.log_policy)
+            self._data_agg.addRow(dataheader, datarow, n_ticks)
+            self._rp_data_agg.addRow(rp_dataheader, rp_datarow, n_ticks)
+            if not is_log_tick:
+                return
+            dataheader, datarow = self._data_agg.popRow()
+            rp_dataheader, rp_datarow = self._rp_data_agg.popRow()
+
+        self.dataheader = dataheader
+        log.info("".join(s))
+        self.rp_dataheader = rp_dataheader
+        with timing.timer('log', 'sinks'):
+            self.logToCsv(dataheader, datarow)
+            self.logToResearchCsv(rp_dataheader, rp_datarow)
+
+    def fastForward(self) -> None:
+        """Jump over the ticks before the next one where an agent is due,
+        results are logged, a stop condition is checked, or the run stops"""
+        state = self.state
+        target_tick = min([state.nextDueTick(), self.nextLogTick(),
+                           math.ceil(state.ss.max_ticks)] +
+                          [stop_condition.nextDueTick(state.tick)
+                           for stop_condition in state.ss.stop_conditions])
+        n_ticks = target_tick - state.tick
+        if n_ticks > 0:
+            log.debug("Tick=%d: fast-forward %d ticks" % (state.tick, n_ticks))
+            if state.ss.log_policy.isAggregating(): #data holds while quiet
+                self.logData(is_log_tick=False, n_ticks=n_ticks)
+            state.fastForward(n_ticks)
+
+    def nextLogTick(self) -> int:
+        """First tick >= current tick at which a row is logged"""
+        time_step = self.state.ss.time_step
+        log_period = self.state.ss.log_policy.period
+        period = log_period // math.gcd(time_step, log_period) #ticks per log
+        return math.ceil(self.state.tick / period) * period
+
     def createLogData(self):
         """Compute this iter's status, and output in forms ready
         for console logging and csv logging."""
@@ -98,11 +259,12 @@ class SimEngine(object):
 
         #other columns to log
         if self.netlist_log_func is not None:
+            t0 = timing.now()
             s2, dataheader2, datarow2 = self.netlist_log_func(state)
+            timing.add('log', 'netlist_log_func', timing.now() - t0)
             s += s2
             dataheader += dataheader2
             datarow += datarow2
-            self.all_rows.append(datarow)
 
         return s, dataheader, datarow
 
@@ -132,31 +294,85 @@ class SimEngine(object):
 
         #other columns to log
         if self.netlist_rp_log_func is not None:
+            t0 = timing.now()
             dataheader2, datarow2 = self.netlist_rp_log_func(state)
+            timing.add('log', 'netlist_rp_log_func', timing.now() - t0)
             dataheader += dataheader2
             datarow += datarow2
-            self.all_rp_rows.append(datarow)
 
-        return dataheader
+        return dataheader, datarow
 
     def logToCsv(self, dataheader, datarow) -> None:
-        if self.output_dir is None:
+        if not self._openSinks():
             return
-                
+        self._data_sink.write(dataheader, datarow)
+        if self._datax_sink is None: #columnar
+            return
+        if self.netlist_log_func is None:
+            self._datax_sink.setHeader(dataheader)
+        else:
+            self._datax_sink.write(dataheader, datarow)
+
+    def logToResearchCsv(self, dataheader, datarow) -> None:
+        if not self._openSinks():
+            return
+        if self.netlist_rp_log_func is None:
+            self._rpdata_sink.setHeader(dataheader)
+        else:
+            self._rpdata_sink.write(dataheader, datarow)
+
+    def _openSinks(self) -> bool:
+        """Open result sinks if needed. Returns False if no output_dir."""
+        if self.output_dir is None:
+            return False
+        if self._sinks_open:
+            return True
+        
         if not os.path.exists(self.output_dir):
             os.mkdir(self.output_dir)
-            
-        full_filename = os.path.join(self.output_dir, self.output_csv)
-        
-        #if needed, create file and add header
-        if not os.path.exists(full_filename):
-            with open(full_filename,'w+') as f:
-                f.write(", ".join(dataheader) + "\n")
-            
-        #add in row
-        datarow_s = ['%g' % dataval for dataval in datarow]
-        with open(full_filename,'a+') as f:
-            f.write(", ".join(datarow_s) + "\n")
+
+        ss = self.state.ss
+        n, t = ss.log_flush_rows, ss.log_flush_seconds
+        join = lambda filename: os.path.join(self.output_dir, filename)
+        if ss.output_format == 'csv':
+            self._data_sink = CsvSink(join(self.output_csv), n, t)
+            self._datax_sink = PaddedCsvSink(join('datax.csv'), n, t)
+            self._rpdata_sink = PaddedCsvSink(join('rpdata.csv'), n, t)
+        elif ss.output_format == 'columnar':
+            #columnar handles new columns itself, so no need for datax
+            c = ss.output_compress
+            self._data_sink = ColumnarSink(join(self.output_cols), n, t, c)
+            self._rpdata_sink = ColumnarSink(join('rpdata_cols'), n, t, c)
+        else:
+            raise ValueError(ss.output_format)
+        self._sinks_open = True
+        return True
+
+    def writeTiming(self, n_ticks: int, wall_s: float) -> None:
+        """Write timing.json: where the time went. See util/timing.py"""
+        if not self.state.ss.collect_timing or not self._openSinks():
+            return
+        timing.writeReport(
+            os.path.join(self.output_dir, self.output_timing),
+            {'n_ticks': n_ticks, 'wall_s': wall_s,
+             'ticks_per_s': n_ticks / wall_s if wall_s > 0 else 0.0})
+
+    def flushSinks(self) -> None:
+        """Flush all results, but keep them resumable. Also writes datax.csv
+        and rpdata.csv as of now; a resumed run remakes them"""
+        for sink in [self._data_sink, self._datax_sink, self._rpdata_sink]:
+            if sink is not None:
+                sink.flush()
+        for sink in [self._datax_sink, self._rpdata_sink]:
+            if isinstance(sink, PaddedCsvSink):
+                sink.writeSoFar()
+
+    def closeSinks(self) -> None:
+        """Flush & close all results. Creates datax.csv and rpdata.csv
+        (or finalizes data_cols/ and rpdata_cols/)"""
+        for sink in [self._data_sink, self._datax_sink, self._rpdata_sink]:
+            if sink is not None:
+                sink.close()
 
     def elapsedSeconds(self) -> int:
         return self.state.tick * self.state.ss.time_step
@@ -164,46 +380,28 @@ class SimEngine(object):
     def doStop(self) -> bool:
         if self.state.tick >= self.state.ss.max_ticks:
             log.info("Stop: tick (%d) >= max" % self.state.tick)
+            self.stop_reason = "max_ticks"
             return True
+
+        for stop_condition in self.state.ss.stop_conditions:
+            if not stop_condition.isDue(self.state.tick):
+                continue
+            with timing.timer('engine', 'stop_conditions'):
+                reason = stop_condition.reason(self.state)
+            if reason is not None:
+                log.info("Stop: tick=%d, %s" % (self.state.tick, reason))
+                self.stop_reason = reason
+                return True
         
         return False
 
-    def createNewCsv(self) -> None:
-        for row in tqdm(self.all_rows):
-            while len(row) != len(self.all_rows[-1]):
-                row.append(0)
-        if self.output_dir is None:
-            return
-
-        full_filename = os.path.join(self.output_dir, 'datax.csv')
-
-        #if needed, create file and add header
-        if not os.path.exists(full_filename):
-            with open(full_filename,'w+') as f:
-                f.write(", ".join(self.dataheader) + "\n")
-
-        #add in row
-        for row in self.all_rows:
-            datarow_s = ['%g' % dataval for dataval in row]
-            with open(full_filename,'a+') as f:
-                f.write(", ".join(datarow_s) + "\n")
-
-    def createResearchCsv(self) -> None:
-        for row in tqdm(self.all_rp_rows):
-            while len(row) != len(self.all_rp_rows[-1]):
-                row.append(0)
-        if self.output_dir is None:
+    def writeStop(self) -> None:
+        """Write stop.json: why and when the run stopped"""
+        if not self._openSinks():
             return
-
-        full_filename = os.path.join(self.output_dir, 'rpdata.csv')
-
-        #if needed, create file and add header
-        if not os.path.exists(full_filename):
-            with open(full_filename,'w+') as f:
-                f.write(", ".join(self.rp_dataheader) + "\n")
-
-        #add in row
-        for row in self.all_rp_rows:
-            datarow_s = ['%g' % dataval for dataval in row]
-            with open(full_filename,'a+') as f:
-                f.write(", ".join(datarow_s) + "\n")
\ No newline at end of file
+        filename = os.path.join(self.output_dir, self.output_stop)
+        with open(filename, 'w') as f:
+            json.dump({'reason': self.stop_reason,
+                       'tick': self.state.tick,
+                       'max_ticks': self.state.ss.max_ticks,
+                       'elapsed_s': self.elapsedSeconds()}, f, indent=1)
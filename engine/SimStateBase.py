@@ -1,36 +1,76 @@
 from enforce_typing import enforce_types
+import concurrent.futures
+import heapq
+import threading
+
+from engine.AgentBase import AgentBase, NEVER_WAKE
 from engine.AgentDict import AgentDict
+from engine.SimStrategyBase import SimStrategyBase
+from engine import AgentWallet, EventLog
+from util import timing
+from web3tools import txpipeline
 
 @enforce_types
 class SimStateBase(object):
-    
+
     def __init__(self, ss=None):
         #number of ticks elapsed in the simulation
         self.tick = 0
 
         #child of SimStrategy. Holds max num ticks, etc.
         self.ss = ss
-            
+
         #agent instances. Holds state for each agent
         self.agents = AgentDict() #agent_name : Agent instance
 
         #extra-agenent state variables, to track metrics. Child of Kpis
         self.kpis = None
-            
+
+        #event-driven scheduling of agents. See AgentBase.nextWakeTick()
+        self._resetSchedule()
+        self._sched_prev_tick = None #tick of the last takeStep()
+        self._sched_repeat = False #in a takeStep() at an unmoved tick
+
+    @property
+    def ss(self):
+        return self._ss
+
+    @ss.setter
+    def ss(self, ss) -> None:
+        """Netlists set this in __init__, before making agents. So apply
+        ss's process-wide settings then, e.g. token backend"""
+        self._ss = ss
+        if isinstance(ss, SimStrategyBase):
+            ss.applyProcessSettings()
+
     def takeStep(self) -> None:
         """This happens once per tick"""
-        #update agents
-        for agent in list(self.agents.values()):
-            agent.takeStep(self)
+        #update agents. Those that use nextWakeTick() only when due.
+        # Concurrently if ss.parallel_agents
+        n_threads = getattr(self.ss, 'parallel_agents', 0)
+        if self.tick == self._sched_prev_tick:
+            self._stepAllAgents()
+        elif n_threads > 1:
+            self._stepAgentsInWaves(n_threads)
+        else:
+            for name in self._dueAgentNames():
+                self._stepAgent(name, self.agents[name])
+        self._sched_prev_tick = self.tick
 
         #update global state values
+        t0 = timing.now()
         self.kpis.takeStep(self)
+        timing.add('kpis', type(self.kpis).__name__, timing.now() - t0)
 
     #==============================================================
     #basic agent management
     def getAgent(self, name: str):
         return self.agents[name]
-        
+
+    def balancesOf(self, token=None, names=None) -> dict:
+        """{name : balance}, read in one batch. See AgentDict.balancesOf"""
+        return self.agents.balancesOf(token, names)
+
     def allAgents(self):
         return set(self.agents.values())
 
@@ -38,7 +78,289 @@ class SimStateBase(object):
         return len(self.agents)
 
     def addAgent(self, agent):
-        assert agent.name not in self.agents, "have an agent with this name" 
+        assert agent.name not in self.agents, "have an agent with this name"
         self.agents[agent.name] = agent
+        if EventLog.isActive():
+            self.logAgent(agent)
+
+    def addAgents(self, agents, materialize: bool = False) -> None:
+        """Add many agents at once. With materialize, also put their
+        wallets on-chain now, in one batch of txs, rather than one by one
+        at each agent's first on-chain action"""
+        agents = list(agents)
+        names = [agent.name for agent in agents]
+        assert len(set(names)) == len(names), "have duplicate agent names"
+        for agent in agents:
+            self.addAgent(agent)
+        if materialize:
+            AgentWallet.materializeAll([agent._wallet for agent in agents])
+
+    def spawnAgents(self, agent_class, specs: list,
+                    materialize: bool = False) -> list:
+        """Make an agent_class(**spec) for each spec, then addAgents()"""
+        agents = [agent_class(**spec) for spec in specs]
+        self.addAgents(agents, materialize)
+        return agents
+
+    def logAgent(self, agent) -> None:
+        """Map the agent's address to its name, in the event log"""
+        EventLog.action(agent.name, 'addAgent', {
+            'address': agent.address, 'class': type(agent).__name__})
+
+    #==============================================================
+    #agent scheduling
+    def nextDueTick(self) -> int:
+        """The earliest tick at which any agent needs a takeStep().
+        If some agent steps every tick, that's the current tick."""
+        self._syncSchedule()
+        if self._sched_every:
+            return self.tick
+        self._dropStale()
+        if self._sched_heap:
+            return self._sched_heap[0][0]
+        return NEVER_WAKE
+
+    def wakeAgent(self, name: str) -> None:
+        """Make a scheduled agent due as soon as possible: this tick if
+        its turn hasn't come yet, otherwise next tick."""
+        if self._sched_wave_wakes is not None: #from a concurrent step
+            self._sched_wave_wakes.append((_stepping.order, name))
+            return
+        self._syncSchedule()
+        if name not in self._sched_wake:
+            return #stepped every tick anyway
+        order = self._sched_order[name]
+        stepping = self._sched_stepping
+        if stepping is None or order > stepping:
+            wake_tick = self.tick
+        else:
+            wake_tick = self.tick + 1
+        if self._sched_wake[name] > wake_tick:
+            self._pushWake(name, wake_tick)
+
+    def fastForward(self, n_ticks: int) -> None:
+        """Advance n_ticks ticks at which no agent is due, in one go.
+        SimEngine calls this if ss.fast_forward. Children whose
+        takeStep() does more than step agents & kpis must override."""
+        assert n_ticks >= 0
+        self.kpis.takeSteps(self, n_ticks)
+        self.tick += n_ticks
+
+    def _resetSchedule(self) -> None:
+        self._sched_agents = self.agents #to detect if self.agents is replaced
+        self._sched_n_added = 0
+        self._sched_order: dict = {} #agent_name : order added
+        self._sched_every: list = [] #[(order, agent_name)]. Every tick
+        self._sched_heap: list = [] #[(wake_tick, order, agent_name)]
+        self._sched_wake: dict = {} #agent_name : wake_tick. Heap agents
+        self._sched_last_tick: dict = {} #agent_name : tick of last step
+        self._sched_stepping = None #order of agent in takeStep(), if any
+        self._sched_wave_wakes = None #[(waker order, agent_name)]. In waves
+
+    def _syncSchedule(self) -> None:
+        """Pick up agents that were put into self.agents directly (vs
+        addAgent). They're due right away, or next tick if added during
+        a tick. Agents are never removed, so a change in count is enough
+        to detect new ones."""
+        if self._sched_agents is not self.agents:
+            self._resetSchedule()
+        if len(self.agents) == len(self._sched_order):
+            return
+
+        wake_tick = self.tick if self._sched_stepping is None else self.tick + 1
+        for name, agent in self.agents.items():
+            if name in self._sched_order:
+                continue
+            order = self._sched_n_added
+            self._sched_n_added += 1
+            self._sched_order[name] = order
+            if type(agent).nextWakeTick is AgentBase.nextWakeTick:
+                self._sched_every.append((order, name)) #no scheduling
+            else:
+                if agent.WAKE_ON_RECEIVE:
+                    agent._wake_state = self
+                self._pushWake(name, wake_tick)
+
+    def _pushWake(self, name: str, wake_tick: int) -> None:
+        """Schedule agent at wake_tick. Its older heap entries go stale"""
+        self._sched_wake[name] = wake_tick
+        if wake_tick < NEVER_WAKE:
+            order = self._sched_order[name]
+            heapq.heappush(self._sched_heap, (wake_tick, order, name))
+
+    def _dropStale(self) -> None:
+        heap, wake = self._sched_heap, self._sched_wake
+        while heap and wake[heap[0][2]] != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _dueAgentNames(self):
+        """Yield names of agents to step this tick, in the order they were
+        added. Includes agents woken during the tick, via wakeAgent()"""
+        self._syncSchedule()
+        every, n_every = self._sched_every, len(self._sched_every)
+        heap = self._sched_heap
+        every_i = 0
+        try:
+            while True:
+                self._dropStale()
+                heap_due = bool(heap) and heap[0][0] <= self.tick
+                if every_i < n_every and \
+                   (not heap_due or every[every_i][0] < heap[0][1]):
+                    order, name = every[every_i]
+                    every_i += 1
+                elif heap_due:
+                    _, order, name = heapq.heappop(heap)
+                else:
+                    break
+                self._sched_stepping = order
+                yield name
+        finally:
+            self._sched_stepping = None
+
+    def _stepAllAgents(self) -> None:
+        """For a takeStep() at the same tick as the last one, e.g. by
+        tests that don't advance the tick: step every agent, and count
+        the call as a tick, like before scheduling. (Otherwise, agents
+        waiting for a later tick would never be due.)"""
+        self._syncSchedule()
+        self._sched_repeat = True
+        try:
+            for name, order in list(self._sched_order.items()):
+                self._sched_stepping = order
+                self._stepAgent(name, self.agents[name])
+        finally:
+            self._sched_repeat = False
+            self._sched_stepping = None
+
+    def _stepAgent(self, name: str, agent) -> None:
+        scheduled = self._beforeStep(name, agent)
+        txpipeline.setOrigin(name)
+        t0 = timing.now()
+        agent.takeStep(self)
+        timing.add('agents', type(agent).__name__, timing.now() - t0)
+        if scheduled:
+            self._afterStep(name, agent)
+
+    def _beforeStep(self, name: str, agent) -> bool:
+        """Returns True if the agent needs _afterStep()"""
+        if name not in self._sched_last_tick and \
+           type(agent).nextWakeTick is AgentBase.nextWakeTick:
+            return False #no scheduling; fast path
+        last_tick = self._sched_last_tick.get(name)
+        if self._sched_repeat:
+            agent._ticks_since_step = 1
+        elif last_tick is not None:
+            agent._ticks_since_step = self.tick - last_tick
+        return True
+
+    def _afterStep(self, name: str, agent) -> None:
+        self._sched_last_tick[name] = self.tick
+        wake_tick = agent.nextWakeTick(self)
+        if wake_tick is None:
+            wake_tick = self.tick + 1
+        self._pushWake(name, max(wake_tick, self.tick + 1))
+
+    #==============================================================
+    #concurrent agent steps. See AgentBase.READS, WRITES
+    def _stepAgentsInWaves(self, n_threads: int) -> None:
+        """Step due agents in waves: runs of agents, in the order they were
+        added, whose read & write sets don't conflict. Each wave's agents
+        are stepped concurrently, so results are as if one at a time.
+        Bookkeeping & wakeAgent() calls are applied after the wave, in
+        order. Agents woken by a wave are stepped after it.
+
+        Experimental: no netlist turns it on yet. See
+        SimStrategy.setParallelAgents"""
+        self._syncSchedule()
+        executor = _executor(n_threads)
+        every, n_every = self._sched_every, len(self._sched_every)
+        heap = self._sched_heap
+        every_i = 0
+        wave: list = [] #[(order, name, agent)]
+        wave_reads, wave_writes = frozenset(), frozenset()
+        try:
+            while True:
+                #peek at the next due agent, like _dueAgentNames()
+                self._dropStale()
+                heap_due = bool(heap) and heap[0][0] <= self.tick
+                from_every = every_i < n_every and \
+                    (not heap_due or every[every_i][0] < heap[0][1])
+                if not (from_every or heap_due):
+                    if not wave:
+                        break
+                    self._stepWave(wave, executor)
+                    wave = []
+                    continue #it may have woken some
+                order, name = every[every_i] if from_every else heap[0][1:]
+                agent = self.agents[name]
+                reads, writes = agent.readSet(self), agent.writeSet(self)
+                if wave and _conflict(reads, writes, wave_reads, wave_writes):
+                    self._stepWave(wave, executor)
+                    wave = []
+                    continue
+
+                #add it to the wave
+                if from_every:
+                    every_i += 1
+                else:
+                    heapq.heappop(heap)
+                if not wave:
+                    wave_reads, wave_writes = frozenset(), frozenset()
+                wave.append((order, name, agent))
+                if reads is None or writes is None or wave_reads is None:
+                    wave_reads = wave_writes = None #it's on its own
+                else:
+                    wave_reads, wave_writes = \
+                        wave_reads | reads, wave_writes | writes
+        finally:
+            self._sched_stepping = None
+
+    def _stepWave(self, wave: list, executor) -> None:
+        if len(wave) == 1:
+            order, name, agent = wave[0]
+            self._sched_stepping = order
+            self._stepAgent(name, agent)
+            return
+
+        self._sched_stepping = wave[-1][0] #for agents added mid-wave
+        scheduled = [self._beforeStep(name, agent)
+                     for _, name, agent in wave]
+        self._sched_wave_wakes = []
+        try:
+            futures = [executor.submit(_timedStep, order, agent, self)
+                       for order, _, agent in wave]
+            concurrent.futures.wait(futures)
+            seconds = [future.result() for future in futures] #may raise
+        finally:
+            wakes, self._sched_wave_wakes = self._sched_wave_wakes, None
+
+        for (_, name, agent), s, sched in zip(wave, seconds, scheduled):
+            timing.add('agents', type(agent).__name__, s)
+            if sched:
+                self._afterStep(name, agent)
+        for waker_order, name in sorted(wakes): #deterministic
+            self._sched_stepping = waker_order
+            self.wakeAgent(name)
+
+_stepping = threading.local() #order of the agent a worker steps
+_EXECUTORS: dict = {} #n_threads : ThreadPoolExecutor
+
+def _executor(n_threads: int):
+    if n_threads not in _EXECUTORS:
+        _EXECUTORS[n_threads] = concurrent.futures.ThreadPoolExecutor(
+            n_threads, thread_name_prefix='agents')
+    return _EXECUTORS[n_threads]
 
+def _timedStep(order: int, agent, state) -> float:
+    _stepping.order = order
+    txpipeline.setOrigin(agent.name)
+    t0 = timing.now()
+    agent.takeStep(state)
+    return timing.now() - t0
 
+def _conflict(reads, writes, wave_reads, wave_writes) -> bool:
+    """Would an agent with these reads & writes conflict with a wave?"""
+    if reads is None or writes is None or wave_reads is None:
+        return True
+    return bool(writes & (wave_reads | wave_writes)) or \
+        bool(reads & wave_writes)
@@ -6,6 +6,9 @@ from enforce_typing import enforce_types
 
 from util.constants import S_PER_HOUR, S_PER_DAY, S_PER_MONTH, S_PER_YEAR
 from util.strutil import StrMixin
+from engine.LogPolicy import LogPolicy
+from web3engine import globaltokens
+from web3tools import accountpool
     
 @enforce_types
 class SimStrategyBase(StrMixin):
@@ -17,6 +20,57 @@ class SimStrategyBase(StrMixin):
         #max # time steps (ticks) to run until
         self.max_ticks = 1
 
+        #where token balances live: 'evm' or 'ledger'. None = leave the
+        # process's as is (tokenspice.ini's, unless changed). Applied by
+        # applyProcessSettings()
+        self.token_backend = None
+
+        #how often to log a row of results, and how to aggregate between
+        self.log_policy: LogPolicy = LogPolicy()
+
+        #flush logged results to disk every n rows or t seconds
+        self.log_flush_rows: int = 100
+        self.log_flush_seconds: float = 10.0
+
+        #results format: 'csv' or 'columnar'. See engine/ResultSink.py
+        self.output_format: str = 'csv'
+        self.output_compress: bool = False #columnar only
+
+        #if True, SimEngine jumps over ticks where no agent is due
+        self.fast_forward: bool = False
+
+        #step agents whose READS & WRITES don't conflict concurrently, in
+        # this many threads. 0 = one at a time. See AgentBase.READS
+        self.parallel_agents: int = 0
+
+        #if True, don't wait for each EVM tx's receipt; wait for all of a
+        # tick's receipts at the end of the tick. See web3tools/txpipeline.py
+        self.tx_pipeline: bool = False
+
+        #stop before max_ticks if any of these hold. See engine/StopCondition.py
+        self.stop_conditions: list = []
+
+        #if True, record every transfer & action to events.bin, for
+        # recomputing KPIs after the run. See engine/EventLog.py
+        self.event_log: bool = False
+
+        #if set, new agent wallets take pre-derived accounts of this seed,
+        # rather than random keys. See web3tools/accountpool.py
+        self.account_seed = None
+        self.account_filename = None
+
+        #if True, write timing.json: time per agent class, kpis, log, evm
+        self.collect_timing: bool = True
+
+        #append live metrics to metrics.jsonl every t wall-clock seconds.
+        # None = never. See engine/Telemetry.py
+        self.metrics_seconds = 10.0
+
+        #checkpoint the run every t wall-clock seconds, for resuming
+        # with 'tsp run --resume'. None = never. Opt-in: on evm, each
+        # checkpoint takes a ganache snapshot. See engine/Checkpoint.py
+        self.checkpoint_seconds = None
+
     def setTimeStep(self, time_step: int):
         """How many seconds are there in each time step (tick)?"""
         self.time_step = time_step
@@ -25,6 +79,91 @@ class SimStrategyBase(StrMixin):
         """What's the max # time steps (ticks) to run until?"""
         self.max_ticks = max_ticks
         
+    def setTokenBackend(self, backend: str):
+        """Where do token balances live? 'evm' (ganache) or 'ledger'
+        (in-memory; for netlists that don't need pools or DTs)"""
+        assert backend in ['evm', 'ledger']
+        self.token_backend = backend
+        
+    def setLogPolicy(self, log_policy: LogPolicy):
+        """E.g. LogPolicy('weekly', {'OCEAN_price': 'max'}).
+        See engine/LogPolicy.py"""
+        self.log_policy = log_policy
+
+    def setLogFlush(self, n_rows: int, n_seconds: float):
+        """Flush logged results to disk every n_rows rows or n_seconds
+        seconds, whichever comes first"""
+        assert n_rows > 0 and n_seconds >= 0.0
+        self.log_flush_rows = n_rows
+        self.log_flush_seconds = n_seconds
+        
+    def setOutputFormat(self, output_format: str, compress: bool = False):
+        """Write results as 'csv' (data.csv, datax.csv, rpdata.csv) or
+        'columnar' (data_cols/, rpdata_cols/). Compress is for columnar."""
+        if output_format not in ['csv', 'columnar']:
+            raise ValueError(output_format)
+        self.output_format = output_format
+        self.output_compress = compress
+
+    def setFastForward(self, fast_forward: bool):
+        """Jump over ticks where no agent is due (see
+        SimStateBase.fastForward). Only for netlists whose SimState and
+        KPIs do no other per-tick work, or that override fastForward()"""
+        self.fast_forward = fast_forward
+
+    def setParallelAgents(self, n_threads: int):
+        """Step agents of a tick concurrently, if their declared READS &
+        WRITES allow (see SimStateBase.takeStep). Experimental. Can pay
+        off when steps release the GIL, e.g. wait on EVM RPCs or do big
+        numpy ops. Else threads cost more than they save: e.g. on the
+        'ledger' backend, community_growth_public_funding_ps ran 2x slower
+        with 4 threads. 0 (default): step one at a time"""
+        assert n_threads >= 0
+        self.parallel_agents = n_threads
+
+    def addStopCondition(self, stop_condition):
+        """E.g. Threshold('drained', agentOCEAN('dao_treasury'), '<', 1.0).
+        See engine/StopCondition.py"""
+        self.stop_conditions.append(stop_condition)
+
+    def setEventLog(self, event_log: bool):
+        """Record every transfer & action, for 'tsp replay'"""
+        self.event_log = event_log
+
+    def setTxPipeline(self, tx_pipeline: bool):
+        """Send EVM txs without waiting for receipts; settle them at the
+        end of each tick. A failed tx then raises at the tick's end"""
+        self.tx_pipeline = tx_pipeline
+
+    def setAccountPool(self, seed: str, filename=None):
+        """Give new agent wallets reproducible, pre-derived accounts.
+        Derived accounts are saved to & loaded from filename, if given"""
+        self.account_seed = seed
+        self.account_filename = filename
+
+    def applyProcessSettings(self):
+        """Apply the settings that are process-wide rather than in this
+        object: token backend, account pool. SimStateBase calls this when
+        it's given this strategy, before agents get made"""
+        if self.token_backend is not None:
+            globaltokens.setBackend(self.token_backend)
+        if self.account_seed is not None:
+            accountpool.setPool(accountpool.AccountPool(
+                self.account_seed, self.account_filename))
+
+    def setCollectTiming(self, collect_timing: bool):
+        self.collect_timing = collect_timing
+
+    def setMetricsSeconds(self, n_seconds):
+        """Write live metrics every n_seconds of wall-clock time. None=never"""
+        assert n_seconds is None or n_seconds >= 0.0
+        self.metrics_seconds = n_seconds
+
+    def setCheckpointSeconds(self, n_seconds):
+        """Checkpoint every n_seconds of wall-clock time. None = never"""
+        assert n_seconds is None or n_seconds >= 0.0
+        self.checkpoint_seconds = n_seconds
+        
     def setMaxTime(self, val: int, unit:str):
         """Convenience function set max_ticks according to a time unit.
         Examples:
@@ -0,0 +1,162 @@
+"""Conditions to stop a run before max_ticks.
+
+Add them to a SimStrategy, e.g. to stop once the treasury is drained:
+  ss.addStopCondition(Threshold(
+      'treasury drained', agentOCEAN('dao_treasury'), '<', 10000.0,
+      n_checks=30, every_ticks=24))
+
+SimEngine.doStop() checks each condition every `every_ticks` ticks; with
+fast-forward on, the engine doesn't jump past a condition's next check. The
+first to hold stops the run; its reason goes to stop.json in the output
+dir (and to index.json, for sweeps).
+
+Value functions take the SimState and return a float. To be able to
+checkpoint, they must be picklable: a module-level function, or a
+functools.partial of one, like agentOCEAN(). Not a lambda.
+"""
+from abc import ABC, abstractmethod
+from enforce_typing import enforce_types
+import functools
+import operator
+import time
+import typing
+
+from engine.TickHistory import TickHistory
+from util.strutil import StrMixin
+
+OPS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+class StopCondition(ABC, StrMixin):
+    """Base class. Children implement reason()"""
+    def __init__(self, name: str, every_ticks: int = 1):
+        if every_ticks < 1:
+            raise ValueError(every_ticks)
+        self.name = name
+        self.every_ticks = every_ticks
+
+    def start(self, state) -> None:
+        """Called at the start of SimEngine.run()"""
+        pass
+
+    def isDue(self, tick: int) -> bool:
+        return tick % self.every_ticks == 0
+
+    def nextDueTick(self, tick: int) -> int:
+        """First tick >= tick at which it's checked. Fast-forward stops there"""
+        return -(-tick // self.every_ticks) * self.every_ticks
+
+    @abstractmethod
+    def reason(self, state) -> typing.Union[str, None]:
+        """Why to stop now, or None to keep going"""
+        pass
+
+@enforce_types
+class Threshold(StopCondition):
+    """Stop once value_func(state) <op> threshold, n_checks checks in a row"""
+    def __init__(self, name: str, value_func, op: str, threshold: float,
+                 n_checks: int = 1, every_ticks: int = 1):
+        super().__init__(name, every_ticks)
+        if op not in OPS:
+            raise ValueError(f"unknown op '{op}'")
+        if n_checks < 1:
+            raise ValueError(n_checks)
+        self.value_func = value_func
+        self.op = op
+        self.threshold = threshold
+        self.n_checks = n_checks
+        self._n_in_a_row = 0
+
+    def reason(self, state) -> typing.Union[str, None]:
+        value = self.value_func(state)
+        if not OPS[self.op](value, self.threshold):
+            self._n_in_a_row = 0
+            return None
+        self._n_in_a_row += 1
+        if self._n_in_a_row < self.n_checks:
+            return None
+        return f"{self.name}: value {value} {self.op} {self.threshold}" \
+            f" for {self.n_checks} checks"
+
+@enforce_types
+class SteadyState(StopCondition):
+    """Stop once the last n_checks values of value_func(state) are all
+    within rel_tol (relative to the largest |value|) or abs_tol of each other"""
+    def __init__(self, name: str, value_func, n_checks: int,
+                 rel_tol: float = 1e-6, abs_tol: float = 0.0,
+                 every_ticks: int = 1):
+        super().__init__(name, every_ticks)
+        if n_checks < 2:
+            raise ValueError(n_checks)
+        self.value_func = value_func
+        self.n_checks = n_checks
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self._values = TickHistory('window', n_ticks=n_checks)
+
+    def reason(self, state) -> typing.Union[str, None]:
+        self._values.append(float(self.value_func(state)))
+        if len(self._values) < self.n_checks:
+            return None
+        values = self._values.values()
+        lo, hi = min(values), max(values)
+        tol = max(self.abs_tol, self.rel_tol * max(abs(lo), abs(hi)))
+        if hi - lo > tol:
+            return None
+        return f"{self.name}: steady at {values[-1]}" \
+            f" for {self.n_checks} checks"
+
+@enforce_types
+class TickBudget(StopCondition):
+    """Stop after n_ticks ticks of this run() (e.g. since a resume)"""
+    def __init__(self, n_ticks: int, name: str = 'tick budget'):
+        super().__init__(name)
+        self.n_ticks = n_ticks
+        self._tick0 = 0
+
+    def start(self, state) -> None:
+        self._tick0 = state.tick
+
+    def nextDueTick(self, tick: int) -> int:
+        return max(tick, self._tick0 + self.n_ticks) #can't hold before
+
+    def reason(self, state) -> typing.Union[str, None]:
+        if state.tick - self._tick0 < self.n_ticks:
+            return None
+        return f"{self.name}: ran {self.n_ticks} ticks"
+
+@enforce_types
+class WallClockBudget(StopCondition):
+    """Stop after n_seconds of wall-clock time in this run()"""
+    def __init__(self, n_seconds: float, name: str = 'wall-clock budget',
+                 every_ticks: int = 1):
+        super().__init__(name, every_ticks)
+        self.n_seconds = n_seconds
+        self._t0 = time.time()
+
+    def start(self, state) -> None:
+        self._t0 = time.time()
+
+    def reason(self, state) -> typing.Union[str, None]:
+        if time.time() - self._t0 < self.n_seconds:
+            return None
+        return f"{self.name}: ran {self.n_seconds} s"
+
+@enforce_types
+def agentOCEAN(agent_name: str):
+    """Value function: OCEAN held by an agent. Picklable"""
+    return functools.partial(_agentOCEAN, agent_name)
+
+def _agentOCEAN(agent_name: str, state) -> float:
+    return state.getAgent(agent_name).OCEAN()
+
+@enforce_types
+def kpi(attr_name: str):
+    """Value function: state.kpis.<attr_name>(), or the last value if it's
+    a list or TickHistory. Picklable"""
+    return functools.partial(_kpi, attr_name)
+
+def _kpi(attr_name: str, state) -> float:
+    value = getattr(state.kpis, attr_name)
+    if callable(value):
+        return value()
+    return value[-1]
@@ -0,0 +1,191 @@
+"""Run a netlist many times: over a grid / list of SimStrategy
+parameter values, and over seeds. Runs go in parallel, one process each.
+
+Spec (a dict, e.g. from a json file):
+  {
+    "grid": {"FUNDING_BOUNDARY": [0, 10], "RATIO_FUNDS_TO_PUBLISH": [0.0, 0.1]},
+    "samples": [{"PROPOSALS_FUNDED_AT_A_TIME": 1}, {"PROPOSALS_FUNDED_AT_A_TIME": 3}],
+    "seeds": [0, 1, 2]
+  }
+All keys are optional. Configs = every grid point x every sample x every
+seed. Each param must be an existing attribute of the netlist's
+SimStrategy; it's set after SimStrategy() is constructed.
+
+Output dir:
+  index.json -- netlist, spec, and status (and stop_reason) of each run
+  run_00000/, run_00001/, .. -- one SimEngine output dir per run
+Re-running into the same dir skips runs that have already finished.
+"""
+import logging
+log = logging.getLogger('sweep')
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from enforce_typing import enforce_types
+import importlib
+import itertools
+import json
+import os
+import random
+import shutil
+import time
+import traceback
+from typing import List
+
+import numpy
+
+from engine.SimEngine import SimEngine
+
+INDEX_FILENAME = 'index.json'
+PENDING, FINISHED, FAILED = 'pending', 'finished', 'failed'
+
+@enforce_types
+class SweepRunner:
+    def __init__(self, netlist_module_str: str, output_dir: str, spec: dict):
+        """
+        :param: netlist_module_str: e.g. 'assets.netlists.wsloop.netlist'
+        :param: output_dir: where index.json and run_XXXXX/ dirs go
+        :param: spec: see module docstring
+        """
+        bad_keys = set(spec.keys()) - {'grid', 'samples', 'seeds'}
+        if bad_keys:
+            raise ValueError(f"unknown keys in sweep spec: {sorted(bad_keys)}")
+        self.netlist_module_str = netlist_module_str
+        self.output_dir = output_dir
+        self.spec = spec
+        self.runs = self._initRuns()
+
+    @staticmethod
+    def configs(spec: dict) -> List[dict]:
+        """Expand spec into list of dict with 'params' and 'seed'"""
+        grid = spec.get('grid', {})
+        names = sorted(grid.keys())
+        grid_points = [dict(zip(names, vals))
+                       for vals in itertools.product(*[grid[n] for n in names])]
+        samples = spec.get('samples', [{}])
+        seeds = spec.get('seeds', [None])
+
+        configs = []
+        for grid_point in grid_points:
+            for sample in samples:
+                params = dict(grid_point)
+                params.update(sample)
+                for seed in seeds:
+                    configs.append({'params': params, 'seed': seed})
+        return configs
+
+    def _initRuns(self) -> List[dict]:
+        """Build run list. Reuse statuses from an existing index.json"""
+        configs = self.configs(self.spec)
+        _validateParams(self.netlist_module_str, configs)
+
+        runs = []
+        for i, config in enumerate(configs):
+            runs.append({'run_id': 'run_%05d' % i,
+                         'params': config['params'], 'seed': config['seed'],
+                         'status': PENDING})
+
+        old_index = self._loadIndex()
+        if old_index is not None:
+            if old_index['netlist'] != self.netlist_module_str or \
+               old_index['spec'] != self.spec:
+                raise ValueError(f"'{self.output_dir}' holds a different sweep")
+            for i, old_run in enumerate(old_index['runs']):
+                if old_run['status'] == FINISHED:
+                    runs[i] = old_run
+        return runs
+
+    def run(self, nprocs: int = 1) -> dict:
+        """Run all unfinished runs, nprocs at a time. Returns the index."""
+        if not os.path.exists(self.output_dir):
+            os.mkdir(self.output_dir)
+        todo = [run for run in self.runs if run['status'] != FINISHED]
+        log.info(f"Sweep: {len(self.runs)} runs, {len(todo)} to do, "
+                 f"{nprocs} processes")
+        for run in todo:
+            run['status'] = PENDING
+            run.pop('error', None)
+        self._saveIndex()
+
+        with ProcessPoolExecutor(max_workers=nprocs) as executor:
+            futures = {}
+            for run in todo:
+                run_dir = os.path.join(self.output_dir, run['run_id'])
+                future = executor.submit(
+                    _runOne, self.netlist_module_str, run_dir,
+                    run['params'], run['seed'])
+                futures[future] = run
+
+            for future in as_completed(futures):
+                run = futures[future]
+                result = future.result()
+                run.update(result)
+                log.info(f"Sweep: {run['run_id']} {run['status']}")
+                self._saveIndex()
+
+        return self.index()
+
+    def index(self) -> dict:
+        counts = {status: len([run for run in self.runs
+                               if run['status'] == status])
+                  for status in [PENDING, FINISHED, FAILED]}
+        return {'netlist': self.netlist_module_str, 'spec': self.spec,
+                'counts': counts, 'runs': self.runs}
+
+    def _indexFilename(self) -> str:
+        return os.path.join(self.output_dir, INDEX_FILENAME)
+
+    def _loadIndex(self):
+        if not os.path.exists(self._indexFilename()):
+            return None
+        with open(self._indexFilename(), 'r') as f:
+            return json.load(f)
+
+    def _saveIndex(self) -> None:
+        filename = self._indexFilename()
+        with open(filename + '.tmp', 'w') as f:
+            json.dump(self.index(), f, indent=1)
+        os.replace(filename + '.tmp', filename) #atomic
+
+@enforce_types
+def _validateParams(netlist_module_str: str, configs: list) -> None:
+    """Raise ValueError if any param isn't an attribute of SimStrategy"""
+    netlist_module = importlib.import_module(netlist_module_str)
+    ss = netlist_module.SimStrategy()
+    names = set()
+    for config in configs:
+        names |= set(config['params'].keys())
+    bad_names = sorted(name for name in names if not hasattr(ss, name))
+    if bad_names:
+        raise ValueError(f"SimStrategy has no attribute(s) {bad_names}")
+
+def _runOne(netlist_module_str: str, run_dir: str, params: dict, seed) -> dict:
+    """Do one run, in its own process. Never raises: returns status."""
+    t0 = time.time()
+    try:
+        if os.path.exists(run_dir): #leftover from a failed / killed run
+            shutil.rmtree(run_dir)
+        os.mkdir(run_dir)
+        with open(os.path.join(run_dir, 'params.json'), 'w') as f:
+            json.dump({'params': params, 'seed': seed}, f, indent=1)
+
+        if seed is not None:
+            random.seed(seed)
+            numpy.random.seed(seed)
+
+        netlist_module = importlib.import_module(netlist_module_str)
+        ss = netlist_module.SimStrategy()
+        for name, val in params.items():
+            setattr(ss, name, val)
+        state = netlist_module.SimState(ss)
+
+        engine = SimEngine(
+            state, run_dir,
+            getattr(netlist_module, 'netlist_createLogData', None),
+            getattr(netlist_module, 'netlist_rp_createLogData', None))
+        engine.run()
+    except Exception:
+        return {'status': FAILED, 'error': traceback.format_exc(),
+                'wall_time_s': time.time() - t0}
+
+    return {'status': FINISHED, 'stop_reason': engine.stop_reason,
+            'wall_time_s': time.time() - t0}
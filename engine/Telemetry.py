@@ -0,0 +1,94 @@
+"""Live run telemetry. While SimEngine runs, it appends a json line to
+OUTPUT_DIR/metrics.jsonl every ss.metrics_seconds of wall-clock time, and
+once more at the end. Each line has:
+  time -- unix time
+  status -- 'running', 'done', or 'failed'
+  tick, max_ticks, sim_days -- progress in simulated time
+  ticks_per_s -- since the previous line. avg_ticks_per_s -- over the run
+  eta_s -- estimated wall-clock seconds to finish, at avg_ticks_per_s
+  rss_bytes -- process resident memory
+  rows_buffered -- result rows held in memory, not yet on disk
+  rpc_per_s, tx_per_s -- EVM JSON-RPC requests & txs / s, since the
+    previous line. From util/timing.py, so None if timing is off
+
+Watch with e.g. 'tail -f OUTPUT_DIR/metrics.jsonl'.
+"""
+from enforce_typing import enforce_types
+import json
+import os
+import resource
+import time
+
+from util import timing
+from util.constants import S_PER_DAY
+
+@enforce_types
+class Telemetry:
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.start(0)
+
+    def start(self, tick: int) -> None:
+        """Start timing, from tick. SimEngine calls this at the start of
+        run() (so, for a resumed run, at the resumed tick)"""
+        self._t_start = self._t_prev = time.time()
+        self._tick_start = self._tick_prev = tick
+        self._rpc_prev, self._tx_prev = _rpcCount(), _txCount()
+
+    def secondsSinceEmit(self) -> float:
+        return time.time() - self._t_prev
+
+    def emit(self, engine, status: str = 'running') -> dict:
+        """Append one line of metrics. Returns it, as a dict"""
+        state = engine.state
+        now, tick = time.time(), state.tick
+        dt, dt_run = now - self._t_prev, now - self._t_start
+
+        ticks_per_s = (tick - self._tick_prev) / dt if dt > 0 else 0.0
+        avg_ticks_per_s = (tick - self._tick_start) / dt_run \
+            if dt_run > 0 else 0.0
+        ticks_left = max(state.ss.max_ticks - tick, 0)
+        eta_s = ticks_left / avg_ticks_per_s if avg_ticks_per_s > 0 else None
+
+        rpc, tx = _rpcCount(), _txCount()
+        rpc_per_s = tx_per_s = None
+        if timing.ENABLED and dt > 0:
+            rpc_per_s = (rpc - self._rpc_prev) / dt
+            tx_per_s = (tx - self._tx_prev) / dt
+
+        metrics = {
+            'time': now,
+            'status': status,
+            'tick': tick,
+            'max_ticks': state.ss.max_ticks,
+            'sim_days': tick * state.ss.time_step / S_PER_DAY,
+            'ticks_per_s': ticks_per_s,
+            'avg_ticks_per_s': avg_ticks_per_s,
+            'eta_s': eta_s,
+            'rss_bytes': rssBytes(),
+            'rows_buffered': engine.numBufferedRows(),
+            'rpc_per_s': rpc_per_s,
+            'tx_per_s': tx_per_s,
+        }
+        with open(self.filename, 'a') as f:
+            f.write(json.dumps(metrics) + "\n")
+
+        self._t_prev, self._tick_prev = now, tick
+        self._rpc_prev, self._tx_prev = rpc, tx
+        return metrics
+
+@enforce_types
+def rssBytes() -> int:
+    """Current resident memory of this process. Falls back to peak"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            n_pages = int(f.read().split()[1])
+        return n_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _rpcCount() -> int:
+    return timing.count('rpc')
+
+def _txCount() -> int:
+    return timing.count('evm', 'buildAndSendTx')
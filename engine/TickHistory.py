@@ -0,0 +1,145 @@
+"""Per-tick history of a value, with bounded memory.
+
+Agents and KPIs append a value every tick, e.g. USD received. Most only
+ever read a recent window, e.g. the last month. So a TickHistory declares
+what it keeps (its retention):
+  'full' -- every value
+  'window' -- the values of the last n_ticks ticks (a ring buffer)
+  'downsample' -- the value at every n_ticks'th tick
+
+Index i is the i'th value appended, like a list. For 'full' and 'window',
+it also keeps running totals, so sum() over any retained range is O(1).
+
+n_ticks may be given as n_seconds instead. Then give the time step, to
+the constructor or, if it's not known yet (e.g. an agent's, before its
+first step), once to setTimeStep(). Until then, it keeps every value,
+like 'full'.
+"""
+from enforce_typing import enforce_types
+import math
+import typing
+
+RETENTIONS = ['full', 'window', 'downsample']
+
+@enforce_types
+class TickHistory:
+    def __init__(self, retention: str = 'full',
+                 n_ticks: typing.Union[int, None] = None,
+                 n_seconds: typing.Union[int, None] = None,
+                 time_step: typing.Union[int, None] = None):
+        """
+        :param: retention: one of RETENTIONS
+        :param: n_ticks: ticks of window, or between samples if downsample
+        :param: n_seconds: alternative to n_ticks. For 'window', it keeps
+          values within n_seconds of the latest value, plus one more
+        :param: time_step: seconds per tick, to convert n_seconds
+        """
+        if retention not in RETENTIONS:
+            raise ValueError(f"unknown retention '{retention}'")
+        if retention != 'full' and (n_ticks is None) == (n_seconds is None):
+            raise ValueError("need exactly one of n_ticks, n_seconds")
+        if n_ticks is not None and n_ticks < 1:
+            raise ValueError(n_ticks)
+        self._retention = retention
+        self._n_ticks = n_ticks
+        self._n_seconds = n_seconds
+
+        self._n = 0 #num values appended
+        self._values: list = [] #ring if 'window'
+        self._totals: list = [0.0] #_totals[k] = sum of values 0..k-1. Ring
+        self._total = 0.0 #sum of all values
+        if time_step is not None:
+            self.setTimeStep(time_step)
+
+    def needsTimeStep(self) -> bool:
+        return self._n_ticks is None and self._n_seconds is not None
+
+    def setTimeStep(self, time_step: int) -> None:
+        """Convert n_seconds to n_ticks, then re-append what's kept so far.
+        No-op if n_ticks is already known"""
+        if not self.needsTimeStep():
+            return
+        n_ticks = math.ceil(self._n_seconds / time_step)
+        if self._retention == 'window':
+            n_ticks += 1
+        values = self._values
+        self._n_ticks = n_ticks
+        self._n, self._values, self._totals, self._total = 0, [], [0.0], 0.0
+        for value in values:
+            self.append(value)
+
+    def append(self, value: float):
+        if self._isFull():
+            self._values.append(value)
+            self._total += value
+            self._totals.append(self._total)
+            self._n += 1
+            return
+
+        if self._retention == 'downsample':
+            if self._n % self._n_ticks == 0:
+                self._values.append(value)
+            self._n += 1
+            return
+
+        self._total += value
+        if len(self._values) < self._n_ticks:
+            self._values.append(value)
+            self._totals.append(self._total)
+        else:
+            self._values[self._n % self._n_ticks] = value
+            self._totals[(self._n + 1) % (self._n_ticks + 1)] = self._total
+        self._n += 1
+
+    def _isFull(self) -> bool:
+        """Keeping every value? Also while n_seconds awaits a time_step"""
+        return self._retention == 'full' or self._n_ticks is None
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> float:
+        if i < 0:
+            i += self._n
+        if not (0 <= i < self._n):
+            raise IndexError(i)
+        if self._isFull():
+            return self._values[i]
+        if self._retention == 'window':
+            if i < self._n - self._n_ticks:
+                raise IndexError(f"value {i} is older than the window")
+            return self._values[i % self._n_ticks]
+        if i % self._n_ticks != 0:
+            raise IndexError(f"value {i} was not sampled")
+        return self._values[i // self._n_ticks]
+
+    def sum(self, i1: int, i2: int) -> float:
+        """Sum of values i1 .. i2-1, clamped like a list slice [i1:i2]
+        with non-negative i1, i2. O(1)."""
+        if self._retention == 'downsample':
+            raise ValueError("can't sum a downsampled history")
+        i1, i2 = max(i1, 0), min(i2, self._n)
+        if i1 >= i2:
+            return 0.0
+        return self._totalUpTo(i2) - self._totalUpTo(i1)
+
+    def _totalUpTo(self, k: int) -> float:
+        if self._isFull():
+            return self._totals[k]
+        if k < self._n - self._n_ticks:
+            raise IndexError(f"value {k} is older than the window")
+        return self._totals[k % (self._n_ticks + 1)]
+
+    def values(self) -> list:
+        """Retained values, oldest first"""
+        if self._isFull() or self._retention != 'window' or \
+           self._n <= self._n_ticks:
+            return list(self._values)
+        start = self._n % self._n_ticks
+        return self._values[start:] + self._values[:start]
+
+    def __eq__(self, other) -> bool:
+        """Compare retained values to a list, or to another history"""
+        if isinstance(other, TickHistory):
+            other = other.values()
+        return self.values() == list(other)
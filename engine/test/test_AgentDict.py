@@ -64,3 +64,22 @@ def test_agentByAddress():
     assert d.agentByAddress('address 222').address == 'address 222'
     assert d.agentByAddress('address foo') is None
     
+
+@enforce_types
+def test_balancesOf():
+    from engine import AgentBase
+    from web3engine import globaltokens
+    globaltokens.setBackend('ledger')
+    class FooAgent(AgentBase.AgentBase):
+        def takeStep(self, state):
+            pass
+    d = AgentDict({'foo1': FooAgent('foo1', USD=0.0, OCEAN=1.0),
+                   'foo2': FooAgent('foo2', USD=0.0, OCEAN=2.0)})
+    for agent in d.values():
+        agent._wallet.resetCachedInfo()
+    assert d.balancesOf() == {'foo1': 1.0, 'foo2': 2.0}
+    assert all(agent._wallet._OCEANisCached() for agent in d.values())
+    assert d.balancesOf(names=['foo2']) == {'foo2': 2.0}
+
+    token = globaltokens.OCEANtoken()
+    assert d.balancesOf(token) == {'foo1': 1.0, 'foo2': 2.0}
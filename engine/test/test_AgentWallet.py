@@ -245,7 +245,108 @@ def testBurnWallet():
     w = BurnWallet()
     assert w._address == constants.BURN_ADDRESS
 
+@enforce_types
+def testLedgerBackend():
+    globaltokens.setBackend('ledger')
+    w1 = AgentWallet(OCEAN=10.0)
+    w2 = AgentWallet()
+    assert w1.OCEAN() == 10.0
+    
+    w1.transferOCEAN(w2, 3.0)
+    assert w1.OCEAN() == 7.0
+    assert w2.OCEAN() == 3.0
+    assert w2.totalOCEANin() == 3.0
 
+    w2.withdrawOCEAN(3.0)
+    assert w2.OCEAN() == 0.0
+    with pytest.raises(ValueError):
+        w2.transferOCEAN(w1, 1.0)
+
+@enforce_types
+def testLazyMaterialize():
+    globaltokens.setBackend('ledger')
+    OCEAN = globaltokens.OCEANtoken()
+    w1, w2, w3 = AgentWallet(OCEAN=10.0), AgentWallet(), AgentWallet()
+    assert w1._keys_wallet is None #no key yet
+    assert w1.OCEAN() == 10.0
+
+    w1.transferOCEAN(w2, 3.0) #both virtual: off-chain
+    assert not w1._isMaterialized() and not w2._isMaterialized()
+    assert OCEAN.balanceOf_base(w1._address) == 0
+    assert w1.OCEAN() == 7.0 and w2.OCEAN() == 3.0
+
+    w1._web3wallet #e.g. to sign a tx
+    assert w1._isMaterialized()
+    assert OCEAN.balanceOf_base(w1._address) == toBase18(7.0)
+
+    w2.transferOCEAN(w1, 1.0) #virtual to on-chain: mints to w1
+    w1.transferOCEAN(w3, 2.0) #on-chain to virtual: w3 goes on-chain
+    assert w3._isMaterialized()
+    assert [w.OCEAN() for w in [w1, w2, w3]] == [6.0, 2.0, 2.0]
+    assert OCEAN.balanceOf_base(w3._address) == toBase18(2.0)
+
+    w2.withdrawOCEAN(2.0) #burn from virtual
+    assert w2.OCEAN() == 0.0
+
+@enforce_types
+def testNoKeysWithoutEventLog():
+    #USD & virtual OCEAN moves don't need an address, unless logged
+    globaltokens.setBackend('ledger')
+    assert not EventLog.isActive()
+    w1, w2 = AgentWallet(USD=10.0, OCEAN=10.0), AgentWallet()
+    w1.depositUSD(1.0)
+    w1.transferUSD(w2, 3.0)
+    w2.withdrawUSD(1.0)
+    w1.depositOCEAN(1.0)
+    w1.transferOCEAN(w2, 3.0)
+    w2.withdrawOCEAN(1.0)
+    assert w1._keys_wallet is None and w2._keys_wallet is None
+    assert (w1.USD(), w2.USD()) == (8.0, 2.0)
+    assert (w1.OCEAN(), w2.OCEAN()) == (8.0, 2.0)
+
+@enforce_types
+def testTokenCache():
+    from web3engine.ledgertoken import LedgerToken
+    globaltokens.setBackend('ledger')
+    DT = LedgerToken('DT1') #stands in for a datatoken
+    w1, w2 = AgentWallet(), AgentWallet()
+    DT.mint(w1._address, toBase18(5.0))
+    assert w1.DT(DT) == 5.0 and w2.DT(DT) == 0.0 #now cached
+
+    w1.transferDT(w2, DT, 2.0) #written through, both sides
+    assert w1._cached_tokens_base[DT.address] == toBase18(3.0)
+    assert w2._cached_tokens_base[DT.address] == toBase18(2.0)
+    assert w1.DT(DT) == 3.0 and w2.DT(DT) == 2.0
+
+    DT.mint(w1._address, toBase18(1.0)) #not through the wallet
+    assert w1.DT(DT) == 3.0
+    w1.resetCachedTokens()
+    assert w1.DT(DT) == 4.0
+
+
+@enforce_types
+def testEnsureAllowance():
+    globaltokens.setBackend('ledger')
+    class Token:
+        address = '0xT'
+        def __init__(self):
+            self.approvals = []
+        def approve(self, spender_address, amt_base, from_wallet):
+            self.approvals.append((spender_address, amt_base))
+    token = Token()
+    w = AgentWallet()
+    w.ensureAllowance(token, '0xPool', 1.0)
+    w.ensureAllowance(token, '0xPool', 2.0) #no new approve
+    assert token.approvals == [('0xPool', constants.HUGEINT)]
+    assert w._allowances_base[(token.address, '0xPool')] == \
+        constants.HUGEINT - toBase18(3.0)
+
+    w.ensureAllowance(token, '0xPool2', 1.0) #another spender
+    assert len(token.approvals) == 2
+
+    w._allowances_base[(token.address, '0xPool')] = toBase18(0.5)
+    w.ensureAllowance(token, '0xPool', 1.0) #too little left
+    assert len(token.approvals) == 3
     
 #===================================================================
 #helps testing
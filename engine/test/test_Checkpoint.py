@@ -0,0 +1,128 @@
+from enforce_typing import enforce_types
+import os
+import random
+
+import pytest
+
+from engine import AgentBase, Checkpoint, KPIsBase, SimStateBase, \
+    SimStrategyBase
+from engine.SimEngine import SimEngine
+from util.constants import S_PER_DAY
+from web3engine import globaltokens
+
+CRASH_AT_TICK = None #set by tests
+
+# ==================================================================
+# testing stubs. Module-level, so that they pickle
+class SimStrategy(SimStrategyBase.SimStrategyBase):
+    def __init__(self):
+        super().__init__()
+        self.setTimeStep(S_PER_DAY)
+        self.setMaxTicks(8)
+        self.setCheckpointSeconds(0.0) #every tick
+
+class RandomSpender(AgentBase.AgentBase):
+    def takeStep(self, state):
+        if state.tick == CRASH_AT_TICK:
+            raise KeyboardInterrupt("preempted")
+        receiver = state.getAgent("receiver")
+        self._transferOCEAN(receiver, random.random() * 0.1)
+
+class Receiver(AgentBase.AgentBase):
+    def takeStep(self, state):
+        pass
+
+class SimState(SimStateBase.SimStateBase):
+    def __init__(self):
+        super().__init__()
+        self.ss = SimStrategy()
+        self.kpis = KPIsBase.KPIsBase(self.ss.time_step)
+        self.addAgent(RandomSpender("spender", 0.0, 10.0))
+        self.addAgent(Receiver("receiver", 0.0, 0.0))
+
+def netlist_createLogData(state):
+    OCEAN = state.getAgent("receiver").OCEAN()
+    return [], ["receiver_OCEAN", "n"], [OCEAN, float(state.tick % 3)]
+
+def netlist_rp_createLogData(state):
+    return ["x"] * (1 + state.tick // 3), [float(state.tick)] * (1 + state.tick // 3)
+
+# ==================================================================
+# actual tests
+def _run(output_dir, crash_at_tick=None):
+    global CRASH_AT_TICK
+    CRASH_AT_TICK = crash_at_tick
+    random.seed(3)
+    engine = SimEngine(SimState(), output_dir, netlist_createLogData,
+                       netlist_rp_createLogData)
+    engine.run()
+
+def _readResults(output_dir):
+    results = {}
+    for filename in ['data.csv', 'datax.csv', 'rpdata.csv']:
+        with open(os.path.join(output_dir, filename), 'r') as f:
+            results[filename] = f.read()
+    return results
+
+@enforce_types
+def test_resume(tmp_path):
+    globaltokens.setBackend('ledger') #no need for EVM here
+    dir1 = os.path.join(str(tmp_path), 'full')
+    dir2 = os.path.join(str(tmp_path), 'resumed')
+
+    _run(dir1)
+    assert not Checkpoint.hasCheckpoint(dir1) #removed when done
+
+    with pytest.raises(KeyboardInterrupt):
+        _run(dir2, crash_at_tick=5)
+    assert Checkpoint.hasCheckpoint(dir2)
+    with open(os.path.join(dir2, 'datax.csv'), 'r') as f:
+        assert len(f.read().splitlines()) == 1 + 6 #header, ticks 0..5
+    assert os.path.exists(os.path.join(dir2, 'rpdata.csv'))
+
+    #mess up RNG & tokens, like a fresh process would
+    global CRASH_AT_TICK
+    CRASH_AT_TICK = None
+    random.seed(99)
+    globaltokens.setBackend('evm')
+
+    engine = Checkpoint.loadCheckpoint(dir2)
+    assert engine.state.tick == 5
+    assert globaltokens.backend() == 'ledger'
+    engine.run()
+
+    assert not Checkpoint.hasCheckpoint(dir2)
+    assert _readResults(dir1) == _readResults(dir2)
+
+@enforce_types
+def test_noCheckpoint(tmp_path):
+    assert SimStrategyBase.SimStrategyBase().checkpoint_seconds is None #opt-in
+
+    globaltokens.setBackend('ledger')
+    output_dir = str(tmp_path)
+    state = SimState()
+    state.ss.setCheckpointSeconds(None)
+    engine = SimEngine(state, output_dir)
+    engine.maybeCheckpoint()
+    assert not Checkpoint.hasCheckpoint(output_dir)
+
+@enforce_types
+def test_snapshotReuse(monkeypatch):
+    #ganache can't drop snapshots, so don't take one if the chain is idle
+    calls = []
+    chain = {'block': '0x1', 'n_snapshots': 0}
+    def evmRequest(method, params):
+        calls.append(method)
+        if method == 'eth_blockNumber':
+            return chain['block']
+        chain['n_snapshots'] += 1
+        return hex(chain['n_snapshots'])
+    monkeypatch.setattr(Checkpoint, '_evmRequest', evmRequest)
+
+    assert Checkpoint._snapshot('dir') == '0x1'
+    assert Checkpoint._snapshot('dir') == '0x1' #no block since: reuse
+    chain['block'] = '0x2'
+    assert Checkpoint._snapshot('dir') == '0x2'
+    assert calls.count('evm_snapshot') == 2
+    Checkpoint.removeCheckpoint('dir')
+    assert 'dir' not in Checkpoint._SNAPSHOTS
@@ -0,0 +1,101 @@
+from enforce_typing import enforce_types
+import os
+import pickle
+import pytest
+
+from engine import AgentBase, EventLog, SimEngine, SimStateBase, SimStrategyBase
+from util.constants import BURN_ADDRESS
+from web3engine import globaltokens
+
+@enforce_types
+def test_writeAndRead(tmp_path):
+    filename = os.path.join(str(tmp_path), 'events.bin')
+    event_log = EventLog.EventLog(filename)
+    event_log.action('alice', 'addAgent', {'address': '0xA'})
+    event_log.tick(0)
+    event_log.transfer('OCEAN', EventLog.MINT, '0xA', 10.0)
+    event_log.transfer('OCEAN', '0xA', '0xB', 3.0)
+    event_log.tick(1)
+    event_log.transfer('USD', '0xA', BURN_ADDRESS, 1.0)
+    event_log.action('alice', 'vote', {'for': 'bob'})
+    event_log.close()
+
+    assert list(EventLog.readEvents(filename)) == [
+        ('action', 'alice', 'addAgent', {'address': '0xA'}),
+        ('tick', 0),
+        ('transfer', 'OCEAN', EventLog.MINT, '0xA', 10.0),
+        ('transfer', 'OCEAN', '0xA', '0xB', 3.0),
+        ('tick', 1),
+        ('transfer', 'USD', '0xA', BURN_ADDRESS, 1.0),
+        ('action', 'alice', 'vote', {'for': 'bob'})]
+
+    kpis = {'alice_OCEAN': lambda l: l.balance('alice'),
+            'b_OCEAN': lambda l: l.balance('0xB'),
+            'burned_USD': lambda l: l.balance(EventLog.BURN, 'USD'),
+            'n_votes': lambda l: float(len(l.actions))}
+    header, rows = EventLog.replay(filename, kpis)
+    assert header == ['Tick', 'alice_OCEAN', 'b_OCEAN', 'burned_USD', 'n_votes']
+    assert rows == [[0, 7.0, 3.0, 0.0, 0.0], [1, 7.0, 3.0, 1.0, 1.0]]
+
+@enforce_types
+def test_checkpoint(tmp_path):
+    filename = os.path.join(str(tmp_path), 'events.bin')
+    event_log = EventLog.EventLog(filename)
+    event_log.tick(0)
+    saved = pickle.dumps(event_log)
+    event_log.transfer('OCEAN', '0xA', '0xB', 3.0) #after "checkpoint"
+    event_log.flush()
+
+    event_log = pickle.loads(saved) #drops the transfer
+    event_log.tick(1)
+    event_log.close()
+    assert list(EventLog.readEvents(filename)) == [('tick', 0), ('tick', 1)]
+
+#==================================================================
+class SimpleAgent(AgentBase.AgentBase):
+    def takeStep(self, state):
+        if self.name == 'a' and state.tick == 1: #an agent made mid-run
+            state.addAgent(SimpleAgent('late', USD=0.0, OCEAN=5.0))
+        if self.name == 'a':
+            self._transferOCEAN(state.getAgent('b'), 1.0)
+            self._transferUSD(None, 2.0)
+            self._logAction('paid', {'to': 'b'})
+
+class SimState(SimStateBase.SimStateBase):
+    def __init__(self):
+        super().__init__()
+        self.ss = SimStrategyBase.SimStrategyBase()
+        self.ss.setMaxTicks(4)
+        self.ss.setEventLog(True)
+        self.addAgent(SimpleAgent('a', USD=10.0, OCEAN=10.0))
+        self.addAgent(SimpleAgent('b', USD=0.0, OCEAN=1.0))
+
+        class SimpleKPIs:
+            def takeStep(self, state):
+                pass
+        self.kpis = SimpleKPIs()
+
+@enforce_types
+def test_engine(tmp_path):
+    globaltokens.setBackend('ledger')
+    state = SimState()
+    output_dir = str(tmp_path)
+    SimEngine.SimEngine(state, output_dir).run()
+    assert not EventLog.isActive()
+
+    kpis = {'a_OCEAN': lambda l: l.balance('a'),
+            'b_OCEAN': lambda l: l.balance('b'),
+            'a_USD': lambda l: l.balance('a', 'USD'),
+            'b_OCEAN_in': lambda l: l.totalIn('b'),
+            'late_OCEAN': lambda l: l.balance('late'),
+            'n_unnamed': lambda l: float(len(
+                [name for name in l.names() if name.startswith('0x')]))}
+    header, rows = EventLog.replay(
+        os.path.join(output_dir, 'events.bin'), kpis, every_ticks=2)
+    assert [row[0] for row in rows] == [0, 2, 4]
+    assert rows[-1][1:] == [5.0, 6.0, 0.0, 6.0, 5.0, 0.0]
+    assert rows[-1][1] == state.getAgent('a').OCEAN()
+    assert rows[-1][2] == state.getAgent('b').OCEAN()
+    assert rows[-1][3] == state.getAgent('a').USD()
+    assert rows[-1][5] == state.getAgent('late').OCEAN()
+    assert rows[-1][6] == 0.0 #nothing left under a raw address
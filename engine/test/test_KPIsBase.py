@@ -18,3 +18,26 @@ def test1():
     assert kpis._tick == 2
     assert kpis.tick() == 2
     assert kpis.elapsedTime() == 2 * 12
+
+def test_takeSteps():
+    class State:
+        tick = 7
+
+    kpis = MyKPIs(time_step=12)
+    kpis.takeSteps(State(), 5)
+    assert kpis.tick() == 5
+
+    class SeriesKPIs(KPIsBase):
+        def __init__(self, time_step):
+            super().__init__(time_step)
+            self.ticks = []
+        def takeStep(self, state):
+            super().takeStep(state)
+            self.ticks.append(state.tick)
+
+    state = State()
+    kpis = SeriesKPIs(time_step=12)
+    kpis.takeSteps(state, 3)
+    assert kpis.ticks == [7, 8, 9]
+    assert kpis.tick() == 3
+    assert state.tick == 7
@@ -0,0 +1,40 @@
+from enforce_typing import enforce_types
+import pytest
+
+from engine.LogPolicy import LogPolicy, WindowAggregator
+from util.constants import S_PER_DAY, S_PER_WEEK
+
+@enforce_types
+def test_LogPolicy():
+    policy = LogPolicy()
+    assert policy.period == S_PER_DAY
+    assert not policy.isAggregating()
+    assert policy.isLogTick(S_PER_DAY * 3)
+    assert not policy.isLogTick(S_PER_DAY + 1)
+
+    policy = LogPolicy('weekly', {'price': 'max'}, default_aggregation='mean')
+    assert policy.period == S_PER_WEEK
+    assert policy.isAggregating()
+    assert policy.aggregation('price') == 'max'
+    assert policy.aggregation('foo') == 'mean'
+    assert policy.aggregation('Tick') == 'last'
+
+    with pytest.raises(ValueError):
+        LogPolicy('fortnightly')
+    with pytest.raises(ValueError):
+        LogPolicy(aggregations={'price': 'median'})
+
+@enforce_types
+def test_WindowAggregator():
+    policy = LogPolicy(aggregations={'a': 'mean', 'b': 'min', 'c': 'max',
+                                     'd': 'sum', 'e': 'last'})
+    agg = WindowAggregator(policy)
+    header = ['a', 'b', 'c', 'd', 'e']
+    agg.addRow(header, [1.0, 1.0, 1.0, 1.0, 1.0])
+    agg.addRow(header, [4.0, 4.0, 4.0, 4.0, 4.0], n_ticks=2)
+    assert agg.popRow() == (header, [3.0, 1.0, 4.0, 9.0, 4.0])
+
+    #new window. And rows can get wider
+    agg.addRow(header, [2.0, 2.0, 2.0, 2.0, 2.0])
+    agg.addRow(header + ['f'], [0.0, 0.0, 0.0, 0.0, 0.0, 7.0])
+    assert agg.popRow() == (header + ['f'], [1.0, 0.0, 2.0, 2.0, 0.0, 7.0])
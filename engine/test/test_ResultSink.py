@@ -0,0 +1,96 @@
+from enforce_typing import enforce_types
+import numpy
+import os
+
+from engine.ResultSink import CsvSink, PaddedCsvSink, ColumnarSink, \
+    isColumnar, loadColumnar
+
+@enforce_types
+def test_CsvSink(tmp_path):
+    filename = os.path.join(str(tmp_path), 'data.csv')
+    sink = CsvSink(filename, flush_rows=2, flush_seconds=1000.0)
+    sink.write(['a', 'b'], [1, 2.5])
+    assert open(filename).read() == "" #still in buffer
+    
+    sink.write(['a', 'b', 'c'], [3, 4, 5])
+    assert open(filename).read() == "a, b\n1, 2.5\n3, 4, 5\n"
+
+    sink.write(['a', 'b'], [6, 7])
+    sink.close()
+    assert open(filename).read() == "a, b\n1, 2.5\n3, 4, 5\n6, 7\n"
+    sink.close() #closing twice is ok
+
+@enforce_types
+def test_PaddedCsvSink(tmp_path):
+    filename = os.path.join(str(tmp_path), 'datax.csv')
+    sink = PaddedCsvSink(filename, flush_rows=1, flush_seconds=1000.0)
+    sink.write(['a'], [1])
+    sink.write(['a', 'b'], [2, 3])
+    sink.write(['a', 'b', 'c'], [4, 5, 6])
+    assert not os.path.exists(filename)
+    
+    sink.close()
+    assert open(filename).read() == "a, b, c\n1, 0, 0\n2, 3, 0\n4, 5, 6\n"
+    assert os.listdir(str(tmp_path)) == ['datax.csv'] #no leftover body
+
+@enforce_types
+def test_PaddedCsvSink_writeSoFar(tmp_path):
+    filename = os.path.join(str(tmp_path), 'datax.csv')
+    sink = PaddedCsvSink(filename, flush_rows=10, flush_seconds=1000.0)
+    sink.write(['a'], [1])
+    sink.write(['a', 'b'], [2, 3])
+    sink.writeSoFar() #e.g. the run failed
+    assert open(filename).read() == "a, b\n1, 0\n2, 3\n"
+
+    sink.write(['a'], [4])
+    sink.close()
+    assert open(filename).read() == "a\n1\n2, 3\n4\n"
+
+@enforce_types
+def test_PaddedCsvSink_headerOnly(tmp_path):
+    filename = os.path.join(str(tmp_path), 'rpdata.csv')
+    sink = PaddedCsvSink(filename, flush_rows=10, flush_seconds=1000.0)
+    sink.setHeader(['a', 'b'])
+    sink.close()
+    assert open(filename).read() == "a, b\n"
+
+@enforce_types
+def test_ColumnarSink(tmp_path):
+    dirname = os.path.join(str(tmp_path), 'data_cols')
+    sink = ColumnarSink(dirname, flush_rows=2, flush_seconds=1000.0)
+    sink.write(['a'], [1])
+    sink.write(['a', 'b'], [2, 3.25])
+    sink.write(['a', 'b', 'c'], [4, 5, 6])
+    
+    #partial results are loadable, before close
+    header, values, start_rows = loadColumnar(dirname)
+    assert header == ['a', 'b']
+    assert values.shape == (2, 2)
+    
+    sink.close()
+    assert sorted(os.listdir(dirname)) == ['manifest.json', 'values.npy']
+    header, values, start_rows = loadColumnar(dirname)
+    assert isinstance(values, numpy.memmap) #zero-copy
+    assert header == ['a', 'b', 'c']
+    assert start_rows == [0, 1, 2]
+    assert values.shape == (3, 3)
+    assert values[1, 1] == 3.25 #full precision, unlike '%g'
+    assert numpy.isnan(values[0, 1]) and numpy.isnan(values[1, 2])
+    assert list(values[2, :]) == [4, 5, 6]
+
+@enforce_types
+def test_ColumnarSink_compressed(tmp_path):
+    dirname = os.path.join(str(tmp_path), 'data_cols')
+    sink = ColumnarSink(dirname, flush_rows=1, flush_seconds=1000.0,
+                        compress=True)
+    sink.write(['a'], [1])
+    sink.write(['a', 'b'], [2, 3])
+    sink.close()
+    assert isColumnar(dirname)
+    assert 'chunk_00001.npz' in os.listdir(dirname)
+    
+    header, values, start_rows = loadColumnar(dirname)
+    assert header == ['a', 'b']
+    assert start_rows == [0, 1]
+    assert numpy.isnan(values[0, 1])
+    assert list(values[1, :]) == [2, 3]
@@ -1,9 +1,15 @@
 from enforce_typing import enforce_types
+import json
 import os
 import shutil
 
 from engine import AgentBase
 from engine import SimEngine, SimStateBase, SimStrategyBase, KPIsBase
+from engine import StopCondition
+from engine.LogPolicy import LogPolicy
+from engine.ResultSink import loadColumnar
+from util.constants import S_PER_DAY
+from web3engine import globaltokens
 
 PATH1 = '/tmp/test_outpath1'
 
@@ -78,6 +84,163 @@ def testRunEngine():
     n_agents = engine.state.numAgents()
 
 
+@enforce_types
+def testColumnarOutput(tmp_path):
+    output_dir = os.path.join(str(tmp_path), 'outdir')
+    state = SimState()
+    state.ss.setTimeStep(S_PER_DAY)
+    state.ss.setMaxTicks(3)
+    state.ss.setOutputFormat('columnar')
+    engine = SimEngine.SimEngine(state, output_dir)
+    engine.run()
+    assert not os.path.exists(os.path.join(output_dir, 'data.csv'))
+
+    header, values, _ = loadColumnar(os.path.join(output_dir, 'data_cols'))
+    assert header[:2] == ['Tick', 'Second']
+    assert list(values[:, 0]) == [0, 1, 2, 3]
+
+
+@enforce_types
+def testNextLogTick():
+    state = SimState()
+    engine = SimEngine.SimEngine(state, PATH1)
+    state.ss.setTimeStep(S_PER_DAY // 4)
+    assert engine.nextLogTick() == 0
+    state.tick = 1
+    assert engine.nextLogTick() == 4
+    state.ss.setTimeStep(S_PER_DAY * 2 // 3)
+    assert engine.nextLogTick() == 3
+
+
+@enforce_types
+def testFastForward():
+    class SleepyAgent(AgentBase.AgentBase):
+        def takeStep(self, state):
+            pass
+        def nextWakeTick(self, state):
+            return state.tick + 100
+
+    globaltokens.setBackend('ledger') #no need for EVM here
+    state = SimState()
+    state.ss.setTimeStep(S_PER_DAY // 24)
+    state.ss.setMaxTicks(50)
+    state.ss.setFastForward(True)
+    state.agents["s1"] = SleepyAgent("s1", 0.0, 0.0)
+    n_steps = [0]
+    def takeStep():
+        n_steps[0] += 1
+        SimStateBase.SimStateBase.takeStep(state)
+    state.takeStep = takeStep
+
+    engine = SimEngine.SimEngine(state, PATH1)
+    engine.run()
+    assert state.tick == 50
+    assert n_steps[0] == 4 #ticks 0, 24, 48 (logging), 50 (stop)
+
+
+@enforce_types
+def testFastForwardStopConditions(tmp_path):
+    class SleepyAgent(AgentBase.AgentBase):
+        def takeStep(self, state):
+            pass
+        def nextWakeTick(self, state):
+            return state.tick + 100
+
+    def _run(stop_condition):
+        state = SimState()
+        state.ss.setTimeStep(S_PER_DAY // 24) #logs at ticks 0, 24, 48
+        state.ss.setMaxTicks(50)
+        state.ss.setFastForward(True)
+        state.ss.addStopCondition(stop_condition)
+        state.addAgent(SleepyAgent("s1", 0.0, 0.0))
+        engine = SimEngine.SimEngine(state, str(tmp_path))
+        engine.run()
+        return state.tick, engine.stop_reason
+
+    globaltokens.setBackend('ledger')
+    tick, reason = _run(StopCondition.TickBudget(30))
+    assert tick == 30 and reason.startswith('tick budget') #not 48
+
+    tick, reason = _run(StopCondition.Threshold(
+        'always', StopCondition.agentOCEAN('s1'), '>=', 0.0,
+        n_checks=2, every_ticks=20))
+    assert tick == 20 and reason.startswith('always') #checks at 0, 20
+
+
+def _logOCEAN(state):
+    OCEAN = state.getAgent("a1").OCEAN()
+    return [], ["OCEAN", "OCEAN_max"], [OCEAN, OCEAN]
+
+
+@enforce_types
+def testLogPolicy(tmp_path):
+    class GrowingAgent(AgentBase.AgentBase):
+        """Gets OCEAN at ticks 3, 4; spends it all at tick 5"""
+        def takeStep(self, state):
+            if state.tick in [3, 4]:
+                self.receiveOCEAN(1.0)
+            elif state.tick == 5:
+                self._transferOCEAN(None, self.OCEAN())
+
+    globaltokens.setBackend('ledger')
+    state = SimState()
+    state.ss.setTimeStep(S_PER_DAY)
+    state.ss.setMaxTicks(14)
+    state.ss.setLogPolicy(LogPolicy('weekly', {'OCEAN_max': 'max'}))
+    state.addAgent(GrowingAgent("a1", 0.0, 0.0))
+    output_dir = str(tmp_path)
+    SimEngine.SimEngine(state, output_dir, _logOCEAN).run()
+
+    with open(os.path.join(output_dir, 'data.csv'), 'r') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 1 + 3 #header, ticks 0, 7, 14
+    rows = [[float(v) for v in line.split(',')] for line in lines[1:]]
+    assert [row[0] for row in rows] == [0, 7, 14]
+    assert [row[-2:] for row in rows] == [[0, 0], [0, 2], [0, 0]]
+
+
+@enforce_types
+def testTiming(tmp_path):
+    globaltokens.setBackend('ledger')
+    state = SimState()
+    state.ss.setMaxTicks(5)
+    state.addAgent(SimpleAgent("a1", 0.0, 0.0))
+    output_dir = str(tmp_path)
+    SimEngine.SimEngine(state, output_dir).run()
+
+    with open(os.path.join(output_dir, 'timing.json'), 'r') as f:
+        rep = json.load(f)
+    assert rep['n_ticks'] == 5
+    assert rep['phases']['agents']['SimpleAgent']['count'] == 6 #ticks 0..5
+    assert rep['phases']['kpis']['KPIs']['count'] == 6
+
+
+@enforce_types
+def testStopConditions(tmp_path):
+    globaltokens.setBackend('ledger')
+    state = SimState()
+    state.ss.setMaxTicks(100)
+    state.addAgent(SimpleAgent("a1", 0.0, 0.0))
+    state.ss.addStopCondition(StopCondition.Threshold(
+        'a1 rich', StopCondition.agentOCEAN('a1'), '>=', 3.0, every_ticks=2))
+    output_dir = str(tmp_path)
+    engine = SimEngine.SimEngine(state, output_dir)
+    engine.takeStep = lambda: state.getAgent("a1").receiveOCEAN(1.0)
+    engine.run()
+    assert state.tick == 2 #OCEAN=3.0 after tick 2's step
+    assert engine.stop_reason.startswith('a1 rich')
+
+    with open(os.path.join(output_dir, 'stop.json'), 'r') as f:
+        stop = json.load(f)
+    assert stop['tick'] == 2 and stop['reason'] == engine.stop_reason
+
+    state = SimState()
+    state.ss.setMaxTicks(3)
+    engine = SimEngine.SimEngine(state, str(tmp_path))
+    engine.run()
+    assert engine.stop_reason == 'max_ticks'
+
+
 @enforce_types
 def tearDown():
     if os.path.exists(PATH1):
@@ -1,8 +1,11 @@
 from enforce_typing import enforce_types
+import threading
 
 from engine import SimStateBase, SimStrategyBase, KPIsBase
 from engine import AgentBase
 from util.constants import S_PER_DAY
+from web3engine import globaltokens
+from web3tools import accountpool
 
 # ==================================================================
 # testing stubs
@@ -57,3 +60,227 @@ def test1():
     agent3 = SimpleAgent("agent3", 0.0, 0.0)
     state.addAgent(agent3)
     assert state.numAgents() == 3
+
+@enforce_types
+def test_processSettings():
+    #making a strategy changes nothing global; giving it to a state does
+    globaltokens.setBackend('evm')
+    ss = SimStrategy()
+    ss.setTokenBackend('ledger')
+    ss.setAccountPool('seed1')
+    assert globaltokens.backend() == 'evm'
+    assert accountpool.pool() is None
+    try:
+        SimStateBase.SimStateBase(ss)
+        assert globaltokens.backend() == 'ledger'
+        assert accountpool.pool().seed == 'seed1'
+    finally:
+        accountpool.setPool(None)
+
+@enforce_types
+def test_scheduling():
+    globaltokens.setBackend('ledger') #no need for EVM here
+    state = SimState()
+    state.ss.setTimeStep(S_PER_DAY)
+    log = []
+
+    class SleepyAgent(AgentBase.AgentBase):
+        """Steps every 3 ticks"""
+        def takeStep(self, state):
+            log.append((state.tick, self.name, self._ticks_since_step))
+        def nextWakeTick(self, state):
+            return state.tick + 3
+
+    class EveryTickAgent(AgentBase.AgentBase):
+        def takeStep(self, state):
+            log.append((state.tick, self.name))
+
+    state.agents["s1"] = SleepyAgent("s1", 0.0, 0.0)
+    state.addAgent(EveryTickAgent("e1", 0.0, 0.0))
+    for _ in range(4):
+        state.takeStep()
+        state.tick += 1
+
+    #new agents are due right away; ordering is the order added
+    state.agents["s2"] = SleepyAgent("s2", 0.0, 0.0)
+    assert state.nextDueTick() == state.tick #e1 is every tick
+    for _ in range(3):
+        state.takeStep()
+        state.tick += 1
+
+    assert log == [(0, "s1", 1), (0, "e1"),
+                   (1, "e1"),
+                   (2, "e1"),
+                   (3, "s1", 3), (3, "e1"),
+                   (4, "e1"), (4, "s2", 1),
+                   (5, "e1"),
+                   (6, "s1", 3), (6, "e1")]
+
+@enforce_types
+def test_nextDueTick():
+    globaltokens.setBackend('ledger')
+    state = SimState()
+    state.agents.clear()
+    assert state.nextDueTick() == AgentBase.NEVER_WAKE
+
+    class SleepyAgent(AgentBase.AgentBase):
+        def takeStep(self, state):
+            pass
+        def nextWakeTick(self, state):
+            return state.tick + 10
+
+    state.addAgent(SleepyAgent("s1", 0.0, 0.0))
+    assert state.nextDueTick() == 0
+    state.takeStep()
+    assert state.nextDueTick() == 10
+
+@enforce_types
+def test_wakeAgent():
+    globaltokens.setBackend('ledger')
+    state = SimState()
+    state.agents.clear()
+    log = []
+
+    class Sender(AgentBase.AgentBase):
+        def takeStep(self, state):
+            log.append((state.tick, self.name))
+            if state.tick == 2:
+                self._transferOCEAN(state.getAgent("late"), 1.0)
+                self._transferOCEAN(state.getAgent("early"), 1.0)
+
+    class Receiver(AgentBase.AgentBase):
+        WAKE_ON_RECEIVE = True
+        def takeStep(self, state):
+            log.append((state.tick, self.name, self.OCEAN()))
+        def nextWakeTick(self, state):
+            return AgentBase.NEVER_WAKE
+
+    state.addAgent(Receiver("early", 0.0, 0.0))
+    state.addAgent(Sender("sender", 0.0, 2.0))
+    state.addAgent(Receiver("late", 0.0, 0.0))
+    for _ in range(4):
+        state.takeStep()
+        state.tick += 1
+
+    #'late' steps after sender, so it acts on funds in the same tick
+    assert log == [(0, "early", 0.0), (0, "sender"), (0, "late", 0.0),
+                   (1, "sender"),
+                   (2, "sender"), (2, "late", 1.0),
+                   (3, "early", 1.0), (3, "sender")]
+
+@enforce_types
+def test_fastForward():
+    globaltokens.setBackend('ledger')
+    state = SimState()
+    state.agents.clear()
+    state.fastForward(5)
+    assert state.tick == 5
+    assert state.kpis._tick == 0 #KPIs stub here ignores takeStep
+
+@enforce_types
+def test_parallelAgents():
+    globaltokens.setBackend('ledger')
+    barrier = threading.Barrier(3, timeout=10.0)
+
+    class Worker(AgentBase.AgentBase):
+        READS = WRITES = ('self',)
+        def __init__(self, name: str):
+            super().__init__(name, 0.0, 1.0)
+            self.x = 0
+        def takeStep(self, state):
+            barrier.wait() #only passes if all 3 workers step concurrently
+            self.x += state.tick
+
+    class Collector(AgentBase.AgentBase):
+        READS = ('w0', 'w1', 'w2')
+        WRITES = ('self',)
+        def __init__(self, name: str):
+            super().__init__(name, 0.0, 0.0)
+            self.log: list = []
+        def takeStep(self, state):
+            self.log.append([state.getAgent(name).x for name in self.READS])
+
+    class Sender(AgentBase.AgentBase):
+        READS = ('self',)
+        WRITES = ('self', 'inbox')
+        def takeStep(self, state):
+            if state.tick == 1:
+                self._transferOCEAN(state.getAgent("inbox"), 1.0)
+
+    class Receiver(AgentBase.AgentBase):
+        WAKE_ON_RECEIVE = True
+        READS = WRITES = ('self',)
+        def __init__(self, name: str):
+            super().__init__(name, 0.0, 0.0)
+            self.log: list = []
+        def takeStep(self, state):
+            self.log.append((state.tick, self.OCEAN()))
+        def nextWakeTick(self, state):
+            return AgentBase.NEVER_WAKE
+
+    state = SimState()
+    state.agents.clear()
+    state.ss.setParallelAgents(4)
+    for i in range(3):
+        state.addAgent(Worker(f"w{i}"))
+    state.addAgent(Collector("collector"))
+    state.addAgent(Sender("sender", 0.0, 1.0))
+    state.addAgent(Receiver("inbox"))
+    for _ in range(3):
+        state.takeStep()
+        state.tick += 1
+
+    #collector conflicts with the workers, so it steps after them
+    assert state.getAgent("collector").log == [[0, 0, 0], [1, 1, 1], [3, 3, 3]]
+
+    #waves: [w0 w1 w2] [collector sender] [inbox]. Sender wakes inbox
+    # at tick 1; inbox comes later, so acts on it in the same tick
+    assert state.getAgent("inbox").log == [(0, 0.0), (1, 1.0)]
+
+@enforce_types
+def test_spawnAgents():
+    globaltokens.setBackend('ledger')
+    state = SimState()
+    specs = [dict(name=f"new{i}", USD=0.0, OCEAN=float(i)) for i in range(3)]
+    agents = state.spawnAgents(SimpleAgent, specs)
+    assert [agent.name for agent in agents] == ["new0", "new1", "new2"]
+    assert state.getAgent("new2").OCEAN() == 2.0
+    assert not agents[2]._wallet._isMaterialized()
+
+    specs = [dict(name=f"more{i}", USD=0.0, OCEAN=1.0) for i in range(2)]
+    agents = state.spawnAgents(SimpleAgent, specs, materialize=True)
+    assert all(agent._wallet._isMaterialized() for agent in agents)
+    assert state.getAgent("more1").OCEAN() == 1.0
+
+    try:
+        state.addAgents([SimpleAgent("x", 0.0, 0.0), SimpleAgent("x", 0.0, 0.0)])
+        assert False, "should have failed"
+    except AssertionError as e:
+        assert "duplicate" in str(e)
+    assert "x" not in state.agents
+
+@enforce_types
+def test_sameTickSteps():
+    #tests may call takeStep() without advancing the tick. Then every
+    # agent steps each call, a tick's worth of time apart
+    class WeeklyAgent(AgentBase.AgentBase):
+        def __init__(self, name: str):
+            super().__init__(name, 0.0, 0.0)
+            self.s_seen: list = []
+        def takeStep(self, state):
+            self.s_seen.append(self._secondsSinceStep(state))
+        def nextWakeTick(self, state):
+            return state.tick + 7
+
+    state = SimState()
+    state.ss.time_step = S_PER_DAY
+    state.addAgent(WeeklyAgent("weekly"))
+    for _ in range(3):
+        state.takeStep()
+    assert state.getAgent("weekly").s_seen == [S_PER_DAY] * 3
+
+    #with the tick moving, it's scheduled again
+    state.tick = 1
+    state.takeStep()
+    assert len(state.getAgent("weekly").s_seen) == 3
+    assert state._sched_wake["weekly"] == 7
@@ -2,6 +2,7 @@ from enforce_typing import enforce_types
 import pytest
 
 from engine.SimStrategyBase import SimStrategyBase
+from web3engine import globaltokens
 from util.constants import S_PER_HOUR, S_PER_DAY, S_PER_MONTH, S_PER_YEAR
 
 @enforce_types
@@ -35,3 +36,16 @@ def test1():
 
     with pytest.raises(ValueError):
         ss.setMaxTime(10, 'foo_unit')
+
+@enforce_types
+def test_tokenBackend():
+    ss = SimStrategyBase()
+    assert ss.token_backend is None #the process's
+    
+    backend = globaltokens.backend()
+    ss.setTokenBackend('ledger')
+    assert ss.token_backend == 'ledger'
+    assert globaltokens.backend() == backend #not until applied
+
+    ss.applyProcessSettings()
+    assert globaltokens.backend() == 'ledger'
@@ -0,0 +1,80 @@
+import pickle
+import pytest
+
+from engine.StopCondition import StopCondition, Threshold, SteadyState, TickBudget, \
+    WallClockBudget, agentOCEAN, kpi
+
+class _State:
+    def __init__(self):
+        self.tick = 0
+        self.value = 0.0
+
+def _value(state) -> float:
+    return state.value
+
+def test_threshold():
+    state = _State()
+    cond = Threshold('low', _value, '<', 1.0, n_checks=2, every_ticks=5)
+    assert cond.isDue(10) and not cond.isDue(11)
+    assert cond.nextDueTick(10) == 10 and cond.nextDueTick(11) == 15
+
+    state.value = 0.5
+    assert cond.reason(state) is None #1 check in a row
+    state.value = 2.0
+    assert cond.reason(state) is None #resets
+    state.value = 0.5
+    assert cond.reason(state) is None
+    assert cond.reason(state).startswith('low')
+
+    with pytest.raises(ValueError):
+        Threshold('bad', _value, '==', 1.0)
+
+def test_steadyState():
+    state = _State()
+    cond = SteadyState('flat', _value, n_checks=3, rel_tol=0.01)
+    for value in [1.0, 5.0, 10.0, 10.05]:
+        state.value = value
+        assert cond.reason(state) is None
+    state.value = 10.02
+    assert cond.reason(state).startswith('flat')
+
+def test_budgets():
+    state = _State()
+    state.tick = 10
+    cond = TickBudget(5)
+    cond.start(state)
+    assert cond.nextDueTick(11) == 15 and cond.nextDueTick(16) == 16
+    state.tick = 14
+    assert cond.reason(state) is None
+    state.tick = 15
+    assert cond.reason(state) is not None
+
+    cond = WallClockBudget(0.0)
+    cond.start(state)
+    assert cond.reason(state) is not None
+    assert WallClockBudget(1e6).reason(state) is None
+
+def test_abstract():
+    class NoReason(StopCondition):
+        pass
+    with pytest.raises(TypeError): #at construction, not at first check
+        NoReason('foo')
+
+def test_valueFuncs():
+    class Agent:
+        def OCEAN(self):
+            return 3.0
+    class KPIs:
+        def __init__(self):
+            self.x = [1.0, 2.0]
+        def y(self):
+            return 4.0
+    state = _State()
+    state.getAgent = lambda name: Agent()
+    state.kpis = KPIs()
+    assert agentOCEAN('a')(state) == 3.0
+    assert kpi('x')(state) == 2.0
+    assert kpi('y')(state) == 4.0
+
+    cond = Threshold('low', agentOCEAN('a'), '<', 1.0)
+    pickle.loads(pickle.dumps(cond)) #can checkpoint
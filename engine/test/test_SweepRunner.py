@@ -0,0 +1,102 @@
+from enforce_typing import enforce_types
+import json
+import os
+import pytest
+import random
+
+from engine import AgentBase, KPIsBase, SimStateBase, SimStrategyBase
+from engine.SweepRunner import SweepRunner
+from web3engine import globaltokens
+
+# ==================================================================
+# this module doubles as a tiny netlist for the sweeps
+NETLIST = 'engine.test.test_SweepRunner'
+
+class SimStrategy(SimStrategyBase.SimStrategyBase):
+    def __init__(self):
+        super().__init__()
+        self.setMaxTicks(2)
+        self.foo = 1.0
+
+class KPIs(KPIsBase.KPIsBase):
+    pass
+
+class SimState(SimStateBase.SimStateBase):
+    def __init__(self, ss=None):
+        super().__init__(ss)
+        if self.ss is None:
+            self.ss = SimStrategy()
+        if self.ss.foo < 0.0:
+            raise ValueError("foo must be >= 0")
+        self.kpis = KPIs(time_step=self.ss.time_step)
+        
+def netlist_createLogData(state):
+    return [], ["foo", "rand"], [state.ss.foo, random.random()]
+
+# ==================================================================
+# actual tests
+@enforce_types
+def test_configs():
+    spec = {'grid': {'a': [1, 2], 'b': [3, 4]},
+            'samples': [{'c': 5}, {'c': 6}],
+            'seeds': [0, 1]}
+    configs = SweepRunner.configs(spec)
+    assert len(configs) == 2 * 2 * 2 * 2
+    assert configs[0] == {'params': {'a': 1, 'b': 3, 'c': 5}, 'seed': 0}
+    assert configs[-1] == {'params': {'a': 2, 'b': 4, 'c': 6}, 'seed': 1}
+
+    assert SweepRunner.configs({}) == [{'params': {}, 'seed': None}]
+
+@enforce_types
+def test_badSpec(tmp_path):
+    with pytest.raises(ValueError):
+        SweepRunner(NETLIST, str(tmp_path), {'grid': {'not_an_attr': [1]}})
+    with pytest.raises(ValueError):
+        SweepRunner(NETLIST, str(tmp_path), {'gird': {'foo': [1]}})
+
+@enforce_types
+def test_sweep(tmp_path):
+    output_dir = os.path.join(str(tmp_path), 'sweep')
+    spec = {'grid': {'foo': [2.0, -1.0]}, 'seeds': [7, 7]}
+    index = SweepRunner(NETLIST, output_dir, spec).run(nprocs=2)
+    assert index['counts'] == {'pending': 0, 'finished': 2, 'failed': 2}
+    with open(os.path.join(output_dir, 'index.json')) as f:
+        assert json.load(f)['counts'] == index['counts']
+
+    runs = index['runs']
+    assert [run['status'] for run in runs] == \
+        ['finished', 'finished', 'failed', 'failed']
+    assert 'foo must be >= 0' in runs[2]['error']
+
+    #each run has its own output dir. Same seed, same results
+    data0 = open(os.path.join(output_dir, 'run_00000', 'data.csv')).read()
+    data1 = open(os.path.join(output_dir, 'run_00001', 'data.csv')).read()
+    assert data0 == data1
+    assert "2, " in data0.splitlines()[1]
+
+    #re-run: finished runs are skipped, failed ones are retried
+    runner = SweepRunner(NETLIST, output_dir, spec)
+    assert [run['status'] for run in runner.runs] == \
+        ['finished', 'finished', 'pending', 'pending']
+    wall_time = runner.runs[0]['wall_time_s']
+    index = runner.run(nprocs=1)
+    assert index['runs'][0]['wall_time_s'] == wall_time
+    assert index['counts']['failed'] == 2
+
+    #can't reuse a dir for a different sweep
+    with pytest.raises(ValueError):
+        SweepRunner(NETLIST, output_dir, {'grid': {'foo': [3.0]}})
+
+@enforce_types
+def test_sweepNetlist(tmp_path):
+    #a real netlist, whose SimState builds its own SimStrategy by default
+    globaltokens.setBackend('ledger') #no need for EVM here
+    output_dir = os.path.join(str(tmp_path), 'sweep')
+    spec = {'grid': {'granter_n_actions': [2, 4]}, 'seeds': [0]}
+    index = SweepRunner('assets.netlists.simplegrant.netlist',
+                        output_dir, spec).run(nprocs=2)
+    assert index['counts'] == {'pending': 0, 'finished': 2, 'failed': 0}, \
+        [run.get('error') for run in index['runs']]
+    for run in index['runs']:
+        assert os.path.exists(
+            os.path.join(output_dir, run['run_id'], 'data.csv'))
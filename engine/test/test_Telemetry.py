@@ -0,0 +1,56 @@
+from enforce_typing import enforce_types
+import json
+import os
+
+from engine import AgentBase, KPIsBase, SimStateBase, SimStrategyBase
+from engine.SimEngine import SimEngine
+from engine.Telemetry import rssBytes
+from web3engine import globaltokens
+
+class SimpleAgent(AgentBase.AgentBase):
+    def takeStep(self, state):
+        pass
+
+class SimState(SimStateBase.SimStateBase):
+    def __init__(self):
+        super().__init__()
+        self.ss = SimStrategyBase.SimStrategyBase()
+        self.ss.setMaxTicks(30)
+        self.kpis = KPIsBase.KPIsBase(self.ss.time_step)
+        self.addAgent(SimpleAgent("a1", 0.0, 0.0))
+
+@enforce_types
+def test_metrics(tmp_path):
+    globaltokens.setBackend('ledger') #no need for EVM here
+    output_dir = str(tmp_path)
+    state = SimState()
+    state.ss.setMetricsSeconds(0.0) #every tick
+    SimEngine(state, output_dir).run()
+
+    with open(os.path.join(output_dir, 'metrics.jsonl'), 'r') as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 30 + 1 #after ticks 0..29, then at end
+    assert [line['tick'] for line in lines[:3]] == [1, 2, 3]
+    assert lines[-1]['status'] == 'done'
+    assert lines[-1]['tick'] == 30
+    assert lines[-1]['max_ticks'] == 30
+    assert lines[0]['status'] == 'running'
+    assert lines[0]['ticks_per_s'] > 0.0 #counts from the run's start
+    assert lines[0]['avg_ticks_per_s'] > 0.0
+    assert lines[0]['eta_s'] is not None
+    assert lines[0]['rss_bytes'] > 0
+    assert lines[0]['rows_buffered'] >= 0
+    assert lines[0]['rpc_per_s'] in [0.0, None] #no EVM
+
+@enforce_types
+def test_noMetrics(tmp_path):
+    globaltokens.setBackend('ledger')
+    output_dir = str(tmp_path)
+    state = SimState()
+    state.ss.setMetricsSeconds(None)
+    SimEngine(state, output_dir).run()
+    assert not os.path.exists(os.path.join(output_dir, 'metrics.jsonl'))
+
+@enforce_types
+def test_rssBytes():
+    assert rssBytes() > 1e6
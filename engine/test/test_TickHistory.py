@@ -0,0 +1,90 @@
+from enforce_typing import enforce_types
+import pytest
+
+from engine.TickHistory import TickHistory
+from util.constants import S_PER_DAY
+
+@enforce_types
+def test_full():
+    h = TickHistory()
+    assert h == [] and len(h) == 0
+    assert h.sum(0, 10) == 0.0
+    for val in [1.0, 2.0, 3.0, 4.0]:
+        h.append(val)
+    assert h == [1.0, 2.0, 3.0, 4.0]
+    assert len(h) == 4
+    assert h[0] == 1.0 and h[-1] == 4.0
+    assert h.sum(1, 3) == 5.0
+    assert h.sum(-5, 100) == 10.0 #clamped, like a slice
+    assert h.sum(3, 1) == 0.0
+    with pytest.raises(IndexError):
+        h[4]
+
+@enforce_types
+def test_window():
+    h = TickHistory('window', n_ticks=3)
+    for val in range(1, 8): #1..7
+        h.append(float(val))
+    assert len(h) == 7
+    assert h == [5.0, 6.0, 7.0]
+    assert h[4] == 5.0 and h[-1] == 7.0
+    assert h.sum(4, 7) == 18.0
+    assert h.sum(5, 100) == 13.0
+    with pytest.raises(IndexError):
+        h[3]
+    with pytest.raises(IndexError):
+        h.sum(3, 7)
+
+@enforce_types
+def test_window_seconds():
+    h = TickHistory('window', n_seconds=3*S_PER_DAY, time_step=S_PER_DAY)
+    assert h == [] and h.values() == [] and len(h) == 0 #fresh
+    assert not h.needsTimeStep()
+    with pytest.raises(IndexError):
+        h[0]
+    for val in range(1, 11):
+        h.append(float(val))
+    assert h == [7.0, 8.0, 9.0, 10.0] #3 days, plus 1
+
+@enforce_types
+def test_window_seconds_noTimeStep():
+    #no time_step yet (e.g. an agent before its first step): keep everything
+    h = TickHistory('window', n_seconds=3*S_PER_DAY)
+    assert h.needsTimeStep()
+    for val in range(1, 6):
+        h.append(float(val))
+    assert h == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert h[0] == 1.0 and h.sum(0, 5) == 15.0
+
+    #once one comes, trim to the window
+    h.setTimeStep(S_PER_DAY)
+    assert not h.needsTimeStep()
+    h.append(6.0)
+    assert h == [3.0, 4.0, 5.0, 6.0]
+    assert len(h) == 6 and h.sum(2, 6) == 18.0
+
+    h.setTimeStep(2*S_PER_DAY) #no-op: already set
+    h.append(7.0)
+    assert h == [4.0, 5.0, 6.0, 7.0]
+
+@enforce_types
+def test_downsample():
+    h = TickHistory('downsample', n_ticks=3)
+    for val in range(7): #0..6
+        h.append(float(val))
+    assert len(h) == 7
+    assert h == [0.0, 3.0, 6.0]
+    assert h[3] == 3.0
+    with pytest.raises(IndexError):
+        h[4]
+    with pytest.raises(ValueError):
+        h.sum(0, 3)
+
+@enforce_types
+def test_badArgs():
+    with pytest.raises(ValueError):
+        TickHistory('ring', n_ticks=3)
+    with pytest.raises(ValueError):
+        TickHistory('window')
+    with pytest.raises(ValueError):
+        TickHistory('window', n_ticks=0)
@@ -2,14 +2,13 @@
 # numbers for running TokenSPICE. Magic numbers have been
 # moved into netlists.
 
-CONF_FILE_PATH = './tokenspice.ini'
+from util import settings
+CONF_FILE_PATH = settings.CONF_FILE_PATH
 
-import configparser, os
-config = configparser.ConfigParser()
-config.read(os.path.expanduser(CONF_FILE_PATH))
+SAFETY = settings.get().safety
 
-SAFETY = config['general'].getboolean('safety')
-assert SAFETY is not None
+#where token balances live by default: 'evm' or 'ledger'
+TOKEN_BACKEND = settings.get().token_backend
 
 import logging
 log = logging.getLogger('constants')
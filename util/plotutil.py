@@ -222,6 +222,31 @@ def _csvToHeaderValues(input_csv_filename: str):
     values = numpy.array(values) #[tick_i, valuetype_i]
     return (header, values)
         
+@enforce_types
+def _columnarToHeaderValues(input_dir: str):
+    """
+    Given columnar output dir from a TokenSPICE run, creates (header, values).
+    Loads zero-copy (memory-mapped) when the run's output is uncompressed.
+
+    :param: input_dir: path of e.g. data_cols/, see engine/ResultSink.py
+    :return: header -- List[str] holding 'Tick', 'Second', ...
+    :return: values -- 2d array of float [tick_i, valuetype_i]
+    """
+    from engine.ResultSink import loadColumnar
+    (header, values, _) = loadColumnar(input_dir)
+    return (header, values)
+
+@enforce_types
+def columnarToPngs(input_dir: str, output_png_dir: str,
+                   netlist_plot_instrs_func):
+    """Like csvToPngs, but input is columnar output dir (e.g. data_cols/)"""
+    (header, values) = _columnarToHeaderValues(input_dir)
+
+    (x, y_params) = netlist_plot_instrs_func(header, values)
+    y_params = _expandBOTHinY(y_params)
+
+    _xyToPngs(header, values, x, y_params, output_png_dir)
+
 @enforce_types
 def csvToPngs(input_csv_filename: str, output_png_dir: str,
               netlist_plot_instrs_func):
@@ -0,0 +1,143 @@
+"""Settings from tokenspice.ini, parsed once per process.
+
+Use get(): an immutable Settings. It has typed properties for what the
+engine reads often (network, GAS_PRICE, ..), and value(section, key) for
+anything else. E.g.
+  settings.get().gas_price
+  settings.get().networkValue('TEST_PRIVATE_KEY1')
+
+Overrides, from weakest to strongest:
+  -tokenspice.ini, or the file named by env var TOKENSPICE_CONF
+  -env vars TOKENSPICE_<SECTION>_<KEY>, e.g. TOKENSPICE_GENERAL_NETWORK
+  -for one run / test: `with settings.overridden({'general': {..}}):`
+"""
+import configparser
+import contextlib
+import os
+import types
+import typing
+
+from enforce_typing import enforce_types
+
+CONF_FILE_PATH = './tokenspice.ini'
+ENV_PREFIX = 'TOKENSPICE_'
+
+class Settings:
+    """Immutable. section : key : str value. Keys are case-insensitive,
+    like configparser's"""
+    def __init__(self, values: dict):
+        object.__setattr__(self, '_values', types.MappingProxyType({
+            section: types.MappingProxyType(
+                {key.lower(): value for key, value in section_values.items()})
+            for section, section_values in values.items()}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings are immutable. Use withOverrides()")
+
+    def value(self, section: str, key: str) -> str:
+        return self._values[section][key.lower()]
+
+    def has(self, section: str, key: str) -> bool:
+        return key.lower() in self._values.get(section, {})
+
+    def networkValue(self, key: str) -> str:
+        """From the section of the current network, e.g. [ganache]"""
+        return self.value(self.network, key)
+
+    def withOverrides(self, overrides: dict) -> 'Settings':
+        """New Settings, with overrides: {section : {key : value}}"""
+        values = {section: dict(section_values)
+                  for section, section_values in self._values.items()}
+        for section, section_values in overrides.items():
+            for key, value in section_values.items():
+                values.setdefault(section, {})[key.lower()] = str(value)
+        return Settings(values)
+
+    def asDict(self) -> dict:
+        return {section: dict(section_values)
+                for section, section_values in self._values.items()}
+
+    #typed properties for the hot & common ones
+    @property
+    def network(self) -> str:
+        return self.value('general', 'NETWORK')
+
+    @property
+    def ganache_url(self) -> str:
+        return self.value('general', 'GANACHE_URL')
+
+    @property
+    def artifacts_path(self) -> str:
+        return self.value('general', 'ARTIFACTS_PATH')
+
+    @property
+    def safety(self) -> bool:
+        return _toBool(self.value('general', 'safety'))
+
+    @property
+    def token_backend(self) -> str:
+        if not self.has('general', 'token_backend'):
+            return 'evm'
+        return self.value('general', 'token_backend')
+
+    @property
+    def gas_price(self) -> int:
+        return int(self.networkValue('GAS_PRICE'))
+
+def _toBool(s: str) -> bool:
+    s = s.strip().lower()
+    if s in ['1', 'yes', 'true', 'on']:
+        return True
+    if s in ['0', 'no', 'false', 'off']:
+        return False
+    raise ValueError(f"not a boolean: '{s}'")
+
+@enforce_types
+def load(path: typing.Union[str, None] = None,
+         environ: typing.Union[dict, None] = None) -> Settings:
+    """Parse the conf file, then apply env var overrides"""
+    if environ is None:
+        environ = dict(os.environ)
+    if path is None:
+        path = environ.get(ENV_PREFIX + 'CONF', CONF_FILE_PATH)
+    conf = configparser.ConfigParser()
+    conf.read(os.path.expanduser(path))
+    values = {section: dict(conf[section]) for section in conf.sections()}
+
+    overrides: dict = {}
+    for name, value in environ.items():
+        if not name.startswith(ENV_PREFIX) or name == ENV_PREFIX + 'CONF':
+            continue
+        section_key = name[len(ENV_PREFIX):].lower()
+        #the section is the longest known one that prefixes the name,
+        # since keys may hold '_' (e.g. TOKENSPICE_GANACHE_GAS_PRICE)
+        sections = [s for s in values if section_key.startswith(s + '_')]
+        if not sections:
+            continue
+        section = max(sections, key=len)
+        key = section_key[len(section) + 1:]
+        overrides.setdefault(section, {})[key] = value
+    return Settings(values).withOverrides(overrides)
+
+_SETTINGS = None
+
+def get() -> Settings:
+    """The process's settings, loaded on first use"""
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = load()
+    return _SETTINGS
+
+def setSettings(settings: Settings) -> None:
+    global _SETTINGS
+    _SETTINGS = settings
+
+@contextlib.contextmanager
+def overridden(overrides: dict):
+    """Use get().withOverrides(overrides) inside the with-block"""
+    prev = get()
+    setSettings(prev.withOverrides(overrides))
+    try:
+        yield get()
+    finally:
+        setSettings(prev)
@@ -0,0 +1,44 @@
+import os
+import pytest
+
+from util import settings
+
+def _writeConf(tmp_path) -> str:
+    filename = os.path.join(str(tmp_path), 'test.ini')
+    with open(filename, 'w') as f:
+        f.write("[general]\nNETWORK = ganache\nsafety = False\n"
+                "[ganache]\nGAS_PRICE = 1\nTEST_PRIVATE_KEY1 = 0x01\n")
+    return filename
+
+def test_load(tmp_path):
+    s = settings.load(_writeConf(tmp_path), environ={})
+    assert s.network == 'ganache'
+    assert s.value('general', 'network') == 'ganache' #keys ignore case
+    assert s.gas_price == 1
+    assert s.networkValue('TEST_PRIVATE_KEY1') == '0x01'
+    assert s.safety is False
+    assert s.token_backend == 'evm' #default
+    with pytest.raises(AttributeError):
+        s.foo = 1
+
+def test_overrides(tmp_path):
+    environ = {'TOKENSPICE_GANACHE_GAS_PRICE': '7',
+               'TOKENSPICE_GENERAL_TOKEN_BACKEND': 'ledger',
+               'TOKENSPICE_NOSUCHSECTION_X': 'y',
+               'PATH': '/bin'}
+    s = settings.load(_writeConf(tmp_path), environ=environ)
+    assert s.gas_price == 7
+    assert s.token_backend == 'ledger'
+    assert 'nosuchsection' not in s.asDict()
+
+    s2 = s.withOverrides({'ganache': {'GAS_PRICE': 9}})
+    assert s2.gas_price == 9 and s.gas_price == 7
+
+    environ = {'TOKENSPICE_CONF': _writeConf(tmp_path)}
+    assert settings.load(environ=environ).gas_price == 1
+
+def test_overridden():
+    gas_price = settings.get().gas_price
+    with settings.overridden({'ganache': {'GAS_PRICE': gas_price + 1}}):
+        assert settings.get().gas_price == gas_price + 1
+    assert settings.get().gas_price == gas_price
@@ -0,0 +1,67 @@
+from enforce_typing import enforce_types
+import json
+import os
+import threading
+
+from util import timing
+
+@enforce_types
+def test_timing(tmp_path):
+    timing.reset()
+    timing.add('agents', 'FooAgent', 0.25)
+    timing.add('agents', 'FooAgent', 0.75)
+    timing.add('agents', 'BarAgent', 3.0)
+    with timing.timer('log', 'sinks'):
+        pass
+
+    @timing.timed('methods')
+    def f(x):
+        return x + 1
+    assert f(1) == 2
+
+    assert timing.count('agents') == 3
+    assert timing.count('agents', 'FooAgent') == 2
+    assert timing.count('agents', 'BazAgent') == 0
+    assert timing.count('evm') == 0
+
+    rep = timing.report()
+    assert list(rep['agents'].keys()) == ['BarAgent', 'FooAgent'] #by total
+    foo = rep['agents']['FooAgent']
+    assert foo['count'] == 2
+    assert foo['total_s'] == 1.0
+    assert foo['mean_s'] == 0.5
+    assert foo['max_s'] == 0.75
+    assert foo['share'] == 0.25
+    assert rep['log']['sinks']['count'] == 1
+    assert rep['methods']['test_timing.<locals>.f']['count'] == 1
+
+    filename = os.path.join(str(tmp_path), 'timing.json')
+    timing.writeReport(filename, {'n_ticks': 3})
+    with open(filename, 'r') as f:
+        assert json.load(f)['phases']['agents']['BarAgent']['count'] == 1
+
+    timing.reset()
+    assert timing.report() == {}
+
+@enforce_types
+def test_disabled():
+    timing.reset()
+    timing.setEnabled(False)
+    try:
+        timing.add('agents', 'FooAgent', 1.0)
+    finally:
+        timing.setEnabled(True)
+    assert timing.report() == {}
+
+@enforce_types
+def test_threads():
+    timing.reset()
+    def work():
+        for _ in range(10000):
+            timing.add('rpc', 'eth_call', 0.001)
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert timing.count('rpc', 'eth_call') == 40000
@@ -0,0 +1,118 @@
+"""Lightweight timers and counters for the tick loop.
+
+Timings are grouped by phase ('agents', 'kpis', 'log', 'evm', 'rpc', ..),
+then by name within the phase (e.g. agent class, or RPC method). Each
+name keeps: count, total seconds, max seconds. That's O(1) per event.
+
+SimEngine resets timings at the start of run(), and writes report() to
+OUTPUT_DIR/timing.json at the end. Add more with timer() or @timed.
+"""
+from enforce_typing import enforce_types
+import functools
+import json
+import os
+import threading
+import time
+
+now = time.perf_counter
+
+ENABLED = True
+_TIMINGS: dict = {} # phase : {name : [count, total_s, max_s]}
+_LOCK = threading.Lock() #agents may step in threads. See parallel_agents
+
+@enforce_types
+def setEnabled(enabled: bool):
+    global ENABLED
+    ENABLED = enabled
+
+def reset():
+    global _TIMINGS
+    _TIMINGS = {}
+
+def add(phase: str, name: str, seconds: float):
+    """Record one event. Not type-checked: it's on the hot path"""
+    if not ENABLED:
+        return
+    with _LOCK:
+        names = _TIMINGS.get(phase)
+        if names is None:
+            names = _TIMINGS[phase] = {}
+        t = names.get(name)
+        if t is None:
+            names[name] = [1, seconds, seconds]
+            return
+        t[0] += 1
+        t[1] += seconds
+        if seconds > t[2]:
+            t[2] = seconds
+
+class timer:
+    """Context manager. Example: with timing.timer('log', 'sinks'): ..."""
+    def __init__(self, phase: str, name: str):
+        self._phase, self._name = phase, name
+
+    def __enter__(self):
+        self._t0 = now()
+        return self
+
+    def __exit__(self, *args):
+        add(self._phase, self._name, now() - self._t0)
+
+def timed(phase: str, name=None):
+    """Decorator to time each call of a function or method"""
+    def decorator(f):
+        f_name = name or f.__qualname__
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            t0 = now()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                add(phase, f_name, now() - t0)
+        return wrapper
+    return decorator
+
+def web3Middleware(make_request, w3):
+    """Web3 middleware: time every JSON-RPC request, by method"""
+    def middleware(method, params):
+        t0 = now()
+        try:
+            return make_request(method, params)
+        finally:
+            add('rpc', method, now() - t0)
+    return middleware
+
+def count(phase: str, name=None) -> int:
+    """# events so far in a phase, or for one name in it"""
+    names = _TIMINGS.get(phase, {})
+    if name is not None:
+        return names[name][0] if name in names else 0
+    return sum(t[0] for t in names.values())
+
+@enforce_types
+def report() -> dict:
+    """phase : name : {count, total_s, mean_s, max_s, share}, where share
+    is the fraction of the phase's total. Names sorted by total_s."""
+    rep = {}
+    for phase, names in _TIMINGS.items():
+        phase_total = sum(t[1] for t in names.values())
+        rep[phase] = {}
+        for name, (count, total_s, max_s) in \
+                sorted(names.items(), key=lambda item: -item[1][1]):
+            rep[phase][name] = {
+                'count': count,
+                'total_s': total_s,
+                'mean_s': total_s / count,
+                'max_s': max_s,
+                'share': total_s / phase_total if phase_total > 0 else 0.0,
+            }
+    return rep
+
+@enforce_types
+def writeReport(filename: str, extra: dict):
+    """Write {**extra, 'phases': report()} as json"""
+    rep = dict(extra)
+    rep['phases'] = report()
+    with open(filename + '.tmp', 'w') as f:
+        json.dump(rep, f, indent=1)
+    os.replace(filename + '.tmp', filename) #atomic
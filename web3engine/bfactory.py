@@ -2,26 +2,29 @@ from enforce_typing import enforce_types
 import warnings
 
 from web3tools import web3util, web3wallet
+from web3tools.contract_handler import ContractHandler
 
 @enforce_types
 class BFactory:
     def __init__(self):
         name = self.__class__.__name__
-        abi = web3util.abi(name)
-        web3 = web3util.get_web3()
-        contract_address = web3util.contractAddress(name)
-        self.contract = web3.eth.contract(contract_address, abi=abi)
+        self.contract = ContractHandler.get(name) #at address.json's address
         
     @property
     def address(self):
         return self.contract.address
+
+    def __reduce__(self):
+        #pickle by re-looking-up the address; web3 objects aren't picklable
+        return (self.__class__, ())
         
     #============================================================
     #reflect BFactory Solidity methods
     def newBPool(self, from_wallet: web3wallet.Web3Wallet) -> str:
         print("BPool.newSPool(). Begin.")
         f = self.contract.functions.newBPool()
-        (tx_hash, tx_receipt) = web3wallet.buildAndSendTx(f, from_wallet)
+        (tx_hash, tx_receipt) = web3wallet.buildAndSendTx(
+            f, from_wallet, wait=True) #need the receipt's logs
 
         # grab pool_address
         warnings.filterwarnings("ignore") #ignore unwarranted warning up next
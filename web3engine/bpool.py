@@ -1,5 +1,6 @@
 from enforce_typing import enforce_types
 import typing
+from web3.logs import DISCARD
 
 from web3tools import web3util, web3wallet
 from .btoken import BToken
@@ -352,6 +353,39 @@ class BPool(BToken):
             tokenOut_address, tokenAmountOut_base, maxPoolAmountIn_base)
         return web3wallet.buildAndSendTx(func, from_wallet)
         
+    #==== amounts from tx receipts. None if no receipt (see txpipeline)
+    def swapAmountsFromReceipt(self, tx_receipt) -> typing.Union[tuple, None]:
+        """(tokenAmountIn_base, tokenAmountOut_base) of a swap"""
+        if tx_receipt is None:
+            return None
+        events = self.contract.events.LOG_SWAP().processReceipt(
+            tx_receipt, errors=DISCARD)
+        if len(events) != 1:
+            return None
+        return (events[0].args.tokenAmountIn, events[0].args.tokenAmountOut)
+
+    def exitAmountFromReceipt(self, tx_receipt) -> typing.Union[int, None]:
+        """tokenAmountOut_base of an exit, e.g. exitswapPoolAmountIn"""
+        if tx_receipt is None:
+            return None
+        events = self.contract.events.LOG_EXIT().processReceipt(
+            tx_receipt, errors=DISCARD)
+        if len(events) != 1:
+            return None
+        return events[0].args.tokenAmountOut
+
+    def poolAmountOutFromReceipt(self, tx_receipt,
+                                 dst_address: str) -> typing.Union[int, None]:
+        """Pool shares sent to dst_address, e.g. by joinswapExternAmountIn"""
+        if tx_receipt is None:
+            return None
+        events = self.contract.events.Transfer().processReceipt(
+            tx_receipt, errors=DISCARD)
+        return sum(event.args.amt for event in events
+                   if event.address == self.address and
+                   event.args.src == self.address and
+                   event.args.dst == dst_address)
+
     #==== Balancer Pool as ERC20 
     def totalSupply_base(self) -> int:
         return self.f.totalSupply().call()
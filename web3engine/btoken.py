@@ -1,17 +1,20 @@
 from enforce_typing import enforce_types
 from web3tools import web3util, web3wallet
+from web3tools.contract_handler import ContractHandler
 
 @enforce_types
 class BToken:
     def __init__(self, contract_address):
         name = self.__class__.__name__
-        abi = web3util.abi(name)
-        web3 = web3util.get_web3()
-        self.contract = web3.eth.contract(contract_address, abi=abi)
+        self.contract = ContractHandler.get(name, contract_address)
         
     @property
     def address(self):
         return self.contract.address
+
+    def __reduce__(self):
+        #pickle by address; web3 contract objects aren't picklable
+        return (self.__class__, (self.address,))
         
     #============================================================
     #reflect BToken Solidity methods
@@ -25,6 +28,13 @@ class BToken:
         func = self.contract.functions.balanceOf(address)
         return func.call()
 
+    def balancesOf_base(self, addresses: list) -> list:
+        """balanceOf_base() of each address, in one round-trip"""
+        calls = [(self.address,
+                  self.contract.encodeABI(fn_name='balanceOf', args=[address]))
+                 for address in addresses]
+        return [int(result, 16) for result in web3util.batchCall(calls)]
+
     def transfer(self, dst_address: str, amt_base: int,
                  from_wallet: web3wallet.Web3Wallet):
         f = self.contract.functions.transfer(dst_address, amt_base)
@@ -2,13 +2,13 @@ from enforce_typing import enforce_types
 
 from web3engine.btoken import BToken
 from web3tools import web3util, web3wallet
+from web3tools.contract_handler import ContractHandler
 
 @enforce_types
 class Datatoken(BToken):
     def __init__(self, contract_address):
-        abi = web3util.abi('DataTokenTemplate')
-        web3 = web3util.get_web3()
-        self.contract = web3.eth.contract(contract_address, abi=abi)
+        self.contract = ContractHandler.get(
+            'DataTokenTemplate', contract_address)
     
     #============================================================
     #new methods for Datatoken
@@ -1,11 +1,40 @@
 from enforce_typing import enforce_types
+import typing
 import web3
 
-from util import constants
+from util import constants, settings
 from web3tools import web3util, web3wallet
-from web3engine import datatoken, dtfactory
+from web3engine import datatoken, dtfactory, ledgertoken
 
-_MINTERS = {} # symbol : _Minter
+#Where token balances live:
+# 'evm' -- on ganache, via web3 (needed for pools, DTs, etc)
+# 'ledger' -- in-memory python ledger (fast, for OCEAN-only netlists)
+BACKENDS = ['evm', 'ledger']
+_BACKEND = constants.TOKEN_BACKEND
+
+_MINTERS: dict = {} # (backend, symbol) : _Minter or _LedgerMinter
+
+@enforce_types
+def setBackend(backend: str):
+    assert backend in BACKENDS, f"unknown token backend '{backend}'"
+    global _BACKEND
+    _BACKEND = backend
+
+@enforce_types
+def backend() -> str:
+    return _BACKEND
+
+@enforce_types
+def getState() -> dict:
+    """For checkpointing: the backend, and the tokens minted so far"""
+    return {'backend': _BACKEND, 'minters': dict(_MINTERS)}
+
+@enforce_types
+def setState(state: dict):
+    """Restore what getState() returned"""
+    global _BACKEND, _MINTERS
+    setBackend(state['backend'])
+    _MINTERS = dict(state['minters'])
 
 @enforce_types
 def mintOCEAN(address:str, value_base:int):
@@ -15,31 +44,30 @@ def mintOCEAN(address:str, value_base:int):
 def OCEAN_address() -> str:
     return OCEANtoken().address
 
-_OCEAN_TOKEN = None
 @enforce_types
-def OCEANtoken() -> datatoken.Datatoken:
-    global _OCEAN_TOKEN
-    if _OCEAN_TOKEN is None:
-        _OCEAN_TOKEN = _minter('OCEAN').token()
-    return _OCEAN_TOKEN
+def OCEANtoken() -> typing.Union[datatoken.Datatoken, ledgertoken.LedgerToken]:
+    return _minter('OCEAN').token()
 
 #===================================================================
 @enforce_types
 def _minter(symbol:str):
     global _MINTERS
-    if symbol not in _MINTERS:
-        _MINTERS[symbol] = _Minter(symbol)
-    return _MINTERS[symbol]
+    key = (_BACKEND, symbol)
+    if key not in _MINTERS:
+        if _BACKEND == 'evm':
+            _MINTERS[key] = _Minter(symbol)
+        else:
+            _MINTERS[key] = _LedgerMinter(symbol)
+    return _MINTERS[key]
 
 @enforce_types
 class _Minter:
     def __init__(self, symbol:str):
         #A random wallet won't have ETH for gas fees. So, use
         # 'TEST_PRIVATE_KEY1' which got funds in ganache startup (see deploy.py)
-        network = web3util.get_network()
-        key1 = web3util.confFileValue(network, 'TEST_PRIVATE_KEY1')        
+        key1 = settings.get().networkValue('TEST_PRIVATE_KEY1')
         self._web3_wallet = web3wallet.Web3Wallet(key1)
-        
+
         factory = dtfactory.DTFactory()
         token_address = factory.createToken(
             '', symbol, symbol, constants.HUGEINT, self._web3_wallet)
@@ -51,3 +79,13 @@ class _Minter:
     def token(self) -> datatoken.Datatoken:
         return self._token
 
+@enforce_types
+class _LedgerMinter:
+    def __init__(self, symbol:str):
+        self._token = ledgertoken.LedgerToken(symbol, constants.HUGEINT)
+
+    def mint(self, address:str, value_base:int):
+        return self._token.mint(address, value_base)
+
+    def token(self) -> ledgertoken.LedgerToken:
+        return self._token
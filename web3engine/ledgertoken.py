@@ -0,0 +1,69 @@
+"""In-memory token ledger.
+
+Stands in for an EVM token (btoken.BToken / datatoken.Datatoken) in netlists
+that only move tokens between python agents. Balances are exact base-18 ints
+held in a dict, so mint / transfer / burn have the same semantics as on-chain,
+without any JSON-RPC round-trips.
+"""
+from enforce_typing import enforce_types
+import hashlib
+import typing
+
+from util import constants
+
+@enforce_types
+class LedgerToken:
+    def __init__(self, symbol: str, cap_base: int = constants.HUGEINT):
+        self._symbol = symbol
+        self._cap_base = cap_base
+        self._address = _ledgerAddress(symbol)
+
+        self._balances_base: typing.Dict[str, int] = {} # address : balance
+        self._total_supply_base = 0
+
+    @property
+    def address(self) -> str:
+        return self._address
+
+    #============================================================
+    #same signatures as the EVM token wrappers
+    def symbol(self) -> str:
+        return self._symbol
+
+    def decimals(self) -> int:
+        return 18
+
+    def totalSupply_base(self) -> int:
+        return self._total_supply_base
+
+    def balanceOf_base(self, address: str) -> int:
+        return self._balances_base.get(address, 0)
+
+    def balancesOf_base(self, addresses: list) -> list:
+        return [self._balances_base.get(address, 0) for address in addresses]
+
+    def transfer(self, dst_address: str, amt_base: int, from_wallet):
+        """Move tokens from from_wallet.address to dst_address.
+        Sending to constants.BURN_ADDRESS is a burn, like on-chain."""
+        src_address = from_wallet.address
+        assert amt_base >= 0
+        src_balance_base = self.balanceOf_base(src_address)
+        if amt_base > src_balance_base:
+            raise ValueError("transfer amt_base (%d) exceeds balance (%d)"
+                             % (amt_base, src_balance_base))
+        self._balances_base[src_address] = src_balance_base - amt_base
+        self._balances_base[dst_address] = \
+            self.balanceOf_base(dst_address) + amt_base
+
+    def mint(self, account: str, value_base: int, from_wallet=None):
+        assert value_base >= 0
+        if self._total_supply_base + value_base > self._cap_base:
+            raise ValueError("mint would exceed cap of %s" % self._symbol)
+        self._balances_base[account] = self.balanceOf_base(account) + value_base
+        self._total_supply_base += value_base
+
+@enforce_types
+def _ledgerAddress(symbol: str) -> str:
+    """Deterministic, EVM-shaped address for a ledger token"""
+    h = hashlib.sha256(('ledger:' + symbol).encode('utf-8')).hexdigest()
+    return '0x' + h[:40]
@@ -1,4 +1,6 @@
-from web3engine import globaltokens, datatoken
+import pytest
+
+from web3engine import globaltokens, datatoken, ledgertoken
 from web3tools import web3util, web3wallet
 
 def test_OCEAN():
@@ -13,3 +15,20 @@ def test_OCEAN():
     
     globaltokens.mintOCEAN(address=wallet.address, value_base=OCEAN_base) 
     assert OCEAN_token.balanceOf_base(wallet.address) == OCEAN_base * 2
+
+def test_ledgerBackend():
+    globaltokens.setBackend('ledger')
+    assert globaltokens.backend() == 'ledger'
+    wallet = web3wallet.randomWeb3Wallet()
+
+    OCEAN_base = web3util.toBase18(3.0)
+    globaltokens.mintOCEAN(address=wallet.address, value_base=OCEAN_base)
+    OCEAN_token = globaltokens.OCEANtoken()
+    assert isinstance(OCEAN_token, ledgertoken.LedgerToken)
+    assert OCEAN_token.symbol() == 'OCEAN'
+    assert OCEAN_token.balanceOf_base(wallet.address) == OCEAN_base
+    assert globaltokens.OCEAN_address() == OCEAN_token.address
+
+def test_badBackend():
+    with pytest.raises(AssertionError):
+        globaltokens.setBackend('foo')
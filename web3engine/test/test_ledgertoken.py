@@ -0,0 +1,50 @@
+import pytest
+
+from util.constants import BURN_ADDRESS
+from web3engine.ledgertoken import LedgerToken
+from web3tools import web3wallet
+from web3tools.web3util import toBase18
+
+def test_basics():
+    token = LedgerToken('TOK')
+    assert token.symbol() == 'TOK'
+    assert token.decimals() == 18
+    assert token.totalSupply_base() == 0
+    assert token.address.startswith('0x') and len(token.address) == 42
+    assert token.address == LedgerToken('TOK').address
+    assert token.address != LedgerToken('TOK2').address
+
+def test_mintAndTransfer():
+    token = LedgerToken('TOK')
+    alice = web3wallet.randomWeb3Wallet()
+    bob = web3wallet.randomWeb3Wallet()
+    assert token.balanceOf_base(alice.address) == 0
+
+    token.mint(alice.address, toBase18(10.0))
+    assert token.balanceOf_base(alice.address) == toBase18(10.0)
+    assert token.totalSupply_base() == toBase18(10.0)
+
+    token.transfer(bob.address, toBase18(3.0), alice)
+    assert token.balanceOf_base(alice.address) == toBase18(7.0)
+    assert token.balanceOf_base(bob.address) == toBase18(3.0)
+    assert token.balancesOf_base([bob.address, alice.address]) == \
+        [toBase18(3.0), toBase18(7.0)]
+    assert token.totalSupply_base() == toBase18(10.0)
+
+    with pytest.raises(ValueError):
+        token.transfer(alice.address, toBase18(3.1), bob)
+
+def test_burn():
+    token = LedgerToken('TOK')
+    alice = web3wallet.randomWeb3Wallet()
+    token.mint(alice.address, toBase18(2.0))
+    token.transfer(BURN_ADDRESS, toBase18(2.0), alice)
+    assert token.balanceOf_base(alice.address) == 0
+    assert token.balanceOf_base(BURN_ADDRESS) == toBase18(2.0)
+
+def test_cap():
+    token = LedgerToken('TOK', cap_base=toBase18(5.0))
+    alice = web3wallet.randomWeb3Wallet()
+    token.mint(alice.address, toBase18(5.0))
+    with pytest.raises(ValueError):
+        token.mint(alice.address, 1)
@@ -0,0 +1,121 @@
+#AgentWallet caches OCEAN, DT & BPT balances, writing through the deltas
+# it reads from tx receipts (see BPool.*FromReceipt). Check those cached
+# balances against the chain's, after each kind of pool trade.
+
+from engine.AgentWallet import AgentWallet
+from web3engine import bfactory, bpool, datatoken, dtfactory, globaltokens
+from web3tools import web3util
+from web3tools.web3util import toBase18
+
+def test_cacheMatchesChain():
+    w = _agentWallet()
+    DT = _createDT(w)
+    pool = _createPool(w, DT)
+    _primeCache(w, DT, pool)
+    _assertCacheMatchesChain(w, DT, pool)
+
+    w.buyDT(pool, DT, DT_buy_amt=1.0, max_OCEAN_allow=100.0)
+    _assertCacheMatchesChain(w, DT, pool)
+
+    w.sellDT(pool, DT, DT_sell_amt=2.0)
+    _assertCacheMatchesChain(w, DT, pool)
+
+    w.stakeOCEAN(OCEAN_stake=10.0, pool=pool)
+    _assertCacheMatchesChain(w, DT, pool)
+
+    w.unstakeOCEAN(BPT_unstake=1.0, pool=pool)
+    _assertCacheMatchesChain(w, DT, pool)
+
+def test_receiptHelpers():
+    w = _agentWallet()
+    DT = _createDT(w)
+    pool = _createPool(w, DT)
+    OCEAN = globaltokens.OCEANtoken()
+    web3_w = w._web3wallet
+    OCEAN.approve(pool.address, toBase18(100.0), from_wallet=web3_w)
+
+    #swap
+    OCEAN_before = OCEAN.balanceOf_base(w._address)
+    DT_before = DT.balanceOf_base(w._address)
+    (_, tx_receipt) = pool.swapExactAmountIn(
+        tokenIn_address=OCEAN.address,
+        tokenAmountIn_base=toBase18(5.0),
+        tokenOut_address=DT.address,
+        minAmountOut_base=0,
+        maxPrice_base=2 ** 255,
+        from_wallet=web3_w)
+    (amt_in_base, amt_out_base) = pool.swapAmountsFromReceipt(tx_receipt)
+    assert amt_in_base == toBase18(5.0)
+    assert amt_in_base == OCEAN_before - OCEAN.balanceOf_base(w._address)
+    assert amt_out_base == DT.balanceOf_base(w._address) - DT_before
+    assert pool.exitAmountFromReceipt(tx_receipt) is None #not an exit
+
+    #join
+    BPT_before = pool.balanceOf_base(w._address)
+    (_, tx_receipt) = pool.joinswapExternAmountIn(
+        tokenIn_address=OCEAN.address,
+        tokenAmountIn_base=toBase18(10.0),
+        minPoolAmountOut_base=0,
+        from_wallet=web3_w)
+    BPT_out_base = pool.poolAmountOutFromReceipt(tx_receipt, w._address)
+    assert BPT_out_base > 0
+    assert BPT_out_base == pool.balanceOf_base(w._address) - BPT_before
+    assert pool.swapAmountsFromReceipt(tx_receipt) is None #not a swap
+
+    #exit
+    OCEAN_before = OCEAN.balanceOf_base(w._address)
+    (_, tx_receipt) = pool.exitswapPoolAmountIn(
+        tokenOut_address=OCEAN.address,
+        poolAmountIn_base=toBase18(1.0),
+        minAmountOut_base=0,
+        from_wallet=web3_w)
+    OCEAN_out_base = pool.exitAmountFromReceipt(tx_receipt)
+    assert OCEAN_out_base == OCEAN.balanceOf_base(w._address) - OCEAN_before
+    assert pool.poolAmountOutFromReceipt(tx_receipt, w._address) == 0
+
+    #no receipt, e.g. a tx that wasn't waited on
+    assert pool.swapAmountsFromReceipt(None) is None
+    assert pool.exitAmountFromReceipt(None) is None
+    assert pool.poolAmountOutFromReceipt(None, w._address) is None
+
+def _primeCache(w, DT, pool):
+    w._OCEAN_base()
+    w._DT_base(DT)
+    w._BPT_base(pool)
+
+def _assertCacheMatchesChain(w, DT, pool):
+    #still cached, ie each delta was known rather than reset to re-read
+    assert w._cached_OCEAN_base is not None
+    assert w._tokenIsCached(DT.address)
+    assert w._tokenIsCached(pool.address)
+
+    assert w._OCEAN_base() == \
+        globaltokens.OCEANtoken().balanceOf_base(w._address)
+    assert w._DT_base(DT) == DT.balanceOf_base(w._address)
+    assert w._BPT_base(pool) == pool.balanceOf_base(w._address)
+
+def _agentWallet() -> AgentWallet:
+    network = web3util.get_network()
+    private_key = web3util.confFileValue(network, 'TEST_PRIVATE_KEY1')
+    return AgentWallet(OCEAN=1000.0, private_key=private_key)
+
+def _createDT(w: AgentWallet) -> datatoken.Datatoken:
+    web3_w = w._web3wallet
+    DT_address = dtfactory.DTFactory().createToken(
+        'foo', 'DT1', 'DT1', toBase18(100.0), from_wallet=web3_w)
+    DT = datatoken.Datatoken(DT_address)
+    DT.mint(web3_w.address, toBase18(100.0), from_wallet=web3_w)
+    return DT
+
+def _createPool(w: AgentWallet, DT: datatoken.Datatoken) -> bpool.BPool:
+    web3_w = w._web3wallet
+    OCEAN = globaltokens.OCEANtoken()
+    pool = bpool.BPool(bfactory.BFactory().newBPool(from_wallet=web3_w))
+
+    DT.approve(pool.address, toBase18(20.0), from_wallet=web3_w)
+    OCEAN.approve(pool.address, toBase18(200.0), from_wallet=web3_w)
+    pool.bind(DT.address, toBase18(20.0), toBase18(3.0), from_wallet=web3_w)
+    pool.bind(OCEAN.address, toBase18(200.0), toBase18(7.0),
+              from_wallet=web3_w)
+    pool.finalize(from_wallet=web3_w)
+    return pool
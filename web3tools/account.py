@@ -14,8 +14,9 @@ logger = logging.getLogger('account')
 
 class Account:
     
-    def __init__(self, private_key:str):
+    def __init__(self, private_key:str, address=None):
         self._private_key = private_key
+        self._address = address #derived when first needed
 
     @property
     def private_key(self):
@@ -23,7 +24,9 @@ class Account:
 
     @property
     def address(self):
-        return privateKeyToAddress(self._private_key)
+        if self._address is None:
+            self._address = privateKeyToAddress(self._private_key)
+        return self._address
     
     def keysStr(self):
         s = []
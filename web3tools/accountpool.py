@@ -0,0 +1,138 @@
+"""Pool of pre-derived accounts for agent wallets.
+
+A random key costs an elliptic-curve multiply to get its address, for
+every new agent. Instead, with a pool set (SimStrategy.setAccountPool),
+new wallets take the next account of a deterministic sequence:
+  key i = keccak256(keccak256(seed) || i)
+So runs with the same seed get the same addresses, in the same order.
+
+Keys and addresses are derived once, and appended to the pool's file.
+Later runs with the same seed & file just read them. To precompute:
+  tsp accounts SEED N FILENAME
+
+The file holds private keys in the clear: use it for test chains only.
+And on a chain that persists between runs (e.g. one ganache), each run
+needs its own seed: pooled addresses keep balances from earlier runs.
+"""
+import logging
+log = logging.getLogger('accountpool')
+
+from enforce_typing import enforce_types
+import os
+import threading
+import typing
+
+import eth_keys
+from eth_utils import keccak
+
+HEADER = '#tokenspice accounts v1 seed_hash='
+SECP256K1_N = \
+    0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+_POOL = None #the AccountPool that new wallets draw from, if any
+
+@enforce_types
+def deriveKey(seed: str, index: int) -> str:
+    """Private key #index of seed's sequence, as a hex str"""
+    key = keccak(keccak(text=seed) + index.to_bytes(32, 'big'))
+    while not 0 < int.from_bytes(key, 'big') < SECP256K1_N: #~never
+        key = keccak(key)
+    return '0x' + key.hex()
+
+@enforce_types
+def keyToAddress(private_key: str) -> str:
+    key = eth_keys.keys.PrivateKey(bytes.fromhex(private_key[2:]))
+    return key.public_key.to_checksum_address()
+
+class AccountPool:
+    """Hands out seed's accounts in order: (private_key, address)"""
+    @enforce_types
+    def __init__(self, seed: str, filename: typing.Union[str, None] = None):
+        self.seed = seed
+        self.filename = filename
+        self._accounts: list = [] #[(private_key, address)], by index
+        self._next = 0 #index of the next account to hand out
+        self._lock = threading.Lock() #agents may step in threads
+        if filename is not None and os.path.exists(filename):
+            self._load()
+
+    def _header(self) -> str:
+        return HEADER + keccak(text=self.seed).hex()[:16]
+
+    def _load(self) -> None:
+        with open(self.filename) as f:
+            if f.readline().strip() != self._header():
+                raise ValueError(
+                    f"'{self.filename}' holds accounts of another seed")
+            for line in f:
+                private_key, address = line.strip().split(',')
+                self._accounts.append((private_key, address))
+        log.debug("Loaded %d accounts from %s",
+                  len(self._accounts), self.filename)
+
+    def numDerived(self) -> int:
+        return len(self._accounts)
+
+    def numUsed(self) -> int:
+        return self._next
+
+    def precompute(self, n: int) -> None:
+        """Derive accounts up to n in total, saving new ones to the file"""
+        with self._lock:
+            self._extend(n)
+
+    def _extend(self, n: int) -> None:
+        """Hold _lock"""
+        new_accounts = []
+        for index in range(len(self._accounts), n):
+            private_key = deriveKey(self.seed, index)
+            new_accounts.append((private_key, keyToAddress(private_key)))
+        if not new_accounts:
+            return
+        self._accounts += new_accounts
+        if self.filename is not None:
+            is_new = not os.path.exists(self.filename)
+            with open(self.filename, 'a') as f:
+                if is_new:
+                    f.write(self._header() + '\n')
+                f.writelines(f"{private_key},{address}\n"
+                             for private_key, address in new_accounts)
+
+    def nextAccount(self) -> tuple:
+        """(private_key, address) of the next unused account"""
+        with self._lock:
+            if self._next == len(self._accounts):
+                self._extend(self._next + 1)
+            account = self._accounts[self._next]
+            self._next += 1
+            return account
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        del state['_lock']
+        if self.filename is not None: #reload rather than pickle them
+            state['_accounts'] = []
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        if self.filename is not None and os.path.exists(self.filename):
+            self._load()
+
+#=======================================================================
+#the active pool
+def setPool(pool: typing.Union[AccountPool, None]) -> None:
+    global _POOL
+    _POOL = pool
+
+def pool() -> typing.Union[AccountPool, None]:
+    return _POOL
+
+def getState() -> typing.Union[AccountPool, None]:
+    """For checkpointing: the pool, and how far it got"""
+    return _POOL
+
+def setState(state: typing.Union[AccountPool, None]) -> None:
+    """Restore what getState() returned"""
+    setPool(state)
@@ -5,20 +5,25 @@ from typing import Dict
 from web3 import Web3
 from web3.contract import ConciseContract
 
-##uncomment when we want proper support. See github.com/oceanprotocol/ocean.py
-#from ocean_lib.web3_internal.web3_provider import Web3Provider
+from util import settings
+from web3tools import web3util
 
 class ContractHandler(object):
     """
-    Manages loading contracts and also keeps a cache of loaded contracts.
+    Makes contract objects, and caches them and their parsed ABIs.
+    So each artifact file is parsed once per process, and each
+    (name, address) gets one web3 contract object.
 
     Example:
-        contract = ContractHandler.get('DTFactory')
+        contract = ContractHandler.get('DTFactory') #address from address.json
+        contract = ContractHandler.get('BToken', token_address)
         concise_contract = ContractHandler.get_concise_contract('DTFactory')
 
     """
-    _contracts: Dict[str, str] = dict()
-    artifacts_path = None
+    _contracts: Dict[tuple, object] = dict() # (name, address) : Contract
+    _defaults: Dict[str, object] = dict() # name : Contract at address.json's address
+    _abis: Dict[str, list] = dict() # artifact filename : abi
+    artifacts_path = None #None means settings' ARTIFACTS_PATH
 
     @staticmethod
     def get_contracts_addresses(network:str, address_file:str):
@@ -30,13 +35,36 @@ class ContractHandler(object):
     def set_artifacts_path(artifacts_path):
         if artifacts_path and artifacts_path != ContractHandler.artifacts_path:
             ContractHandler.artifacts_path = artifacts_path
-            ContractHandler._contracts.clear()
+            ContractHandler.clear()
+
+    @staticmethod
+    def clear():
+        """Forget all contracts and ABIs, e.g. after a redeploy"""
+        ContractHandler._contracts.clear()
+        ContractHandler._defaults.clear()
+        ContractHandler._abis.clear()
+
+    @staticmethod
+    def abi(name):
+        """The parsed ABI of contract `name`, e.g. 'BPool'. Cached"""
+        base_path = ContractHandler.artifacts_path or \
+            settings.get().artifacts_path
+        filename = os.path.abspath(os.path.join(base_path, name + '.json'))
+        abi = ContractHandler._abis.get(filename)
+        if abi is None:
+            with open(filename, 'r') as f:
+                abi = json.loads(f.read())['abi']
+            ContractHandler._abis[filename] = abi
+        return abi
 
     @staticmethod
     def _get(name, address=None):
         if address:
-            return ContractHandler._contracts.get((name, address)) or ContractHandler._load(name, address)
-        return ContractHandler._contracts.get(name) or ContractHandler._load(name, address)
+            address = Web3.toChecksumAddress(address) #one key per contract
+            contract = ContractHandler._contracts.get((name, address))
+        else:
+            contract = ContractHandler._defaults.get(name)
+        return contract or ContractHandler._load(name, address)
 
     @staticmethod
     def get(name, address=None):
@@ -44,10 +72,11 @@ class ContractHandler(object):
         Return the Contract instance for a given name.
 
         :param name: Contract name, str
-        :param address: hex str -- address of smart contract
+        :param address: hex str -- address of smart contract. If None,
+          use the address for `name` in the artifacts' address.json
         :return: Contract instance
         """
-        return ContractHandler._get(name, address)[0]
+        return ContractHandler._get(name, address)
 
     @staticmethod
     def get_concise_contract(name, address=None):
@@ -58,12 +87,11 @@ class ContractHandler(object):
         :param address: hex str -- address of smart contract
         :return: Concise Contract instance
         """
-        return ContractHandler._get(name, address)[1]
+        return ConciseContract(ContractHandler._get(name, address))
 
     @staticmethod
     def _set(name, contract):
-        ContractHandler._contracts[(name, contract.address)] = (contract, ConciseContract(contract))
-        ContractHandler._contracts[name] = ContractHandler._contracts[(name, contract.address)]
+        ContractHandler._contracts[(name, contract.address)] = contract
 
     @staticmethod
     def set(name, contract):
@@ -74,6 +102,7 @@ class ContractHandler(object):
         :param contract: Contract instance
         """
         ContractHandler._set(name, contract)
+        ContractHandler._defaults[name] = contract
 
     @staticmethod
     def has(name, address=None):
@@ -85,33 +114,27 @@ class ContractHandler(object):
         :return: True if the contract is there, bool
         """
         if address:
+            address = Web3.toChecksumAddress(address)
             return (name, address) in ContractHandler._contracts
-        return name in ContractHandler._contracts
-
-    ##uncomment when we want proper support. See github.com/oceanprotocol/ocean.py
-    # @staticmethod
-    # def _load(contract_name, address=None):
-    #     """Retrieve the contract instance for `contract_name` that represent the smart
-    #     contract in the ethereum network.
-
-    #     :param contract_name: str name of the solidity smart contract.
-    #     :param address: hex str -- address of smart contract
-    #     :return: web3.eth.Contract instance
-    #     """
-    #     assert ContractHandler.artifacts_path is not None, 'artifacts_path should be already set.'
-    #     contract_definition = ContractHandler.read_abi_from_file(
-    #         contract_name, ContractHandler.artifacts_path)
-
-    #     if not address and 'address' in contract_definition:
-    #         address = contract_definition.get('address')
-    #         assert address, 'Cannot find contract address in the abi file.'
-    #         address = Web3.toChecksumAddress(address)
-
-    #     abi = contract_definition['abi']
-    #     bytecode = contract_definition['bytecode']
-    #     contract = Web3Provider.get_web3().eth.contract(address=address, abi=abi, bytecode=bytecode)
-    #     ContractHandler._set(contract_name, contract)
-    #     return ContractHandler._contracts[(contract_name, address)]
+        return name in ContractHandler._defaults
+
+    @staticmethod
+    def _load(name, address=None):
+        """Make & cache the web3 contract object for `name` at `address`
+
+        :param name: str name of the solidity smart contract.
+        :param address: hex str -- address of smart contract
+        :return: web3.eth.Contract instance
+        """
+        abi = ContractHandler.abi(name)
+        is_default = not address
+        if is_default:
+            address = web3util.contractAddress(name)
+        contract = web3util.get_web3().eth.contract(address, abi=abi)
+        ContractHandler._set(name, contract)
+        if is_default:
+            ContractHandler._defaults[name] = contract
+        return contract
 
     @staticmethod
     def read_abi_from_file(contract_name, abi_path):
@@ -0,0 +1,67 @@
+"""Tx nonces, counted locally per address.
+
+Asking the node for get_transaction_count before every tx costs an RPC.
+And when txs aren't waited on (see txpipeline.py), the node's count can
+lag behind what's been sent. So the NonceManager asks the node once per
+address (counting its pending txs), then counts up locally.
+
+If the local count goes wrong (e.g. another process sent from the same
+address), the node rejects the tx for its nonce. buildAndSendTx() then
+calls resync() and retries once. After reverting the chain (e.g. resuming
+from a checkpoint), call reset().
+
+Thread-safe. There's one per process: NONCES.
+"""
+import threading
+
+from web3tools import web3util
+
+#substrings of node errors for a wrong nonce: geth & co, then ganache
+NONCE_ERRORS = ['nonce too low', "doesn't have the correct nonce"]
+
+class NonceManager:
+    def __init__(self, fetch=None):
+        """:param: fetch -- function(address) -> next nonce per the node.
+        Default: get_transaction_count, including pending txs"""
+        self._fetch = fetch or _fetchNonce
+        self._next: dict = {} #address : next nonce to hand out
+        self._lock = threading.Lock()
+
+    def nextNonce(self, address: str) -> int:
+        """Nonce for the next tx from address. Asks the node only if
+        this address has no local count"""
+        if address not in self._next:
+            fetched = self._fetch(address) #outside the lock: it's an RPC
+            with self._lock:
+                self._next.setdefault(address, fetched)
+        with self._lock:
+            nonce = self._next[address]
+            self._next[address] = nonce + 1
+            return nonce
+
+    def release(self, address: str, nonce: int) -> None:
+        """The tx with this nonce wasn't sent. Reuse the nonce if no later
+        one was handed out; else resync, since there's now a gap"""
+        with self._lock:
+            if self._next.get(address) == nonce + 1:
+                self._next[address] = nonce
+            else:
+                self._next.pop(address, None)
+
+    def resync(self, address: str) -> None:
+        """Drop the local count, so the next nonce comes from the node"""
+        with self._lock:
+            self._next.pop(address, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._next = {}
+
+def isNonceError(e: Exception) -> bool:
+    s = str(e)
+    return any(substr in s for substr in NONCE_ERRORS)
+
+def _fetchNonce(address: str) -> int:
+    return web3util.get_web3().eth.get_transaction_count(address, 'pending')
+
+NONCES = NonceManager()
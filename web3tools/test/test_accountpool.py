@@ -0,0 +1,52 @@
+import os
+import pickle
+import pytest
+
+from web3tools import account, accountpool, web3wallet
+
+def test_deterministic():
+    key = accountpool.deriveKey('seed1', 0)
+    assert key == accountpool.deriveKey('seed1', 0)
+    assert key != accountpool.deriveKey('seed1', 1)
+    assert key != accountpool.deriveKey('seed2', 0)
+    assert accountpool.keyToAddress(key) == account.privateKeyToAddress(key)
+
+    pool1 = accountpool.AccountPool('seed1')
+    pool2 = accountpool.AccountPool('seed1')
+    accounts = [pool1.nextAccount() for i in range(3)]
+    assert accounts == [pool2.nextAccount() for i in range(3)]
+    assert len(set(address for _, address in accounts)) == 3
+    assert pool1.numUsed() == 3
+
+def test_file(tmp_path):
+    filename = os.path.join(str(tmp_path), 'accounts.txt')
+    pool = accountpool.AccountPool('seed1', filename)
+    pool.precompute(4)
+    first = pool.nextAccount()
+
+    pool = accountpool.AccountPool('seed1', filename) #loads, no deriving
+    assert pool.numDerived() == 4
+    assert pool.nextAccount() == first
+    for i in range(4):
+        pool.nextAccount() #the 5th is derived, and saved
+    assert accountpool.AccountPool('seed1', filename).numDerived() == 5
+
+    pool = pickle.loads(pickle.dumps(pool))
+    assert pool.numUsed() == 5 and pool.numDerived() == 5
+
+    with pytest.raises(ValueError):
+        accountpool.AccountPool('seed2', filename)
+
+def test_newWeb3Wallet():
+    accountpool.setPool(accountpool.AccountPool('seed1'))
+    try:
+        wallet = web3wallet.newWeb3Wallet()
+        private_key, address = accountpool.AccountPool('seed1').nextAccount()
+        assert wallet.address == address
+        assert wallet.private_key == private_key
+        assert wallet.signer_key.public_key.to_checksum_address() == address
+        wallet = pickle.loads(pickle.dumps(wallet)) #drops the signer key
+        assert wallet.validate()
+    finally:
+        accountpool.setPool(None)
+    assert web3wallet.newWeb3Wallet().address != address
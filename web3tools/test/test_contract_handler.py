@@ -0,0 +1,39 @@
+import json
+import os
+
+from util import settings
+from web3tools.contract_handler import ContractHandler
+
+ABI = [{'type': 'function', 'name': 'symbol', 'inputs': [],
+        'outputs': [{'name': '', 'type': 'string'}],
+        'stateMutability': 'view'}]
+ADDRESS1 = '0x66aB6D9362d4F35596279692F0251Db635165871'
+ADDRESS2 = '0x33A4622B82D4c04a53e170c638B944ce27cffce3'
+
+def test_cache(tmp_path):
+    artifacts_path = str(tmp_path)
+    abi_filename = os.path.join(artifacts_path, 'Foo.json')
+    with open(abi_filename, 'w') as f:
+        json.dump({'abi': ABI}, f)
+    with open(os.path.join(artifacts_path, 'address.json'), 'w') as f:
+        json.dump({'development': {'Foo': ADDRESS2}}, f)
+
+    ContractHandler.clear()
+    with settings.overridden({'general': {'ARTIFACTS_PATH': artifacts_path,
+                                          'NETWORK': 'ganache'}}):
+        contract = ContractHandler.get('Foo', ADDRESS1)
+        assert contract.address == ADDRESS1
+        assert ContractHandler.has('Foo', ADDRESS1)
+        assert not ContractHandler.has('Foo')
+
+        os.remove(abi_filename) #from now on, only the cache has it
+        assert ContractHandler.get('Foo', ADDRESS1) is contract
+        assert ContractHandler.get('Foo', ADDRESS1.lower()) is contract
+        assert ContractHandler.has('Foo', ADDRESS1.lower())
+        assert ContractHandler.abi('Foo') == ABI
+
+        default = ContractHandler.get('Foo') #address from address.json
+        assert default.address == ADDRESS2
+        assert ContractHandler.get('Foo') is default
+        assert ContractHandler.get('Foo', ADDRESS2) is default
+    ContractHandler.clear()
@@ -0,0 +1,68 @@
+import threading
+import types
+import pytest
+
+from web3tools import noncemanager, web3util, web3wallet
+from web3tools.noncemanager import NonceManager
+
+def test_nextNonce():
+    fetches = []
+    def fetch(address):
+        fetches.append(address)
+        return 5
+    nonces = NonceManager(fetch)
+    assert [nonces.nextNonce("0xA") for i in range(3)] == [5, 6, 7]
+    assert nonces.nextNonce("0xB") == 5
+    assert fetches == ["0xA", "0xB"] #once per address
+
+    nonces.release("0xA", 7) #last one: reuse it
+    assert nonces.nextNonce("0xA") == 7
+    nonces.release("0xA", 6) #gap: resync
+    assert nonces.nextNonce("0xA") == 5 and len(fetches) == 3
+
+    nonces.reset()
+    assert nonces.nextNonce("0xB") == 5 and len(fetches) == 4
+
+def test_threads():
+    nonces = NonceManager(lambda address: 0)
+    got = []
+    def send():
+        for i in range(100):
+            got.append(nonces.nextNonce("0xA"))
+    threads = [threading.Thread(target=send) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(got) == list(range(400))
+
+def test_resyncOnNonceError(monkeypatch):
+    node_nonce = {'n': 3}
+    sent = []
+    def send_raw_transaction(raw_tx):
+        nonce = raw_tx['nonce']
+        if nonce != node_nonce['n']:
+            raise ValueError(f"the tx doesn't have the correct nonce."
+                             f" account has nonce of: {node_nonce['n']}")
+        node_nonce['n'] += 1
+        sent.append(nonce)
+        return b'\x01'
+    eth = types.SimpleNamespace(
+        account=types.SimpleNamespace(
+            sign_transaction=lambda tx, private_key:
+                types.SimpleNamespace(rawTransaction=tx)),
+        send_raw_transaction=send_raw_transaction,
+        wait_for_transaction_receipt=lambda tx_hash: {'status': 1})
+    monkeypatch.setattr(web3util, 'get_web3',
+                        lambda: types.SimpleNamespace(eth=eth))
+    nonces = NonceManager(lambda address: node_nonce['n'])
+    monkeypatch.setattr(web3wallet, 'NONCES', nonces)
+
+    wallet = web3wallet.randomWeb3Wallet()
+    to_address = web3wallet.randomWeb3Wallet().address
+    wallet.sendEth(to_address, 1)
+    wallet.sendEth(to_address, 1)
+    node_nonce['n'] += 2 #another process sent 2 txs
+    wallet.sendEth(to_address, 1) #nonce error, resync, retry
+    assert sent == [3, 4, 7]
+    assert noncemanager.isNonceError(ValueError("nonce too low"))
@@ -0,0 +1,61 @@
+import pytest
+
+from web3tools import txpipeline
+
+def test_pending():
+    txpipeline.reset()
+    assert txpipeline.settle() == 0
+
+    txpipeline.setOrigin("agent1")
+    txpipeline.addPending(b'\x01', "0xA")
+    txpipeline.setOrigin("agent2")
+    txpipeline.addPending(b'\x02', "0xB")
+    assert txpipeline.numPending() == 2
+
+    txpipeline.reset()
+    assert txpipeline.numPending() == 0
+    txpipeline.setOrigin(None)
+
+def test_settle(monkeypatch):
+    txpipeline.reset()
+    statuses = {b'\x01': 1, b'\x02': 0, b'\x03': 0}
+    async def _receipts(tx_hashes):
+        return [{'status': statuses[tx_hash]} for tx_hash in tx_hashes]
+    monkeypatch.setattr(txpipeline, '_receipts', _receipts)
+
+    txpipeline.setOrigin("agent1")
+    txpipeline.addPending(b'\x01', "0xA")
+    assert txpipeline.settle() == 1
+    assert txpipeline.numPending() == 0
+
+    #first failure, in send order, names its agent
+    for tx_hash in [b'\x01', b'\x02']:
+        txpipeline.addPending(tx_hash, "0xA")
+    txpipeline.setOrigin("agent3")
+    txpipeline.addPending(b'\x03', "0xC")
+    with pytest.raises(txpipeline.TxFailed) as e:
+        txpipeline.settle()
+    assert e.value.origin == "agent1" and e.value.tx_hash == b'\x02'
+    assert "agent1" in str(e.value)
+    assert txpipeline.numPending() == 0
+    txpipeline.setOrigin(None)
+
+def test_batch(monkeypatch):
+    txpipeline.reset()
+    async def _receipts(tx_hashes):
+        return [{'status': 1} for tx_hash in tx_hashes]
+    monkeypatch.setattr(txpipeline, '_receipts', _receipts)
+
+    with txpipeline.batch():
+        assert txpipeline.ENABLED
+        txpipeline.addPending(b'\x01', "0xA")
+    assert not txpipeline.ENABLED
+    assert txpipeline.numPending() == 0 #settled
+
+    #inside an enabled pipeline, leave settling to it
+    txpipeline.setEnabled(True)
+    with txpipeline.batch():
+        txpipeline.addPending(b'\x02', "0xA")
+    assert txpipeline.ENABLED and txpipeline.numPending() == 1
+    txpipeline.setEnabled(False)
+    txpipeline.reset()
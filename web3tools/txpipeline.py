@@ -0,0 +1,99 @@
+"""Pipelined EVM transactions, settled once per tick.
+
+By default, buildAndSendTx() sends each tx then blocks on its receipt.
+When the pipeline is enabled (SimStrategy.setTxPipeline), it instead
+sends and returns without the receipt. (Nonces are counted locally, so
+back-to-back txs from one address don't wait on each other. See
+noncemanager.py.) The tx is recorded as pending, tagged with the agent that was
+stepping. At the end of each tick, SimEngine calls settle(): it awaits
+all pending receipts concurrently with asyncio, and raises TxFailed
+naming the agent if any tx reverted.
+
+Txs are still sent in program order, so results stay deterministic. And
+ganache mines each tx as it arrives, so reads later in the tick see it.
+Callers that need the receipt right away, e.g. to get a new contract's
+address from its logs, pass wait=True to buildAndSendTx().
+
+Outside a pipelined run, `with batch():` pipelines just the txs sent in
+its block, e.g. to fund many new wallets at once.
+"""
+import asyncio
+import contextlib
+import threading
+import typing
+
+from util import timing
+from web3tools import web3util
+
+RECEIPT_TIMEOUT = 120 #seconds
+
+ENABLED = False
+_pending: list = [] #[(tx_hash, from_address, origin)], in send order
+_origin = threading.local() #name of agent whose step sends txs
+_LOOP = None #event loop for settle()
+
+class TxFailed(Exception):
+    def __init__(self, origin, tx_hash, receipt):
+        self.origin = origin
+        self.tx_hash = tx_hash
+        self.receipt = receipt
+        super().__init__(f"tx {tx_hash.hex()} from agent '{origin}' failed."
+                         f" tx_receipt: {receipt}")
+
+def setEnabled(enabled: bool):
+    global ENABLED
+    ENABLED = enabled
+
+def setOrigin(name: typing.Union[str, None]):
+    """SimStateBase calls this before each agent step"""
+    _origin.name = name
+
+def addPending(tx_hash, from_address: str):
+    _pending.append((tx_hash, from_address, getattr(_origin, 'name', None)))
+
+def numPending() -> int:
+    return len(_pending)
+
+def reset():
+    """Forget pending txs, e.g. after a failed run"""
+    global _pending
+    _pending = []
+
+@contextlib.contextmanager
+def batch():
+    """Pipeline the txs sent in this block, then settle them on exit.
+    If the pipeline is already enabled, leave them to its settle()"""
+    global ENABLED
+    if ENABLED:
+        yield
+        return
+    ENABLED = True
+    try:
+        yield
+        settle()
+    finally:
+        ENABLED = False
+        reset()
+
+@timing.timed('evm', 'settle')
+def settle() -> int:
+    """Wait for the receipts of all pending txs. Raise TxFailed for the
+    first one that failed, in send order. Returns # txs settled."""
+    global _pending, _LOOP
+    pending, _pending = _pending, []
+    if not pending:
+        return 0
+    if _LOOP is None:
+        _LOOP = asyncio.new_event_loop()
+    receipts = _LOOP.run_until_complete(
+        _receipts([tx_hash for tx_hash, _, _ in pending]))
+    for (tx_hash, _, origin), receipt in zip(pending, receipts):
+        if receipt['status'] == 0:
+            raise TxFailed(origin, tx_hash, receipt)
+    return len(pending)
+
+async def _receipts(tx_hashes: list) -> list:
+    web3 = web3util.get_async_web3()
+    return await asyncio.gather(*[
+        web3.eth.wait_for_transaction_receipt(tx_hash, RECEIPT_TIMEOUT)
+        for tx_hash in tx_hashes])
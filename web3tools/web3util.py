@@ -1,11 +1,9 @@
-import configparser
-
 import eth_account
 import json
 import os
 import typing
 from web3 import Web3
-from util import constants
+from util import settings, timing
 from web3tools.account import privateKeyToAddress
 
 def get_infura_url(infura_id):
@@ -17,14 +15,51 @@ def get_web3():
     global _WEB3
     if _WEB3 is None:
         _WEB3 = Web3(get_web3_provider())
+        _WEB3.middleware_onion.add(timing.web3Middleware, 'timing')
     return _WEB3
 
+_ASYNC_WEB3 = None
+def get_async_web3():
+    """Asyncio web3, for awaiting many receipts at once. See txpipeline"""
+    global _ASYNC_WEB3
+    if _ASYNC_WEB3 is None:
+        from web3 import AsyncHTTPProvider
+        from web3.eth import AsyncEth
+        assert get_network() == 'ganache', 'current implementation is ganache-only'
+        url = settings.get().ganache_url
+        _ASYNC_WEB3 = Web3(AsyncHTTPProvider(url),
+                           modules={'eth': (AsyncEth,)}, middlewares=[])
+    return _ASYNC_WEB3
+
 def get_web3_provider():
     assert get_network() == 'ganache', 'current implementation is ganache-only'
-    url = confFileValue('general', 'GANACHE_URL')
+    url = settings.get().ganache_url
     provider = Web3.HTTPProvider(url)
     return provider
 
+def batchCall(calls: list) -> list:
+    """Do many eth_calls in one JSON-RPC batch request, i.e. one
+    round-trip. calls: [(to_address, data)]. Returns [result hex str]"""
+    if not calls:
+        return []
+    import requests
+    payload = [{'jsonrpc': '2.0', 'id': i, 'method': 'eth_call',
+                'params': [{'to': to_address, 'data': data}, 'latest']}
+               for i, (to_address, data) in enumerate(calls)]
+    t0 = timing.now()
+    try:
+        response = requests.post(get_web3_provider().endpoint_uri,
+                                 json=payload, timeout=60)
+        response.raise_for_status()
+    finally:
+        timing.add('rpc', 'batch:eth_call', timing.now() - t0)
+    results = {r['id']: r for r in response.json()}
+    for i in range(len(calls)):
+        if 'error' in results[i]:
+            raise ValueError(f"eth_call to {calls[i][0]} failed:"
+                             f" {results[i]['error']}")
+    return [results[i]['result'] for i in range(len(calls))]
+
 def toBase18(amt: float) -> int:
     return toBase(amt, 18)
 
@@ -49,7 +84,7 @@ def abi(class_name: str):
 
 def abiFilename(class_name: str) -> str:
     """Given e.g. 'DTFactory', returns './web3engine/DTFactory.json' """
-    base_path = confFileValue('general', 'ARTIFACTS_PATH')
+    base_path = settings.get().artifacts_path
     path = os.path.join(base_path, class_name) + '.json'
     abspath = os.path.abspath(path)
     return abspath
@@ -71,14 +106,12 @@ def contractAddresses():
     return addresses[network]
 
 def contractAddressesFilename():
-    base_path = confFileValue('general', 'ARTIFACTS_PATH')
+    base_path = settings.get().artifacts_path
     return os.path.join(base_path, 'address.json')
 
 def get_network():
-    return confFileValue('general', 'NETWORK')
+    return settings.get().network
 
 def confFileValue(section: str, key: str) -> str:
-    conf = configparser.ConfigParser()
-    path = os.path.expanduser(constants.CONF_FILE_PATH)
-    conf.read(path)
-    return conf[section][key]
+    """A value from the settings. See util/settings.py"""
+    return settings.get().value(section, key)
@@ -2,8 +2,13 @@ import logging
 import typing
 import web3
 
-from util import constants
-from web3tools import web3util, account
+import eth_keys
+from hexbytes import HexBytes
+
+from util import constants, settings, timing
+from web3tools import web3util, account, accountpool, noncemanager, \
+    txpipeline
+from web3tools.noncemanager import NONCES
 
 logger = logging.getLogger(__name__)
 
@@ -11,18 +16,41 @@ def randomWeb3Wallet():
     private_key = account.randomPrivateKey()
     return Web3Wallet(private_key=private_key)
 
+def newWeb3Wallet():
+    """Next account of the account pool if there's one, else random.
+    See web3tools/accountpool.py"""
+    pool = accountpool.pool()
+    if pool is None:
+        return randomWeb3Wallet()
+    private_key, address = pool.nextAccount()
+    return Web3Wallet(private_key=private_key, address=address)
+
+_GOD_WALLET = None
+def _godWallet():
+    global _GOD_WALLET
+    if _GOD_WALLET is None:
+        god_key = settings.get().networkValue('TEST_PRIVATE_KEY1')
+        _GOD_WALLET = Web3Wallet(god_key)
+    return _GOD_WALLET
+
 class Web3Wallet:
     """Signs txs and msgs with an account's private key."""
-    _last_tx_count: dict = dict()
     MIN_GAS_PRICE = 1000000000
 
-    def __init__(self, private_key:str):
+    def __init__(self, private_key:str, address:typing.Union[str,None]=None):
         self._private_key = private_key
-        self._address = account.privateKeyToAddress(self._private_key)
+        if address is None: #deriving it is an elliptic-curve multiply
+            address = account.privateKeyToAddress(self._private_key)
+        self._address = address
+        self._signer_key = None #eth_keys PrivateKey. See signer_key
 
         #give this wallet a bunch of ETH for gas fees
-        
-    
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state['_signer_key'] = None
+        return state
+
     @property
     def address(self):
         return self._address
@@ -31,21 +59,30 @@ class Web3Wallet:
     def private_key(self):
         return self._private_key
 
+    @property
+    def signer_key(self):
+        """The key as an eth_keys PrivateKey, made once. Signing with it
+        (rather than with the hex key) skips re-deriving the public key"""
+        if self._signer_key is None:
+            self._signer_key = eth_keys.keys.PrivateKey(
+                HexBytes(self._private_key))
+        return self._signer_key
+
     @property
     def account(self):
-        return account.Account(private_key=self.private_key)
+        return account.Account(private_key=self.private_key,
+                               address=self._address)
     
     @staticmethod
     def reset_tx_count():
-        Web3Wallet._last_tx_count = dict()
+        NONCES.reset()
 
     def __get_key(self):
         return self._private_key
     
     def validate(self):
         _web3 = web3util.get_web3()
-        key = self.__get_key()
-        account = _web3.eth.account.from_key(key)
+        account = _web3.eth.account.from_key(self.signer_key)
         return account.address == self._address
 
     @staticmethod
@@ -54,27 +91,20 @@ class Web3Wallet:
         # transactions in a row without wait in between the network may not get the chance to
         # update the transaction count for the account address in time.
         # So we have to manage this internally per account address.
-        _web3 = web3util.get_web3()
-        if address not in Web3Wallet._last_tx_count:
-            Web3Wallet._last_tx_count[address] = _web3.eth.get_transaction_count(address)
-        else:
-            Web3Wallet._last_tx_count[address] += 1
-
-        return Web3Wallet._last_tx_count[address]
+        return NONCES.nextNonce(address)
 
     def sign_tx(self, tx):
         _web3 = web3util.get_web3()
-        account = _web3.eth.account.from_key(self._private_key)
-        nonce = Web3Wallet._get_nonce(account.address)
+        nonce = Web3Wallet._get_nonce(self._address)
         gas_price = int(_web3.eth.gasPrice / 100)
         gas_price = max(gas_price, self.MIN_GAS_PRICE)
         tx['nonce'] = nonce
         tx['gasPrice'] = gas_price
-        signed_tx = _web3.eth.account.sign_transaction(tx, private_key)
+        signed_tx = _web3.eth.account.sign_transaction(tx, self.signer_key)
         return signed_tx.rawTransaction
 
     def sign(self, msg_hash):
-        account = web3.eth.account.from_key(self._private_key)
+        account = web3.eth.account.from_key(self.signer_key)
         return account.signHash(msg_hash)
 
     def ETH_base(self) -> int: #returns ETH, in base 18 (i.e. num wei)
@@ -84,34 +114,60 @@ class Web3Wallet:
     def fundFromAbove(self, num_wei: int):
         #Give the this wallet ETH to pay gas fees
         #Use funds given to 'TEST_PRIVATE_KEY1' from ganache (see deploy.py)
-        network = web3util.get_network()
-        god_key = web3util.confFileValue(network, 'TEST_PRIVATE_KEY1')
-        god_wallet = Web3Wallet(god_key)
-        god_wallet.sendEth(self.address, num_wei)
+        _godWallet().sendEth(self.address, num_wei)
         
     def sendEth(self, to_address:str, num_wei:int):
         return buildAndSendTx(
             function=None, from_wallet=self, num_wei=num_wei,
             to_address=to_address)
 
+@timing.timed('evm', 'buildAndSendTx')
 def buildAndSendTx(function,
                    from_wallet: Web3Wallet,
                    gaslimit: int = constants.GASLIMIT_DEFAULT,
                    num_wei: int = 0,
-                   to_address=None):
+                   to_address=None,
+                   wait: bool = False):
+    """Returns (tx_hash, tx_receipt). If the tx pipeline is enabled and
+    not wait, tx_receipt is None: txpipeline.settle() checks it later"""
     assert isinstance(from_wallet.address, str)
     #assert isinstance(from_wallet.private_key, str)
 
     _web3 = web3util.get_web3()
-    nonce = _web3.eth.get_transaction_count(from_wallet.address)
-    network = web3util.get_network()
-    gas_price = int(web3util.confFileValue(network, 'GAS_PRICE'))
+    address = from_wallet.address
+    for attempt in range(2):
+        nonce = NONCES.nextNonce(address) #local count; no RPC
+        try:
+            tx = _buildTx(function, address, gaslimit, num_wei, to_address,
+                          nonce)
+            signed_tx = _web3.eth.account.sign_transaction(
+                tx, private_key=from_wallet.signer_key)
+            tx_hash = _web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            break
+        except Exception as e:
+            if not noncemanager.isNonceError(e):
+                NONCES.release(address, nonce) #unused
+                raise
+            NONCES.resync(address) #local count was off. Ask the node
+            if attempt == 1:
+                raise
+
+    if txpipeline.ENABLED and not wait:
+        txpipeline.addPending(tx_hash, from_wallet.address)
+        return (tx_hash, None)
+    tx_receipt = _web3.eth.wait_for_transaction_receipt(tx_hash)
+    if tx_receipt['status'] == 0:  # did tx fail?
+        raise Exception(f"The tx failed. tx_receipt: {tx_receipt}")
+    return (tx_hash, tx_receipt)
+
+def _buildTx(function, from_address: str, gaslimit: int, num_wei: int,
+             to_address, nonce: int) -> dict:
     tx_params = {
-        "from": from_wallet.address,
+        "from": from_address,
         "value": num_wei,
         "nonce": nonce,
         "gas": gaslimit,
-        "gasPrice": gas_price,
+        "gasPrice": settings.get().gas_price,
     }
 
     if function is None: #just send ETH, versus smart contract call?
@@ -122,14 +178,6 @@ def buildAndSendTx(function,
     else:
         assert to_address is None
         tx = function.buildTransaction(tx_params)
-        
-    signed_tx = _web3.eth.account.sign_transaction(
-        tx, private_key=from_wallet.private_key)
-    tx_hash = _web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-
-    tx_receipt = _web3.eth.wait_for_transaction_receipt(tx_hash)
-    if tx_receipt['status'] == 0:  # did tx fail?
-        raise Exception("The tx failed. tx_receipt: {tx_receipt}")
-    return (tx_hash, tx_receipt)
+    return tx
 
     